@@ -0,0 +1,57 @@
+"""
+sugar_core против запасного модуля NumPy/SciPy: генерация пакета, эвристики на пакете,
+точное решение и полный run_experiments.
+
+Запуск: python benchmarks/bench_backend.py [--sizes 15 50 200] [--count 512]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+from engine.backend import load_backend
+
+
+def make_params(n):
+    return {
+        'n': n, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'concentrated',
+        'use_ripening': True, 'v': max(1, n // 4), 'beta_max': 1.07,
+        'use_inorganic': True, 'seed': n
+    }
+
+
+def timed(fn):
+    t0 = time.perf_counter()
+    fn()
+    return time.perf_counter() - t0
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 50, 200])
+    parser.add_argument('--count', type=int, default=512, help='матриц на размер при n=15')
+    args = parser.parse_args()
+
+    modules = [load_backend(name) for name in ('native', 'numpy')]
+    print(f"{'n':>5} {'k':>5} {'модуль':>7} {'generate':>10} {'heuristics':>11} {'exact':>10} "
+          f"{'run_experiments':>16}   (мкс на матрицу)")
+    for n in args.sizes:
+        k = max(4, args.count * 15 * 15 // (n * n))
+        params = make_params(n)
+        batch = modules[0][1].MatrixGenerator(params).generate_batch(k)
+        for name, core in modules:
+            t_gen = timed(lambda: core.MatrixGenerator(params).generate_batch(k))
+            t_heur = timed(lambda: core.run_all_heuristics(batch, params['v']))
+            t_exact = timed(lambda: core.solve_exact(batch))
+            t_run = timed(lambda: core.run_experiments(params, k))
+            print(f"{n:>5} {k:>5} {name:>7} " + " ".join(
+                f"{t / k * 1e6:>{w}.1f}" for t, w in ((t_gen, 10), (t_heur, 11), (t_exact, 10), (t_run, 16))))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+"""
+Пакетная обработка: generate_batch(k) и ядра на (k, n, n) против k отдельных вызовов.
+
+Запуск: python benchmarks/bench_batch.py [--sizes 15 50 100] [--count 2000]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import sugar_core
+
+
+def make_params(n):
+    return {
+        'n': n, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'concentrated',
+        'use_ripening': True, 'v': max(1, n // 4), 'beta_max': 1.07,
+        'use_inorganic': True, 'seed': n
+    }
+
+
+def timed(fn, repeat=3):
+    best, result = float('inf'), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return result, best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 50, 100])
+    parser.add_argument('--count', type=int, default=2000)
+    args = parser.parse_args()
+
+    print(f"{'n':>5} {'этап':>12} {'по одной, мкс':>14} {'пакетом, мкс':>13}")
+    for n in args.sizes:
+        k = max(10, args.count * 15 // n)
+        v = max(1, n // 4)
+        gen = sugar_core.MatrixGenerator(make_params(n))
+        mats, t_single = timed(lambda: [gen.generate_at(i) for i in range(k)])
+        batch, t_batch = timed(lambda: sugar_core.MatrixGenerator(make_params(n)).generate_batch(k))
+        rows = [('generate', t_single, t_batch)]
+        for name, single, batched in (
+            ('heuristics', lambda: [sugar_core.run_all_heuristics(m, v) for m in mats],
+             lambda: sugar_core.run_all_heuristics(batch, v)),
+            ('solve_exact', lambda: [sugar_core.solve_exact(m) for m in mats],
+             lambda: sugar_core.solve_exact(batch)),
+        ):
+            rows.append((name, timed(single)[1], timed(batched)[1]))
+        for name, t_one, t_many in rows:
+            print(f"{n:>5} {name:>12} {t_one / k * 1e6:>14.2f} {t_many / k * 1e6:>13.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+"""
+История экспериментов на 100 тыс. записей: вставки, чтение, очистка.
+
+База заполняется записями с реальными по размеру params/results, затем меряются:
+    * add_record по одной (как после каждого прогона и точки серии): время вызова и время
+      до фиксации на диске (flush, если он есть);
+    * add_records пачкой;
+    * get_all_records (окно истории), delete_last_minutes и init_db (очистка старых записей):
+      первый запуск на старой базе (с переносом в нормализованную схему) и повторный;
+    * агрегаты и фильтры в SQL (aggregate_losses, count_records).
+
+Запуск: python benchmarks/bench_database.py [--rows 100000] [--singles 2000]
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data.database as db
+
+PARAMS = {'T': 1000, 'n': 15, 'alpha_min': 0.12, 'alpha_max': 0.22, 'beta1': 0.86, 'beta2': 0.99,
+          'dist_type': 'uniform', 'use_ripening': False, 'v': 0, 'beta_max': 1.0, 'use_inorganic': False,
+          'exact_engine': 'hungarian', 'dtype': 'float64', 'sampler': 'mc', 'stop_rule': 'fixed'}
+RESULTS = {'greedy': 3.1234, 'thrifty': 5.2345, 'median': 7.3456, 'greedy_thrifty': 3.1234, 'thrifty_greedy': 4.5678}
+
+
+def fill(path, rows):
+    """Записи в старом формате (JSON-текст, за последние 10 дней) прямым SQL, чтобы не зависеть от измеряемого кода."""
+    conn = sqlite3.connect(path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, '
+                 'results TEXT, seed INTEGER, std_errors TEXT)')
+    start = datetime.now() - timedelta(days=10)
+    step = timedelta(days=10) / rows
+    params = [json.dumps(dict(PARAMS, n=n)) for n in range(10, 50, 5)]
+    results = json.dumps(RESULTS)
+    conn.executemany('INSERT INTO history (timestamp, params, results, seed, std_errors) VALUES (?, ?, ?, ?, ?)',
+                     (((start + i * step - timedelta(hours=1)).strftime("%Y-%m-%d %H:%M:%S"),
+                       params[i % len(params)], results, i, results) for i in range(rows)))
+    conn.commit()
+    conn.close()
+
+
+def timed(fn, *args):
+    t0 = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - t0, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--singles', type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, 'history.db')
+        fill(db.DB_PATH, args.rows)
+        flush = getattr(db, 'flush', lambda: None)
+
+        t_init, _ = timed(db.init_db)
+        flush()
+        print(f"rows={args.rows}")
+        print(f"init_db (миграция + очистка)   {t_init * 1000:9.1f} мс")
+        t_init, _ = timed(db.init_db)
+        flush()
+        print(f"init_db повторно               {t_init * 1000:9.1f} мс")
+
+        t0 = time.perf_counter()
+        for i in range(args.singles):
+            db.add_record(PARAMS, RESULTS, seed=i, std_errors=RESULTS)
+        t_calls = time.perf_counter() - t0
+        t_flush, _ = timed(flush)
+        print(f"add_record x{args.singles}: вызов       {t_calls / args.singles * 1e6:9.1f} мкс/запись")
+        print(f"add_record x{args.singles}: до диска    {(t_calls + t_flush) / args.singles * 1e6:9.1f} мкс/запись")
+
+        entries = [{'params': PARAMS, 'results': RESULTS, 'seed': i, 'std_errors': RESULTS} for i in range(10_000)]
+        t_batch, _ = timed(db.add_records, entries)
+        t_flush, _ = timed(flush)
+        print(f"add_records x10000             {(t_batch + t_flush) / 10_000 * 1e6:9.1f} мкс/запись")
+
+        best = min(timed(db.get_all_records)[0] for _ in range(3))
+        print(f"get_all_records ({len(db.get_all_records())} записей) {best * 1000:9.1f} мс")
+
+        if hasattr(db, 'aggregate_losses'):
+            best = min(timed(db.aggregate_losses, 'n', 'greedy')[0] for _ in range(3))
+            print(f"средние потери greedy по n (SQL) {best * 1000:9.1f} мс")
+            best = min(timed(lambda: db.count_records(n=20, beta1=(0.8, None)))[0] for _ in range(3))
+            print(f"count_records(n=20, beta1>=0.8) {best * 1000:9.1f} мс")
+
+        t_delete, _ = timed(db.delete_last_minutes, 30)
+        print(f"delete_last_minutes(30)        {t_delete * 1000:9.1f} мс")
+        if hasattr(db, 'close'):
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Режим float32 против float64 на одних и тех же seed: точность средних потерь,
+пропускная способность run_experiments, эвристик и точного решения, объем матрицы.
+
+Запуск: python benchmarks/bench_float32.py [--sizes 15 100 500 2000] [--budget 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+import sugar_core
+
+
+def make_params(n, dtype):
+    return {
+        'n': n, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'concentrated',
+        'use_ripening': True, 'v': max(1, n // 4), 'beta_max': 1.07,
+        'use_inorganic': True, 'seed': n, 'dtype': dtype
+    }
+
+
+def best_time(fn, repeat=3):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 100, 500, 2000])
+    parser.add_argument('--budget', type=float, default=5.0,
+                        help='примерное время прогона float64 на один размер, с')
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'T':>6} {'f64, эксп/с':>12} {'f32, эксп/с':>12} {'эвр. f64/f32, мс':>18} "
+          f"{'точн. f64/f32, мс':>19} {'матрица, КБ':>12} {'max|Δ ср.|, п.п.':>17}")
+    for n in args.sizes:
+        p64, p32 = make_params(n, 'float64'), make_params(n, 'float32')
+        t0 = time.perf_counter()
+        sugar_core.run_experiments(p64, 1)
+        T = max(1, min(20000, int(args.budget / max(time.perf_counter() - t0, 1e-6))))
+
+        t0 = time.perf_counter()
+        r64 = sugar_core.run_experiments(p64, T)
+        t64 = time.perf_counter() - t0
+        t0 = time.perf_counter()
+        r32 = sugar_core.run_experiments(p32, T)
+        t32 = time.perf_counter() - t0
+        diff = max(abs(float(np.mean(r64['losses'][k])) - float(np.mean(r32['losses'][k])))
+                   for k in r64['losses'])
+
+        m64 = sugar_core.MatrixGenerator(dict(p64, layout='F')).generate_at(0)
+        m32 = sugar_core.MatrixGenerator(dict(p32, layout='F')).generate_at(0)
+        h64 = best_time(lambda: sugar_core.run_all_heuristics(m64, n // 4))
+        h32 = best_time(lambda: sugar_core.run_all_heuristics(m32, n // 4))
+        e64 = best_time(lambda: sugar_core.solve_exact(m64), 1)
+        e32 = best_time(lambda: sugar_core.solve_exact(m32), 1)
+
+        print(f"{n:>6} {T:>6} {T / t64:>12.1f} {T / t32:>12.1f} "
+              f"{h64 * 1e3:>8.2f} /{h32 * 1e3:>8.2f} {e64 * 1e3:>9.2f} /{e32 * 1e3:>8.2f} "
+              f"{m64.nbytes // 1024:>5} /{m32.nbytes // 1024:>5} {diff:>17.2e}")
+
+
+if __name__ == '__main__':
+    main()
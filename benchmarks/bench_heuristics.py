@@ -0,0 +1,49 @@
+"""
+Пять отдельных вызовов run_* против одного прохода run_all_heuristics.
+
+Запуск: python benchmarks/bench_heuristics.py [--sizes 100 500 2000] [--repeat 5]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+import sugar_core
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def separate(mat, v):
+    return (sugar_core.run_greedy(mat), sugar_core.run_thrifty(mat), sugar_core.run_median(mat),
+            sugar_core.run_greedy_thrifty(mat, v), sugar_core.run_thrifty_greedy(mat, v))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 100, 500, 2000])
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'5 вызовов, мс':>15} {'fused, мс':>12} {'ускорение':>10}")
+    for n in args.sizes:
+        mat = np.random.default_rng(n).random((n, n))
+        v = n // 2
+        t_sep = best_time(lambda: separate(mat, v), args.repeat)
+        t_fused = best_time(lambda: sugar_core.run_all_heuristics(mat, v), args.repeat)
+        print(f"{n:>6} {t_sep * 1e3:>15.3f} {t_fused * 1e3:>12.3f} {t_sep / t_fused:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+"""
+Время одного точного решения: solve_exact, HungarianSolver (переиспользуемые буферы),
+движок LAPJV и scipy.optimize.linear_sum_assignment для сравнения.
+
+Запуск: python benchmarks/bench_hungarian.py [--sizes 15 100 500 1000 3000]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+import sugar_core
+
+
+def best_time(fn, mats):
+    best = float('inf')
+    for mat in mats:
+        t0 = time.perf_counter()
+        fn(mat)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def generator_matrices(n, count):
+    params = {
+        'n': n, 'T': count, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+        'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+        'use_inorganic': False, 'seed': n
+    }
+    gen = sugar_core.MatrixGenerator(params)
+    return [gen.generate() for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[15, 50, 100, 300, 1000, 3000])
+    args = parser.parse_args()
+
+    try:
+        from scipy.optimize import linear_sum_assignment
+    except ImportError:
+        linear_sum_assignment = None
+
+    solver = sugar_core.HungarianSolver() if hasattr(sugar_core, 'HungarianSolver') else None
+    print(f"{'n':>6} {'solve_exact, мс':>16} {'HungarianSolver, мс':>20} {'lapjv, мс':>12} {'scipy, мс':>12}")
+    for n in args.sizes:
+        count = max(1, min(200, 20_000 // (n * n) * 10 or 1))
+        mats = generator_matrices(n, count)
+        t_exact = best_time(sugar_core.solve_exact, mats)
+        t_solver = best_time(solver.solve, mats) if solver else float('nan')
+        t_lapjv = best_time(lambda m: sugar_core.solve_exact(m, engine='lapjv'), mats)
+        t_scipy = (best_time(lambda m: linear_sum_assignment(m, maximize=True), mats)
+                   if linear_sum_assignment else float('nan'))
+        print(f"{n:>6} {t_exact * 1e3:>16.3f} {t_solver * 1e3:>20.3f} {t_lapjv * 1e3:>12.3f} {t_scipy * 1e3:>12.3f}")
+
+
+if __name__ == '__main__':
+    main()
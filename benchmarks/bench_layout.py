@@ -0,0 +1,58 @@
+"""
+Раскладка матрицы: генерация и эвристики для layout='C' (по строкам) и layout='F' (по столбцам).
+
+Запуск: python benchmarks/bench_layout.py [--sizes 500 2000 4000] [--repeat 3]
+"""
+import argparse
+import os
+import sys
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import sugar_core
+
+
+def best_time(fn, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def make_params(n, layout):
+    return {
+        'n': n, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+        'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+        'use_inorganic': True, 'seed': n, 'layout': layout
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--sizes', type=int, nargs='+', default=[500, 2000, 4000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'n':>6} {'этап':>12} {'C, мс':>10} {'F, мс':>10} {'ускорение':>10}")
+    for n in args.sizes:
+        gens = {layout: sugar_core.MatrixGenerator(make_params(n, layout)) for layout in 'CF'}
+        mats = {layout: gen.generate_at(0) for layout, gen in gens.items()}
+        stages = [
+            ('generate', lambda layout: gens[layout].generate_at(0)),
+            ('heuristics', lambda layout: sugar_core.run_all_heuristics(mats[layout], n // 2)),
+            ('greedy', lambda layout: sugar_core.run_greedy(mats[layout])),
+        ]
+        for name, fn in stages:
+            t_c = best_time(lambda: fn('C'), args.repeat)
+            t_f = best_time(lambda: fn('F'), args.repeat)
+            print(f"{n:>6} {name:>12} {t_c * 1e3:>10.2f} {t_f * 1e3:>10.2f} {t_c / t_f:>9.2f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,86 @@
+"""
+Хранение потерь по экспериментам (data/losses.py): объем на 1e6 экспериментов и скорость.
+
+Потери считаются настоящим прогоном sugar_core, затем сравниваются способы кодирования одной
+стратегии (float64 / float32 как есть, zlib, перегруппировка байтов + zlib, delta + zlib) и
+меряются запись в историю (add_record с losses), потоковое чтение (iter_losses) и полный объем
+таблицы history_losses в пересчете на 1e6 экспериментов — без дозаривания (v=0) и с ним.
+
+Запуск: python benchmarks/bench_losses.py [--T 200000] [--n 15]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import sugar_core
+import data.database as db
+from data import losses
+
+
+def make_params(n, ripening):
+    return {'n': n, 'alpha_min': 0.12, 'alpha_max': 0.22, 'beta1': 0.86, 'beta2': 0.99,
+            'dist_type': 'uniform', 'use_ripening': ripening, 'v': 3 if ripening else 0,
+            'beta_max': 1.05, 'use_inorganic': False, 'seed': 1}
+
+
+def codecs(values):
+    f32 = values.astype(np.float32)
+    shuffled = f32.view(np.uint8).reshape(-1, 4).T.tobytes()
+    delta = np.diff(f32.view(np.int32), prepend=np.int32(0))
+    return {
+        'float64': values.nbytes,
+        'float32': f32.nbytes,
+        'float32 + zlib': len(zlib.compress(f32.tobytes(), losses.LEVEL)),
+        'float32 + delta + zlib': len(zlib.compress(delta.view(np.uint8).reshape(-1, 4).T.tobytes(), losses.LEVEL)),
+        'float32 + перегруппировка + zlib': len(zlib.compress(shuffled, losses.LEVEL)),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--T', type=int, default=200_000)
+    parser.add_argument('--n', type=int, default=15)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_PATH = os.path.join(tmp, 'history.db')
+        db.init_db()
+        for ripening in (False, True):
+            params = make_params(args.n, ripening)
+            result = sugar_core.run_experiments(params, args.T, keep_losses=True)
+            print(f"\nT={args.T}, n={args.n}, дозаривание: {'да' if ripening else 'нет'}")
+            if not ripening:
+                print("  одна стратегия (greedy), байт на эксперимент:")
+                for name, size in codecs(result['losses']['greedy']).items():
+                    print(f"    {name:<34} {size / args.T:6.3f}")
+
+            avg = {name: s.mean for name, s in result['stats'].items()}
+            before = losses.storage_stats()['bytes']
+            t0 = time.perf_counter()
+            db.add_record(dict(params, T=args.T), avg, seed=1, losses=result['losses'])
+            db.flush()
+            t_write = time.perf_counter() - t0
+            record_id = db.get_records_page(None, 1)[0]['id']
+            size = losses.storage_stats()['bytes'] - before
+
+            t0 = time.perf_counter()
+            total = sum(len(chunk) for name in result['losses'] for chunk in losses.iter_losses(record_id, name))
+            t_read = time.perf_counter() - t0
+            print(f"  запись (сжатие + SQLite)          {t_write / args.T * 1e6:8.3f} с на 1e6 экспериментов")
+            print(f"  {f'чтение iter_losses ({total} чисел)':<34}{t_read / args.T * 1e6:8.3f} с на 1e6 экспериментов")
+            print(f"  объем всех стратегий              {size / args.T:8.3f} МБ на 1e6 экспериментов "
+                  f"(float64 без сжатия: {5 * 8:.0f} МБ)")
+        db.close()
+
+
+if __name__ == '__main__':
+    main()
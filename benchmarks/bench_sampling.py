@@ -0,0 +1,71 @@
+"""
+Снижение дисперсии: антитетические пары и перемешанный Соболь против обычного Монте-Карло.
+
+Для каждого набора параметров и режима sampler серия из T экспериментов повторяется
+с R разными seed; дисперсия средней потери по повторам сравнивается с режимом 'mc'.
+Эффективное ускорение = (дисперсия mc / дисперсия режима) * (время mc / время режима):
+во сколько раз меньше времени нужно для того же доверительного интервала.
+
+Запуск: python benchmarks/bench_sampling.py [--T 256] [--reps 40]
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import sugar_core
+
+STRATEGIES = ['greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy']
+SAMPLERS = ['mc', 'antithetic', 'sobol']
+
+BASE = {
+    'alpha_min': 0.12, 'alpha_max': 0.22, 'beta1': 0.86, 'beta2': 0.99,
+    'v': 0, 'beta_max': 1.0, 'use_ripening': False, 'use_inorganic': False,
+}
+PARAM_SETS = {
+    'n=15 равн.': dict(BASE, n=15, dist_type='uniform'),
+    'n=15 конц.+доз.+хим.': dict(BASE, n=15, dist_type='concentrated', use_ripening=True, v=5,
+                                 beta_max=1.07, use_inorganic=True),
+    'n=50 конц.+хим.': dict(BASE, n=50, dist_type='concentrated', use_inorganic=True),
+}
+
+
+def replicate(params, sampler, T, reps):
+    """Средние потери R независимых серий (R, 5) и время одной серии."""
+    means = np.empty((reps, len(STRATEGIES)))
+    t0 = time.perf_counter()
+    for r in range(reps):
+        res = sugar_core.run_experiments(dict(params, sampler=sampler, seed=1000 + r), T, keep_losses=False)
+        means[r] = [res['stats'][name].mean for name in STRATEGIES]
+    return means, (time.perf_counter() - t0) / reps
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--T', type=int, default=256)
+    parser.add_argument('--reps', type=int, default=40)
+    args = parser.parse_args()
+
+    print(f"T={args.T}, повторов {args.reps}; отношение дисперсий mc/режим по стратегиям "
+          f"({', '.join(STRATEGIES)})")
+    for label, params in PARAM_SETS.items():
+        results = {s: replicate(params, s, args.T, args.reps) for s in SAMPLERS}
+        var_mc, time_mc = results['mc'][0].var(axis=0, ddof=1), results['mc'][1]
+        print(f"\n{label}")
+        print(f"{'режим':>11} {'мс/серия':>9} {'отношение дисперсий':>32} {'эфф. ускорение (мин-макс)':>26}")
+        for sampler in SAMPLERS:
+            means, elapsed = results[sampler]
+            ratio = var_mc / means.var(axis=0, ddof=1)
+            speedup = ratio * time_mc / elapsed
+            ratios = ' '.join(f"{r:5.2f}" for r in ratio)
+            print(f"{sampler:>11} {elapsed * 1e3:>9.1f} {ratios:>32} {speedup.min():>12.2f} - {speedup.max():<.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,72 @@
+"""
+Накопление потерь в WorkerThread: списки Python + np.mean против RunningStats.
+
+Потери подаются порциями, как их выдает run_experiments; меряются пиковая память
+накопителя (tracemalloc) и время на эксперимент.
+
+Запуск: python benchmarks/bench_stats.py [--T 1000000] [--chunk 10000]
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import sugar_core
+
+STRATEGIES = ['greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy']
+
+
+def with_lists(chunks):
+    strategies = {name: [] for name in STRATEGIES}
+    for chunk in chunks:
+        for name in STRATEGIES:
+            strategies[name].extend(chunk.tolist())
+    return {name: np.mean(vals) for name, vals in strategies.items()}
+
+
+def with_stats(chunks):
+    stats = {name: sugar_core.RunningStats() for name in STRATEGIES}
+    for chunk in chunks:
+        for name in STRATEGIES:
+            stats[name].add_array(chunk)
+    return {name: s.mean for name, s in stats.items()}
+
+
+def measure(fn, chunks):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(chunks)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--T', type=int, default=1_000_000)
+    parser.add_argument('--chunk', type=int, default=10_000)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    chunks = [rng.gamma(2.0, 3.0, min(args.chunk, args.T - s)) for s in range(0, args.T, args.chunk)]
+
+    print(f"T={args.T}, порция {args.chunk}, стратегий {len(STRATEGIES)}")
+    print(f"{'накопитель':>12} {'пик памяти, МБ':>15} {'нс/эксперимент':>15}")
+    results = {}
+    for name, fn in (('списки', with_lists), ('RunningStats', with_stats)):
+        results[name], elapsed, peak = measure(fn, chunks)
+        print(f"{name:>12} {peak / 2**20:>15.2f} {elapsed / args.T * 1e9:>15.1f}")
+    diff = max(abs(results['списки'][k] - results['RunningStats'][k]) for k in STRATEGIES)
+    print(f"макс. расхождение средних: {diff:.2e}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Выгрузка и загрузка истории (data/transfer.py): время и пиковая память при разном размере истории.
+
+База заполняется записями с реальными по размеру параметрами и результатами, у --with-losses
+из них сохранены потери по --experiments экспериментам. Для каждого формата меряются export_history
+и import_history в пустую базу, затем повторный import (все записи — дубликаты). Пиковая память
+Python (tracemalloc) не должна расти с числом записей.
+
+Запуск: python benchmarks/bench_transfer.py [--rows 20000 200000] [--formats csv npz arrow]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data.database as db
+from data import transfer
+
+PARAMS = {'T': 1000, 'n': 15, 'alpha_min': 0.12, 'alpha_max': 0.22, 'beta1': 0.86, 'beta2': 0.99,
+          'dist_type': 'uniform', 'use_ripening': False, 'v': 0, 'beta_max': 1.0, 'use_inorganic': False,
+          'exact_engine': 'hungarian', 'dtype': 'float64', 'sampler': 'mc', 'stop_rule': 'fixed'}
+RESULTS = {'greedy': 3.1234, 'thrifty': 5.2345, 'median': 7.3456, 'greedy_thrifty': 3.1234, 'thrifty_greedy': 4.5678}
+
+
+def fill(rows, with_losses, experiments):
+    db.add_records([{'params': dict(PARAMS, n=10 + i % 8 * 5), 'results': RESULTS, 'seed': i, 'std_errors': RESULTS}
+                    for i in range(rows)])
+    rng = np.random.default_rng(0)
+    for i in range(with_losses):
+        db.add_record(dict(PARAMS, T=experiments), RESULTS, seed=rows + i,
+                      losses={name: rng.random(experiments) * 10 for name in RESULTS})
+    db.flush()
+
+
+def measured(fn, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = fn(*args)
+    elapsed = time.perf_counter() - t0
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--rows', type=int, nargs='+', default=[20_000, 200_000])
+    parser.add_argument('--formats', nargs='+', default=list(transfer.FORMATS))
+    parser.add_argument('--with-losses', type=int, default=4)
+    parser.add_argument('--experiments', type=int, default=100_000)
+    args = parser.parse_args()
+
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            db.DB_PATH = os.path.join(tmp, 'history.db')
+            db.init_db()
+            fill(rows, args.with_losses, args.experiments)
+            print(f"\nrows={rows}, с потерями: {args.with_losses} x {args.experiments} экспериментов")
+            for fmt in args.formats:
+                path = os.path.join(tmp, f'history.{fmt}')
+                db.DB_PATH = os.path.join(tmp, 'history.db')
+                try:
+                    t_export, m_export, _ = measured(transfer.export_history, path)
+                except ImportError as e:
+                    print(f"  {fmt:<6} пропущен: {e}")
+                    continue
+                size = sum(os.path.getsize(p) for p in (path, transfer.losses_path(path)) if os.path.exists(p))
+
+                db.DB_PATH = os.path.join(tmp, f'import_{fmt}.db')
+                db.init_db()
+                t_import, m_import, result = measured(transfer.import_history, path)
+                t_again, _, again = measured(transfer.import_history, path)
+                assert result['imported'] == rows + args.with_losses and again['imported'] == 0
+                print(f"  {fmt:<6} export {t_export:6.1f} с, пик {m_export / 2**20:6.1f} МБ | "
+                      f"import {t_import:6.1f} с, пик {m_import / 2**20:6.1f} МБ | "
+                      f"повторный import {t_again:5.1f} с | файл {size / 2**20:7.1f} МБ")
+            db.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Сравнение пути WorkerThread (пул потоков + run_experiments) с прежним
+однопоточным циклом из 7 вызовов pybind на эксперимент.
+
+Запуск: python benchmarks/bench_worker.py [--n 15] [--T 20000] [--workers 4]
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+project_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import numpy as np
+import sugar_core
+from PyQt5.QtCore import QCoreApplication
+from gui.worker import WorkerThread
+
+
+def make_params(n, T):
+    return {
+        'n': n, 'T': T, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+        'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+        'use_inorganic': False, 'seed': 1
+    }
+
+
+def legacy_loop(params):
+    """Прежний цикл WorkerThread.run: по одному эксперименту за раз."""
+    generator = sugar_core.MatrixGenerator(params)
+    v_val = params.get('v', 0)
+    losses = []
+    for _ in range(params['T']):
+        S_matrix = generator.generate()
+        S_opt = sugar_core.solve_exact(S_matrix)
+        if S_opt <= 1e-9:
+            continue
+        for total in (sugar_core.run_greedy(S_matrix), sugar_core.run_thrifty(S_matrix),
+                      sugar_core.run_median(S_matrix), sugar_core.run_greedy_thrifty(S_matrix, v_val),
+                      sugar_core.run_thrifty_greedy(S_matrix, v_val)):
+            losses.append((S_opt - total) / S_opt * 100.0)
+    return losses
+
+
+def worker_path(params, workers):
+    worker = WorkerThread(params, workers=workers)
+    out = {}
+    worker.result_ready.connect(lambda avg_losses, std_errors: out.update(avg_losses))
+    worker.error_occurred.connect(lambda msg: out.setdefault('error', msg))
+    worker.run()
+    return out
+
+
+def gil_ticks(n):
+    """Сколько итераций успевает сделать Python-поток, пока solve_exact решает матрицу n x n."""
+    mat = np.random.rand(n, n)
+    solver = threading.Thread(target=sugar_core.solve_exact, args=(mat,))
+    ticks = 0
+    solver.start()
+    while solver.is_alive():
+        ticks += 1
+    solver.join()
+    return ticks
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--n', type=int, default=15)
+    parser.add_argument('--T', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args()
+    app = QCoreApplication(sys.argv)
+
+    params = make_params(args.n, args.T)
+    t0 = time.perf_counter()
+    legacy_loop(params)
+    t_legacy = time.perf_counter() - t0
+
+    t0 = time.perf_counter()
+    worker_path(params, args.workers)
+    t_pool = time.perf_counter() - t0
+
+    print(f"n={args.n}, T={args.T}, cpu={os.cpu_count()}, workers={args.workers}")
+    print(f"  прежний цикл     : {t_legacy:8.3f} c")
+    print(f"  WorkerThread пул : {t_pool:8.3f} c  (ускорение x{t_legacy / t_pool:.2f})")
+    print(f"  итераций Python во время solve_exact(n=600): {gil_ticks(600)}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,14 @@
+#pragma once
+#include <pybind11/numpy.h>
+#include <array>
+#include "matrixView.h"
+
+// Порядок стратегий в результатах run_all_heuristics и run_experiments
+constexpr int STRATEGY_COUNT = 5;
+extern const std::array<const char*, STRATEGY_COUNT> STRATEGY_NAMES;
+
+// Итоги накапливаются в double и для матриц float32
+template <typename T>
+void all_heuristics_totals(const MatrixView<const T>& mat, int v, double* totals);
+template <typename T>
+pybind11::array_t<double> run_all_heuristics(pybind11::array_t<T> matrix, int v);
\ No newline at end of file
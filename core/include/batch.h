@@ -0,0 +1,75 @@
+#pragma once
+#include <pybind11/numpy.h>
+#include <stdexcept>
+#include "matrixView.h"
+
+namespace py = pybind11;
+
+// Ядра принимают одну матрицу (n, n) или пакет (k, n, n) любой раскладки. Для пакета
+// итог ядра по каждой матрице собирается в массив длины k, GIL отпускается один раз.
+
+template <typename T>
+void check_batch(const py::array_t<T>& batch) {
+    if (batch.ndim() != 3 || batch.shape(1) != batch.shape(2))
+        throw std::invalid_argument("batch must be a (k, n, n) array");
+    auto item = static_cast<py::ssize_t>(sizeof(T));
+    for (int axis = 0; axis < 3; axis++)
+        if (batch.strides(axis) % item != 0)
+            throw std::invalid_argument("matrix strides must be multiples of the element size");
+}
+
+// Матрица l пакета (k, n, n)
+template <typename T>
+MatrixView<const T> batch_view(const py::array_t<T>& batch, py::ssize_t l) {
+    auto item = static_cast<py::ssize_t>(sizeof(T));
+    return {batch.data() + l * (batch.strides(0) / item), static_cast<int>(batch.shape(1)),
+            static_cast<std::ptrdiff_t>(batch.strides(1) / item),
+            static_cast<std::ptrdiff_t>(batch.strides(2) / item)};
+}
+
+// kernel(view) -> double: число для матрицы, массив (k,) для пакета
+template <typename T, typename Kernel>
+py::object map_totals(const py::array_t<T>& input, Kernel kernel) {
+    if (input.ndim() != 3) {
+        auto view = make_view(input);
+        double total;
+        {
+            py::gil_scoped_release release;
+            total = kernel(view);
+        }
+        return py::float_(total);
+    }
+    check_batch(input);
+    py::ssize_t k = input.shape(0);
+    py::array_t<double> result(k);
+    double* out = result.mutable_data();
+    {
+        py::gil_scoped_release release;
+        for (py::ssize_t l = 0; l < k; l++) out[l] = kernel(batch_view(input, l));
+    }
+    return result;
+}
+
+// kernel(view, out) пишет width чисел: массив (width,) для матрицы, (k, width) для пакета
+template <typename T, typename Kernel>
+py::array_t<double> map_vectors(const py::array_t<T>& input, py::ssize_t width, Kernel kernel) {
+    if (input.ndim() != 3) {
+        auto view = make_view(input);
+        py::array_t<double> result(width);
+        double* out = result.mutable_data();
+        {
+            py::gil_scoped_release release;
+            kernel(view, out);
+        }
+        return result;
+    }
+    check_batch(input);
+    py::ssize_t k = input.shape(0);
+    py::array_t<double> result({k, width});
+    double* out = result.mutable_data();
+    {
+        py::gil_scoped_release release;
+        for (py::ssize_t l = 0; l < k; l++) kernel(batch_view(input, l), out + l * width);
+    }
+    return result;
+}
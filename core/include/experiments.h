@@ -0,0 +1,9 @@
+#pragma once
+#include <pybind11/pybind11.h>
+
+namespace py = pybind11;
+
+// keep_losses=false не хранит потери по экспериментам: в результате остаются только
+// статистики RunningStats, и память не зависит от T.
+py::dict run_experiments(py::dict params, long long T, int threads = 1, long long start = 0,
+                         bool keep_losses = true);
\ No newline at end of file
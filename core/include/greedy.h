@@ -1,3 +1,5 @@
 #pragma once
 #include <pybind11/numpy.h>
-double run_greedy(pybind11::array_t<double> matrix);
\ No newline at end of file
+#include "matrixView.h"
+template <typename T> double greedy_total(const MatrixView<const T>& mat);
+template <typename T> pybind11::object run_greedy(pybind11::array_t<T> matrix);
\ No newline at end of file
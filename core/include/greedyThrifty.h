@@ -1,3 +1,5 @@
 #pragma once
 #include <pybind11/numpy.h>
-double run_greedy_thrifty(pybind11::array_t<double> matrix, int v);
\ No newline at end of file
+#include "matrixView.h"
+template <typename T> double greedy_thrifty_total(const MatrixView<const T>& mat, int v);
+template <typename T> pybind11::object run_greedy_thrifty(pybind11::array_t<T> matrix, int v);
\ No newline at end of file
@@ -1,3 +1,39 @@
 #pragma once
 #include <pybind11/numpy.h>
-double solve_exact(pybind11::array_t<double> matrix);
\ No newline at end of file
+#include <string>
+#include <vector>
+#include "matrixView.h"
+
+// Венгерский алгоритм (максимизация) с буферами, живущими между вызовами.
+// Матрица копируется построчно в непрерывный буфер стоимостей (-a[i][j]),
+// поэтому вход может быть в любом порядке хранения. Экземпляр не потокобезопасен.
+// Стоимости хранятся в T (double или float), потенциалы всегда в double.
+template <typename T>
+class BasicHungarianSolver {
+public:
+    double solve(const MatrixView<const T>& mat);
+    double solve_array(pybind11::array_t<T> matrix);
+
+    pybind11::array_t<long long> assignment() const;
+    pybind11::array_t<double> row_potentials() const;
+    pybind11::array_t<double> col_potentials() const;
+
+private:
+    int n = 0;
+    std::vector<T> cost;
+    std::vector<double> u, v, minv;
+    std::vector<int> p, way, free_cols, used_cols;
+};
+
+using HungarianSolver = BasicHungarianSolver<double>;
+
+// Движок точного решения: выбирается ключом params['exact_engine'] или аргументом engine.
+enum class ExactEngine { Hungarian, Lapjv };
+ExactEngine parse_exact_engine(const std::string& name);
+
+template <typename T>
+double hungarian_total(const MatrixView<const T>& mat);
+template <typename T>
+double exact_total(const MatrixView<const T>& mat, ExactEngine engine);
+template <typename T>
+pybind11::object solve_exact(pybind11::array_t<T> matrix, const std::string& engine = "hungarian");
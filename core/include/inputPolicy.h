@@ -0,0 +1,24 @@
+#pragma once
+#include <pybind11/numpy.h>
+
+namespace py = pybind11;
+
+// Контракт входа ядер. Массив float64 или float32 любой раскладки (в т.ч. срез большего
+// массива) читается на месте. Все остальное (int, список, массив с чужим порядком байт)
+// раньше молча копировалось в float64; теперь такое копирование считается, а в строгом
+// режиме отклоняется с TypeError.
+void set_strict_inputs(bool enabled);
+bool strict_inputs();
+long long input_conversions();
+void reset_input_conversions();
+
+py::array_t<double> coerce_matrix(const py::object& matrix);
+
+// Перегрузка ядра, принимающая любой объект: регистрируется последней и получает
+// только то, что не подошло ни к одной перегрузке без преобразования.
+template <typename R, typename... Args>
+auto converting(R (*kernel)(py::array_t<double>, Args...)) {
+    return [kernel](const py::object& matrix, Args... args) -> R {
+        return kernel(coerce_matrix(matrix), args...);
+    };
+}
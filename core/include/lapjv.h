@@ -0,0 +1,22 @@
+#pragma once
+#include <vector>
+#include "matrixView.h"
+
+// Алгоритм Джонкера-Волгенанта (LAPJV) для плотной квадратной задачи о назначениях:
+// редукция столбцов, перенос редукции, две фазы аугментирующей редукции строк,
+// затем кратчайшие аугментирующие пути. Максимизирует сумму, как и solve_exact.
+// Стоимости хранятся в T, потенциалы и расстояния - в double.
+template <typename T>
+class LapjvSolver {
+public:
+    double solve(const MatrixView<const T>& mat);
+
+private:
+    int n = 0;
+    std::vector<T> cost;
+    std::vector<double> v, d;
+    std::vector<int> rowsol, colsol, free_rows, collist, matches, pred;
+};
+
+template <typename T>
+double lapjv_total(const MatrixView<const T>& mat);
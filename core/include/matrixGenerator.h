@@ -1,22 +1,45 @@
 #pragma once
 #include <pybind11/pybind11.h>
 #include <pybind11/numpy.h>
-#include <random>
+#include <cstdint>
+#include <memory>
+#include "matrixView.h"
+#include "sobol.h"
 
 namespace py = pybind11;
 
+// Источник равномерных чисел эксперимента:
+//   MonteCarlo  независимые числа Philox;
+//   Antithetic  эксперименты 2m и 2m+1 - пара u и 1 - u из одного потока Philox;
+//   Sobol       первые SOBOL_MAX_DIMS чисел эксперимента k - точка k перемешанной
+//               последовательности Соболя, остальные (padding) - Philox.
+enum class Sampler { MonteCarlo, Antithetic, Sobol };
+
 class MatrixGenerator {
 public:
     int n;
     double alpha_min, alpha_max, beta1, beta2;
     bool dist_concentrated, use_ripening, use_inorganic;
+    bool column_major = false;
+    bool single_precision = false;
+    Sampler sampler = Sampler::MonteCarlo;
+    std::shared_ptr<const SobolTable> sobol;
     int v;
     double beta_max;
+    std::uint64_t seed;
+    long long next_index = 0;
 
     MatrixGenerator(py::dict params);
-    py::array_t<double> generate();
+    py::array generate();
+    py::array generate_at(long long k) const;
+    void generate_into(py::array out);
+    py::array generate_batch(long long k);
+    void jump(long long k);
+    MatrixGenerator spawn(std::uint64_t stream) const;
+    const char* sampler_name() const;
+    template <typename T>
+    void fill_experiment(long long k, const MatrixView<T>& mat) const;
 
 private:
-    std::mt19937 gen;
-    double get_uniform(double min, double max);
-};
\ No newline at end of file
+    void init_sampler();
+};
@@ -0,0 +1,47 @@
+#pragma once
+#include <pybind11/numpy.h>
+#include <algorithm>
+#include <cstddef>
+#include <stdexcept>
+
+// Невладеющее представление квадратной матрицы n x n с произвольными шагами (в элементах).
+template <typename T>
+struct MatrixView {
+    T* data;
+    int n;
+    std::ptrdiff_t row_stride, col_stride;
+
+    T& operator()(int i, int j) const { return data[i * row_stride + j * col_stride]; }
+};
+
+template <typename T>
+MatrixView<const T> make_view(const pybind11::array_t<T>& arr) {
+    if (arr.ndim() != 2 || arr.shape(0) != arr.shape(1))
+        throw std::invalid_argument("matrix must be a square 2-D array");
+    if (arr.strides(0) % static_cast<pybind11::ssize_t>(sizeof(T)) != 0 ||
+        arr.strides(1) % static_cast<pybind11::ssize_t>(sizeof(T)) != 0)
+        throw std::invalid_argument("matrix strides must be multiples of the element size");
+    return {arr.data(), static_cast<int>(arr.shape(0)),
+            static_cast<std::ptrdiff_t>(arr.strides(0) / sizeof(T)),
+            static_cast<std::ptrdiff_t>(arr.strides(1) / sizeof(T))};
+}
+
+// Поэлементно переносит src в dst с преобразованием op. Обход идет плитками, поэтому
+// при разных раскладках источника и приемника обе стороны читаются целыми строками кэша.
+template <typename T, typename U, typename Op>
+void copy_tiled(const MatrixView<const T>& src, const MatrixView<U>& dst, Op op) {
+    const int TILE = 32;
+    int n = src.n;
+    for (int i0 = 0; i0 < n; i0 += TILE) {
+        int i1 = std::min(i0 + TILE, n);
+        for (int j0 = 0; j0 < n; j0 += TILE) {
+            int j1 = std::min(j0 + TILE, n);
+            for (int i = i0; i < i1; i++)
+                for (int j = j0; j < j1; j++) dst(i, j) = op(src(i, j));
+        }
+    }
+}
+
+// true, если соседние строки одного столбца лежат в памяти подряд (Fortran-порядок)
+template <typename T>
+bool is_column_major(const MatrixView<T>& mat) { return mat.row_stride == 1 && mat.n > 1; }
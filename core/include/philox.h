@@ -0,0 +1,66 @@
+#pragma once
+#include <cstdint>
+
+// Счетчиковый генератор Philox4x32-10 (Salmon et al., "Parallel random numbers: as easy as 1, 2, 3").
+// Выход - чистая функция (счетчик, ключ), поэтому любое случайное число доступно за O(1).
+struct Philox4x32 {
+    std::uint32_t v[4];
+
+    static Philox4x32 block(std::uint32_t c0, std::uint32_t c1, std::uint32_t c2, std::uint32_t c3,
+                            std::uint32_t k0, std::uint32_t k1) {
+        const std::uint32_t M0 = 0xD2511F53u, M1 = 0xCD9E8D57u;
+        const std::uint32_t W0 = 0x9E3779B9u, W1 = 0xBB67AE85u;
+        for (int round = 0; round < 10; round++) {
+            std::uint64_t p0 = static_cast<std::uint64_t>(M0) * c0;
+            std::uint64_t p1 = static_cast<std::uint64_t>(M1) * c2;
+            std::uint32_t hi0 = static_cast<std::uint32_t>(p0 >> 32), lo0 = static_cast<std::uint32_t>(p0);
+            std::uint32_t hi1 = static_cast<std::uint32_t>(p1 >> 32), lo1 = static_cast<std::uint32_t>(p1);
+            c0 = hi1 ^ c1 ^ k0;
+            c1 = lo1;
+            c2 = hi0 ^ c3 ^ k1;
+            c3 = lo0;
+            k0 += W0;
+            k1 += W1;
+        }
+        return {{c0, c1, c2, c3}};
+    }
+};
+
+// Поток случайных чисел одного эксперимента: draw d -> число в [0, 1).
+// Один блок Philox дает два 53-битных double, последний блок кэшируется.
+class PhiloxStream {
+public:
+    PhiloxStream(std::uint64_t seed, std::uint64_t experiment)
+        : k0(static_cast<std::uint32_t>(seed)), k1(static_cast<std::uint32_t>(seed >> 32)),
+          e0(static_cast<std::uint32_t>(experiment)), e1(static_cast<std::uint32_t>(experiment >> 32)) {}
+
+    double at(std::uint64_t draw) {
+        std::uint64_t b = draw >> 1;
+        if (b != cached_block) {
+            cached = Philox4x32::block(static_cast<std::uint32_t>(b), static_cast<std::uint32_t>(b >> 32),
+                                       e0, e1, k0, k1);
+            cached_block = b;
+        }
+        const std::uint32_t* w = cached.v + 2 * (draw & 1);
+        return ((w[0] >> 5) * 67108864.0 + (w[1] >> 6)) * (1.0 / 9007199254740992.0);
+    }
+
+private:
+    std::uint32_t k0, k1, e0, e1;
+    std::uint64_t cached_block = ~0ULL;
+    Philox4x32 cached{};
+};
+
+// Перемешивание splitmix64: из (seed, i) получается независимый 64-битный ключ потока.
+inline std::uint64_t splitmix64(std::uint64_t seed, std::uint64_t stream) {
+    std::uint64_t z = seed + 0x9E3779B97F4A7C15ULL * (stream + 1);
+    z = (z ^ (z >> 30)) * 0xBF58476D1CE4E5B9ULL;
+    z = (z ^ (z >> 27)) * 0x94D049BB133111EBULL;
+    return z ^ (z >> 31);
+}
+
+// seed дочернего потока (spawn): 63 бита, как у автоматического seed, — его можно ввести в GUI
+// и сохранить в истории (INTEGER SQLite).
+inline std::uint64_t derive_seed(std::uint64_t seed, std::uint64_t stream) {
+    return splitmix64(seed, stream) & 0x7FFFFFFFFFFFFFFFULL;
+}
@@ -0,0 +1,41 @@
+#pragma once
+#include <pybind11/numpy.h>
+#include <limits>
+#include <tuple>
+
+namespace py = pybind11;
+
+// Потоковая статистика выборки за O(1) памяти: число, среднее, сумма квадратов
+// отклонений (Уэлфорд), минимум и максимум. Две статистики сливаются формулой Чана,
+// поэтому блоки, потоки и шарды считаются независимо и объединяются в любом порядке
+// с точностью до округления (при фиксированном порядке слияния - побитово воспроизводимо).
+struct RunningStats {
+    long long count = 0;
+    double mean = 0.0;
+    double m2 = 0.0;
+    double min = std::numeric_limits<double>::infinity();
+    double max = -std::numeric_limits<double>::infinity();
+
+    void add(double x) {
+        count++;
+        double delta = x - mean;
+        mean += delta / count;
+        m2 += delta * (x - mean);
+        if (x < min) min = x;
+        if (x > max) max = x;
+    }
+
+    void merge(const RunningStats& other);
+
+    // Несмещенная дисперсия (ddof=1); 0 при count < 2
+    double variance() const { return count > 1 ? m2 / (count - 1) : 0.0; }
+    double std() const;
+    // Стандартная ошибка среднего
+    double sem() const;
+
+    void add_array(const py::array_t<double, py::array::c_style | py::array::forcecast>& values);
+
+    using State = std::tuple<long long, double, double, double, double>;
+    State state() const { return {count, mean, m2, min, max}; }
+    static RunningStats from_state(const State& s);
+};
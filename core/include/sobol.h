@@ -0,0 +1,37 @@
+#pragma once
+#include <cstdint>
+#include <memory>
+#include <vector>
+
+// Перемешанная последовательность Соболя (рандомизированный квази-Монте-Карло).
+// Размерность d строится по d-му примитивному многочлену над GF(2) (по возрастанию степени,
+// затем значения) со случайными нечетными начальными числами m_k из фиксированного потока
+// Philox, поэтому таблица одна и та же на любой машине. Перемешивание - линейное (LMS,
+// нижнетреугольная матрица с единичной диагональю) и цифровой сдвиг, оба из seed:
+// при каждом seed получается своя равномерно распределенная копия последовательности.
+constexpr int SOBOL_MAX_DIMS = 4096;
+constexpr int SOBOL_BITS = 32;
+
+class SobolTable {
+public:
+    SobolTable(std::uint64_t seed, int dims);
+
+    int dims() const { return dims_; }
+
+    // Координата dim точки index (index берется по модулю 2^32) в (0, 1)
+    double at(std::uint64_t index, int dim) const {
+        const std::uint32_t* v = directions_.data() + static_cast<std::size_t>(dim) * SOBOL_BITS;
+        std::uint32_t x = shifts_[dim];
+        for (std::uint32_t bits = static_cast<std::uint32_t>(index); bits; bits >>= 1, v++)
+            if (bits & 1) x ^= *v;
+        return x * (1.0 / 4294967296.0) + (1.0 / 8589934592.0);
+    }
+
+private:
+    int dims_;
+    std::vector<std::uint32_t> directions_;
+    std::vector<std::uint32_t> shifts_;
+};
+
+// Неперемешанные направляющие числа: SOBOL_BITS чисел на размерность
+const std::vector<std::uint32_t>& sobol_directions();
@@ -0,0 +1,101 @@
+#include "allHeuristics.h"
+#include "batch.h"
+#include <algorithm>
+#include <limits>
+#include <numeric>
+#include <vector>
+
+const std::array<const char*, STRATEGY_COUNT> STRATEGY_NAMES = {
+    "greedy", "thrifty", "median", "greedy_thrifty", "thrifty_greedy"
+};
+
+// Стратегии "максимум или минимум по свободным строкам столбца j". Новая стратегия
+// такого вида добавляется одной строкой таблицы: правило выбора и слот в результате.
+struct ExtremeRule {
+    bool (*take_max)(int j, int v);
+    int slot;
+};
+
+static const ExtremeRule EXTREME_RULES[] = {
+    {[](int, int) { return true; },      0},  // greedy
+    {[](int, int) { return false; },     1},  // thrifty
+    {[](int j, int v) { return j < v; }, 3},  // greedy_thrifty
+    {[](int j, int v) { return j >= v; }, 4}, // thrifty_greedy
+};
+constexpr int EXTREME_COUNT = sizeof(EXTREME_RULES) / sizeof(EXTREME_RULES[0]);
+constexpr int MEDIAN_SLOT = 2;
+constexpr unsigned char MEDIAN_BIT = 1u << EXTREME_COUNT;
+
+// Один проход по каждому столбцу обновляет состояние всех пяти стратегий сразу.
+// Бит r в available[i] означает, что строка i еще свободна для стратегии r.
+// Выбор (включая разрешение равенств) и порядок суммирования совпадают с run_greedy и др.
+// rows - строки, свободные хотя бы для одной стратегии, по возрастанию индекса; строки,
+// занятые всеми стратегиями, выбрасываются из списка во время следующего прохода.
+template <typename T>
+void all_heuristics_totals(const MatrixView<const T>& mat, int v, double* totals) {
+    int n = mat.n;
+    std::vector<unsigned char> available(n, static_cast<unsigned char>((MEDIAN_BIT << 1) - 1));
+    std::vector<int> rows(n);
+    std::iota(rows.begin(), rows.end(), 0);
+    std::vector<std::pair<T, int>> candidates;
+    candidates.reserve(n);
+    std::fill(totals, totals + STRATEGY_COUNT, 0.0);
+    bool median_done = false;
+
+    for (int j = 0; j < n; j++) {
+        bool take_max[EXTREME_COUNT];
+        T best_val[EXTREME_COUNT];
+        int best_row[EXTREME_COUNT];
+        for (int r = 0; r < EXTREME_COUNT; r++) {
+            take_max[r] = EXTREME_RULES[r].take_max(j, v);
+            best_val[r] = take_max[r] ? T(-1) : std::numeric_limits<T>::max();
+            best_row[r] = -1;
+        }
+        candidates.clear();
+
+        size_t kept = 0;
+        for (size_t k = 0; k < rows.size(); k++) {
+            int i = rows[k];
+            unsigned char mask = available[i];
+            if (!mask) continue;
+            rows[kept++] = i;
+            T val = mat(i, j);
+            for (int r = 0; r < EXTREME_COUNT; r++) {
+                if (!(mask & (1u << r))) continue;
+                if (take_max[r] ? (val > best_val[r]) : (val < best_val[r])) {
+                    best_val[r] = val;
+                    best_row[r] = i;
+                }
+            }
+            if (mask & MEDIAN_BIT) candidates.push_back({val, i});
+        }
+        rows.resize(kept);
+
+        for (int r = 0; r < EXTREME_COUNT; r++) {
+            if (best_row[r] != -1) {
+                totals[EXTREME_RULES[r].slot] += best_val[r];
+                available[best_row[r]] &= static_cast<unsigned char>(~(1u << r));
+            }
+        }
+
+        if (median_done || candidates.empty()) {
+            median_done = true;
+            continue;
+        }
+        size_t mid = candidates.size() / 2;
+        std::nth_element(candidates.begin(), candidates.begin() + mid, candidates.end());
+        totals[MEDIAN_SLOT] += candidates[mid].first;
+        available[candidates[mid].second] &= static_cast<unsigned char>(~MEDIAN_BIT);
+    }
+}
+
+template <typename T>
+pybind11::array_t<double> run_all_heuristics(pybind11::array_t<T> input_matrix, int v) {
+    return map_vectors(input_matrix, STRATEGY_COUNT,
+                       [v](const MatrixView<const T>& view, double* totals) { all_heuristics_totals(view, v, totals); });
+}
+
+template void all_heuristics_totals<double>(const MatrixView<const double>&, int, double*);
+template void all_heuristics_totals<float>(const MatrixView<const float>&, int, double*);
+template pybind11::array_t<double> run_all_heuristics<double>(pybind11::array_t<double>, int);
+template pybind11::array_t<double> run_all_heuristics<float>(pybind11::array_t<float>, int);
@@ -0,0 +1,135 @@
+#include "experiments.h"
+#include "matrixGenerator.h"
+#include "hungarian.h"
+#include "allHeuristics.h"
+#include "runningStats.h"
+#include <pybind11/numpy.h>
+#include <algorithm>
+#include <array>
+#include <atomic>
+#include <thread>
+#include <vector>
+
+// Эксперименты делятся на блоки фиксированного размера, не зависящего от числа потоков.
+// Потоки разбирают блоки динамически, а частичные результаты склеиваются в порядке блоков,
+// поэтому итог побитово совпадает с последовательным прогоном при том же seed.
+// Статистики (runningStats.h) тоже считаются по блокам и сливаются в порядке блоков.
+static const long long BLOCK_SIZE = 256;
+
+// Разности потерь для всех пар стратегий (a < b в порядке STRATEGY_NAMES) в одном
+// эксперименте: по ним парный критерий сравнивает стратегии на одних и тех же матрицах
+static const int PAIR_COUNT = STRATEGY_COUNT * (STRATEGY_COUNT - 1) / 2;
+
+struct BlockResult {
+    std::array<std::vector<double>, STRATEGY_COUNT> losses;
+    std::array<RunningStats, STRATEGY_COUNT> stats;
+    std::array<RunningStats, PAIR_COUNT> pair_stats;
+    long long skipped = 0;
+};
+
+template <typename T>
+static void run_block(const MatrixGenerator& generator, int v, ExactEngine engine, long long first, long long last,
+                      bool keep_losses, std::vector<T>& buffer, BlockResult& out) {
+    int n = generator.n;
+    // Буфер в Fortran-порядке: генератор и эвристики идут по столбцам подряд,
+    // а точные решатели сами переносят матрицу в свою раскладку
+    MatrixView<T> mat{buffer.data(), n, 1, n};
+    MatrixView<const T> cmat{buffer.data(), n, 1, n};
+
+    for (long long k = first; k < last; k++) {
+        generator.fill_experiment(k, mat);
+        double S_opt = exact_total(cmat, engine);
+        if (S_opt <= 1e-9) { out.skipped++; continue; }
+
+        std::array<double, STRATEGY_COUNT> totals, losses;
+        all_heuristics_totals(cmat, v, totals.data());
+        for (size_t s = 0; s < totals.size(); s++) {
+            losses[s] = (S_opt - totals[s]) / S_opt * 100.0;
+            out.stats[s].add(losses[s]);
+            if (keep_losses) out.losses[s].push_back(losses[s]);
+        }
+        for (int a = 0, p = 0; a < STRATEGY_COUNT; a++)
+            for (int b = a + 1; b < STRATEGY_COUNT; b++, p++)
+                out.pair_stats[p].add(losses[a] - losses[b]);
+    }
+}
+
+py::dict run_experiments(py::dict params, long long T, int threads, long long start, bool keep_losses) {
+    MatrixGenerator generator(params);
+    int n = generator.n;
+    int v = params.contains("v") ? params["v"].cast<int>() : 0;
+    ExactEngine engine = parse_exact_engine(
+        params.contains("exact_engine") ? params["exact_engine"].cast<std::string>() : "hungarian");
+    if (T < 0) T = 0;
+
+    long long num_blocks = (T + BLOCK_SIZE - 1) / BLOCK_SIZE;
+    std::vector<BlockResult> blocks(static_cast<size_t>(num_blocks));
+
+    if (threads <= 0) threads = static_cast<int>(std::max(1u, std::thread::hardware_concurrency()));
+    threads = static_cast<int>(std::min<long long>(threads, std::max(1LL, num_blocks)));
+
+    std::atomic<long long> next_block(0);
+    auto run_blocks = [&](auto& buffer) {
+        buffer.resize(static_cast<size_t>(n) * n);
+        for (long long b = next_block++; b < num_blocks; b = next_block++) {
+            long long first = start + b * BLOCK_SIZE;
+            long long last = std::min(first + BLOCK_SIZE, start + T);
+            run_block(generator, v, engine, first, last, keep_losses, buffer, blocks[b]);
+        }
+    };
+    auto worker = [&]() {
+        if (generator.single_precision) {
+            std::vector<float> buffer;
+            run_blocks(buffer);
+        } else {
+            std::vector<double> buffer;
+            run_blocks(buffer);
+        }
+    };
+
+    {
+        py::gil_scoped_release release;
+        if (threads == 1) {
+            worker();
+        } else {
+            std::vector<std::thread> pool;
+            pool.reserve(threads);
+            for (int t = 0; t < threads; t++) pool.emplace_back(worker);
+            for (auto& th : pool) th.join();
+        }
+    }
+
+    long long skipped = 0;
+    py::dict per_strategy, stats;
+    for (size_t s = 0; s < STRATEGY_COUNT; s++) {
+        RunningStats merged;
+        for (const auto& b : blocks) merged.merge(b.stats[s]);
+        stats[STRATEGY_NAMES[s]] = merged;
+
+        size_t total = 0;
+        for (const auto& b : blocks) total += b.losses[s].size();
+        py::array_t<double> arr(total);
+        double* dst = arr.mutable_data();
+        for (const auto& b : blocks) dst = std::copy(b.losses[s].begin(), b.losses[s].end(), dst);
+        per_strategy[STRATEGY_NAMES[s]] = arr;
+    }
+    py::dict pair_stats;
+    for (int a = 0, p = 0; a < STRATEGY_COUNT; a++) {
+        for (int b = a + 1; b < STRATEGY_COUNT; b++, p++) {
+            RunningStats merged;
+            for (const auto& block : blocks) merged.merge(block.pair_stats[p]);
+            pair_stats[py::make_tuple(STRATEGY_NAMES[a], STRATEGY_NAMES[b])] = merged;
+        }
+    }
+    for (const auto& b : blocks) skipped += b.skipped;
+
+    py::dict result;
+    result["losses"] = per_strategy;
+    result["stats"] = stats;
+    result["pair_stats"] = pair_stats;
+    result["skipped"] = skipped;
+    result["count"] = T;
+    result["seed"] = generator.seed;
+    result["dtype"] = generator.single_precision ? "float32" : "float64";
+    return result;
+}
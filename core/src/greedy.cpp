@@ -1,25 +1,41 @@
 #include "greedy.h"
+#include "batch.h"
+#include <numeric>
 #include <vector>
 
-double run_greedy(pybind11::array_t<double> input_matrix) {
-    auto mat = input_matrix.unchecked<2>();
-    int n = static_cast<int>(mat.shape(0));
-    std::vector<bool> available(n, true);
+template <typename T>
+double greedy_total(const MatrixView<const T>& mat) {
+    int n = mat.n;
+    // Свободные строки по возрастанию индекса: столбец j просматривает n - j строк,
+    // а первый максимум по порядку обхода совпадает с прежним выбором при равенствах.
+    std::vector<int> rows(n);
+    std::iota(rows.begin(), rows.end(), 0);
     double total = 0;
 
     for (int j = 0; j < n; j++) {
-        double max_val = -1.0;
-        int best_row = -1;
-        for (int i = 0; i < n; i++) {
-            if (available[i] && mat(i, j) > max_val) {
-                max_val = mat(i, j);
-                best_row = i;
+        T max_val = -1;
+        int best_pos = -1;
+        for (int k = 0; k < (int)rows.size(); k++) {
+            T val = mat(rows[k], j);
+            if (val > max_val) {
+                max_val = val;
+                best_pos = k;
             }
         }
-        if (best_row != -1) {
+        if (best_pos != -1) {
             total += max_val;
-            available[best_row] = false;
+            rows.erase(rows.begin() + best_pos);
         }
     }
     return total;
-}
\ No newline at end of file
+}
+
+template <typename T>
+pybind11::object run_greedy(pybind11::array_t<T> input_matrix) {
+    return map_totals(input_matrix, [](const MatrixView<const T>& view) { return greedy_total(view); });
+}
+
+template double greedy_total<double>(const MatrixView<const double>&);
+template double greedy_total<float>(const MatrixView<const float>&);
+template pybind11::object run_greedy<double>(pybind11::array_t<double>);
+template pybind11::object run_greedy<float>(pybind11::array_t<float>);
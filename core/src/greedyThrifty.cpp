@@ -1,32 +1,43 @@
 #include "greedyThrifty.h"
-#include <vector>
+#include "batch.h"
 #include <limits>
+#include <numeric>
+#include <vector>
 
-double run_greedy_thrifty(pybind11::array_t<double> input_matrix, int v) {
-    auto mat = input_matrix.unchecked<2>();
-    int n = static_cast<int>(mat.shape(0)); 
-    std::vector<bool> available(n, true);
+template <typename T>
+double greedy_thrifty_total(const MatrixView<const T>& mat, int v) {
+    int n = mat.n; 
+    std::vector<int> rows(n);
+    std::iota(rows.begin(), rows.end(), 0);
     double total = 0;
 
     for (int j = 0; j < n; j++) {
         bool use_greedy = (j < v);
-        int best_row = -1;
-        double best_val = use_greedy ? -1.0 : std::numeric_limits<double>::max();
+        int best_pos = -1;
+        T best_val = use_greedy ? T(-1) : std::numeric_limits<T>::max();
 
-        for (int i = 0; i < n; i++) {
-            if (available[i]) {
-                double val = mat(i, j);
-                if (use_greedy) {
-                    if (val > best_val) { best_val = val; best_row = i; }
-                } else {
-                    if (val < best_val) { best_val = val; best_row = i; }
-                }
+        for (int k = 0; k < (int)rows.size(); k++) {
+            T val = mat(rows[k], j);
+            if (use_greedy) {
+                if (val > best_val) { best_val = val; best_pos = k; }
+            } else {
+                if (val < best_val) { best_val = val; best_pos = k; }
             }
         }
-        if (best_row != -1) {
+        if (best_pos != -1) {
             total += best_val;
-            available[best_row] = false;
+            rows.erase(rows.begin() + best_pos);
         }
     }
     return total;
-}
\ No newline at end of file
+}
+
+template <typename T>
+pybind11::object run_greedy_thrifty(pybind11::array_t<T> input_matrix, int v) {
+    return map_totals(input_matrix, [v](const MatrixView<const T>& view) { return greedy_thrifty_total(view, v); });
+}
+
+template double greedy_thrifty_total<double>(const MatrixView<const double>&, int);
+template double greedy_thrifty_total<float>(const MatrixView<const float>&, int);
+template pybind11::object run_greedy_thrifty<double>(pybind11::array_t<double>, int);
+template pybind11::object run_greedy_thrifty<float>(pybind11::array_t<float>, int);
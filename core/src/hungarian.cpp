@@ -1,34 +1,51 @@
 #include "hungarian.h"
-#include <vector>
+#include "lapjv.h"
+#include "batch.h"
+#include <algorithm>
+#include <cmath>
 #include <limits>
+#include <stdexcept>
 
-double solve_exact(pybind11::array_t<double> input_matrix) {
-    auto mat = input_matrix.unchecked<2>();
-    int n = static_cast<int>(mat.shape(0)); 
-    std::vector<double> u(n + 1, 0), v(n + 1, 0);
-    std::vector<int> p(n + 1, 0), way(n + 1, 0);
+template <typename T>
+double BasicHungarianSolver<T>::solve(const MatrixView<const T>& mat) {
+    n = mat.n;
+    size_t nn = static_cast<size_t>(n);
+    cost.resize(nn * nn);
+    copy_tiled(mat, MatrixView<T>{cost.data(), n, n, 1}, [](T x) { return -x; });
+    u.assign(nn + 1, 0);
+    v.assign(nn + 1, 0);
+    p.assign(nn + 1, 0);
+    way.assign(nn + 1, 0);
+    minv.resize(nn + 1);
+    free_cols.reserve(nn);
+    used_cols.reserve(nn + 1);
 
+    // Свободные столбцы хранятся отсортированным списком: обход идет в том же порядке,
+    // что и проверка used[j] по всем столбцам, но без ветвлений по уже занятым.
     for (int i = 1; i <= n; ++i) {
         p[0] = i;
         int j0 = 0;
-        std::vector<double> minv(n + 1, std::numeric_limits<double>::infinity());
-        std::vector<bool> used(n + 1, false);
+        std::fill(minv.begin(), minv.end(), std::numeric_limits<double>::infinity());
+        free_cols.clear();
+        for (int j = 1; j <= n; ++j) free_cols.push_back(j);
+        used_cols.clear();
 
         do {
-            used[j0] = true;
+            used_cols.push_back(j0);
             int i0 = p[j0], j1 = 0;
+            size_t j1_pos = 0;
             double delta = std::numeric_limits<double>::infinity();
-            for (int j = 1; j <= n; ++j) {
-                if (!used[j]) {
-                    double cur = -mat(i0 - 1, j - 1) - u[i0] - v[j];
-                    if (cur < minv[j]) { minv[j] = cur; way[j] = j0; }
-                    if (minv[j] < delta) { delta = minv[j]; j1 = j; }
-                }
-            }
-            for (int j = 0; j <= n; ++j) {
-                if (used[j]) { u[p[j]] += delta; v[j] -= delta; }
-                else minv[j] -= delta;
+            const T* row = &cost[static_cast<size_t>(i0 - 1) * nn] - 1;
+            double ui0 = u[i0];
+            for (size_t k = 0; k < free_cols.size(); ++k) {
+                int j = free_cols[k];
+                double cur = row[j] - ui0 - v[j];
+                if (cur < minv[j]) { minv[j] = cur; way[j] = j0; }
+                if (minv[j] < delta) { delta = minv[j]; j1 = j; j1_pos = k; }
             }
+            for (int j : used_cols) { u[p[j]] += delta; v[j] -= delta; }
+            for (int j : free_cols) minv[j] -= delta;
+            free_cols.erase(free_cols.begin() + j1_pos);
             j0 = j1;
         } while (p[j0] != 0);
 
@@ -39,4 +56,70 @@ double solve_exact(pybind11::array_t<double> input_matrix) {
         } while (j0);
     }
     return std::abs(v[0]);
-}
\ No newline at end of file
+}
+
+template <typename T>
+double BasicHungarianSolver<T>::solve_array(pybind11::array_t<T> input_matrix) {
+    auto view = make_view(input_matrix);
+    pybind11::gil_scoped_release release;
+    return solve(view);
+}
+
+// Строка i -> столбец, назначенный ей в последнем решении.
+template <typename T>
+pybind11::array_t<long long> BasicHungarianSolver<T>::assignment() const {
+    pybind11::array_t<long long> result(n);
+    long long* out = result.mutable_data();
+    for (int j = 1; j <= n; j++) out[p[j] - 1] = j - 1;
+    return result;
+}
+
+// Потенциалы двойственной задачи максимизации: r[i] + c[j] >= a[i][j],
+// равенство на назначении, сумма потенциалов равна оптимуму.
+template <typename T>
+pybind11::array_t<double> BasicHungarianSolver<T>::row_potentials() const {
+    pybind11::array_t<double> result(n);
+    double* out = result.mutable_data();
+    for (int i = 1; i <= n; i++) out[i - 1] = -u[i];
+    return result;
+}
+
+template <typename T>
+pybind11::array_t<double> BasicHungarianSolver<T>::col_potentials() const {
+    pybind11::array_t<double> result(n);
+    double* out = result.mutable_data();
+    for (int j = 1; j <= n; j++) out[j - 1] = -v[j];
+    return result;
+}
+
+template <typename T>
+double hungarian_total(const MatrixView<const T>& mat) {
+    thread_local BasicHungarianSolver<T> solver;
+    return solver.solve(mat);
+}
+
+ExactEngine parse_exact_engine(const std::string& name) {
+    if (name == "hungarian") return ExactEngine::Hungarian;
+    if (name == "lapjv") return ExactEngine::Lapjv;
+    throw std::invalid_argument("unknown exact engine '" + name + "' (expected 'hungarian' or 'lapjv')");
+}
+
+template <typename T>
+double exact_total(const MatrixView<const T>& mat, ExactEngine engine) {
+    return engine == ExactEngine::Lapjv ? lapjv_total(mat) : hungarian_total(mat);
+}
+
+template <typename T>
+pybind11::object solve_exact(pybind11::array_t<T> input_matrix, const std::string& engine) {
+    ExactEngine kind = parse_exact_engine(engine);
+    return map_totals(input_matrix, [kind](const MatrixView<const T>& view) { return exact_total(view, kind); });
+}
+
+template class BasicHungarianSolver<double>;
+template class BasicHungarianSolver<float>;
+template double hungarian_total<double>(const MatrixView<const double>&);
+template double hungarian_total<float>(const MatrixView<const float>&);
+template double exact_total<double>(const MatrixView<const double>&, ExactEngine);
+template double exact_total<float>(const MatrixView<const float>&, ExactEngine);
+template pybind11::object solve_exact<double>(pybind11::array_t<double>, const std::string&);
+template pybind11::object solve_exact<float>(pybind11::array_t<float>, const std::string&);
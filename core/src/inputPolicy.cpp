@@ -0,0 +1,25 @@
+#include "inputPolicy.h"
+#include <atomic>
+#include <string>
+
+static std::atomic<bool> strict_mode(false);
+static std::atomic<long long> conversions(0);
+
+void set_strict_inputs(bool enabled) { strict_mode = enabled; }
+bool strict_inputs() { return strict_mode; }
+long long input_conversions() { return conversions; }
+void reset_input_conversions() { conversions = 0; }
+
+py::array_t<double> coerce_matrix(const py::object& matrix) {
+    if (strict_mode) {
+        std::string kind = py::str(py::type::of(matrix));
+        if (py::isinstance<py::array>(matrix))
+            kind = "array of dtype " + std::string(py::str(matrix.attr("dtype")));
+        throw py::type_error("strict inputs: expected a float64 or float32 array in native byte order, got " +
+                             kind + "; convert it explicitly");
+    }
+    auto converted = py::array_t<double>::ensure(matrix);
+    if (!converted) throw py::type_error("matrix must be convertible to a float64 array");
+    conversions++;
+    return converted;
+}
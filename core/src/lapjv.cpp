@@ -0,0 +1,176 @@
+#include "lapjv.h"
+#include <limits>
+
+template <typename T>
+double LapjvSolver<T>::solve(const MatrixView<const T>& mat) {
+    n = mat.n;
+    if (n == 0) return 0.0;
+    size_t nn = static_cast<size_t>(n);
+    cost.resize(nn * nn);
+    copy_tiled(mat, MatrixView<T>{cost.data(), n, n, 1}, [](T x) { return -x; });
+    if (n == 1) return -cost[0];
+
+    auto c = [&](int i, int j) -> double { return cost[static_cast<size_t>(i) * nn + j]; };
+    const double BIG = std::numeric_limits<double>::infinity();
+
+    v.assign(nn, 0.0);
+    d.resize(nn);
+    rowsol.assign(nn, -1);
+    colsol.assign(nn, -1);
+    matches.assign(nn, 0);
+    free_rows.resize(nn);
+    collist.resize(nn);
+    pred.resize(nn);
+
+    // Редукция столбцов
+    for (int j = n - 1; j >= 0; j--) {
+        double min = c(0, j);
+        int imin = 0;
+        for (int i = 1; i < n; i++) {
+            if (c(i, j) < min) { min = c(i, j); imin = i; }
+        }
+        v[j] = min;
+        if (++matches[imin] == 1) {
+            rowsol[imin] = j;
+            colsol[j] = imin;
+        } else if (v[j] < v[rowsol[imin]]) {
+            int j1 = rowsol[imin];
+            rowsol[imin] = j;
+            colsol[j] = imin;
+            colsol[j1] = -1;
+        } else {
+            colsol[j] = -1;
+        }
+    }
+
+    // Перенос редукции
+    int numfree = 0;
+    for (int i = 0; i < n; i++) {
+        if (matches[i] == 0) {
+            free_rows[numfree++] = i;
+        } else if (matches[i] == 1) {
+            int j1 = rowsol[i];
+            double min = BIG;
+            for (int j = 0; j < n; j++) {
+                if (j != j1 && c(i, j) - v[j] < min) min = c(i, j) - v[j];
+            }
+            v[j1] -= min;
+        }
+    }
+
+    // Аугментирующая редукция строк (две фазы). Число повторных попыток для вытесненной
+    // строки ограничено, чтобы сколь угодно малые шаги по v не зацикливали фазу.
+    for (int loopcnt = 0; loopcnt < 2; loopcnt++) {
+        int k = 0, prvnumfree = numfree;
+        long long steps = 0, max_steps = n;
+        numfree = 0;
+        while (k < prvnumfree) {
+            int i = free_rows[k++];
+            double umin = c(i, 0) - v[0], usubmin = BIG;
+            int j1 = 0, j2 = 0;
+            for (int j = 1; j < n; j++) {
+                double h = c(i, j) - v[j];
+                if (h < usubmin) {
+                    if (h >= umin) { usubmin = h; j2 = j; }
+                    else { usubmin = umin; umin = h; j2 = j1; j1 = j; }
+                }
+            }
+            int i0 = colsol[j1];
+            bool strict = umin < usubmin;
+            if (strict) v[j1] -= usubmin - umin;
+            else if (i0 >= 0) { j1 = j2; i0 = colsol[j2]; }
+            if (i0 >= 0) rowsol[i0] = -1;
+            rowsol[i] = j1;
+            colsol[j1] = i;
+            if (i0 >= 0) {
+                if (strict && ++steps < max_steps) free_rows[--k] = i0;
+                else free_rows[numfree++] = i0;
+            }
+        }
+    }
+
+    // Аугментация кратчайшими путями (Дейкстра по редуцированным стоимостям)
+    for (int f = 0; f < numfree; f++) {
+        int freerow = free_rows[f];
+        for (int j = 0; j < n; j++) {
+            d[j] = c(freerow, j) - v[j];
+            pred[j] = freerow;
+            collist[j] = j;
+        }
+        int low = 0, up = 0, last = 0, endofpath = -1;
+        double min = 0;
+        bool unassignedfound = false;
+        do {
+            if (up == low) {
+                last = low - 1;
+                min = d[collist[up++]];
+                for (int k = up; k < n; k++) {
+                    int j = collist[k];
+                    double h = d[j];
+                    if (h <= min) {
+                        if (h < min) { up = low; min = h; }
+                        collist[k] = collist[up];
+                        collist[up++] = j;
+                    }
+                }
+                for (int k = low; k < up; k++) {
+                    if (colsol[collist[k]] < 0) {
+                        endofpath = collist[k];
+                        unassignedfound = true;
+                        break;
+                    }
+                }
+            }
+            if (!unassignedfound) {
+                int j1 = collist[low++];
+                int i = colsol[j1];
+                double h = c(i, j1) - v[j1] - min;
+                for (int k = up; k < n; k++) {
+                    int j = collist[k];
+                    double v2 = c(i, j) - v[j] - h;
+                    if (v2 < d[j]) {
+                        pred[j] = i;
+                        if (v2 == min) {
+                            if (colsol[j] < 0) {
+                                endofpath = j;
+                                unassignedfound = true;
+                                break;
+                            }
+                            collist[k] = collist[up];
+                            collist[up++] = j;
+                        }
+                        d[j] = v2;
+                    }
+                }
+            }
+        } while (!unassignedfound);
+
+        for (int k = 0; k <= last; k++) {
+            int j1 = collist[k];
+            v[j1] += d[j1] - min;
+        }
+        int i;
+        do {
+            i = pred[endofpath];
+            colsol[endofpath] = i;
+            int j1 = endofpath;
+            endofpath = rowsol[i];
+            rowsol[i] = j1;
+        } while (i != freerow);
+    }
+
+    double total = 0;
+    for (int i = 0; i < n; i++) total -= c(i, rowsol[i]);
+    return total;
+}
+
+template <typename T>
+double lapjv_total(const MatrixView<const T>& mat) {
+    thread_local LapjvSolver<T> solver;
+    return solver.solve(mat);
+}
+
+template class LapjvSolver<double>;
+template class LapjvSolver<float>;
+template double lapjv_total<double>(const MatrixView<const double>&);
+template double lapjv_total<float>(const MatrixView<const float>&);
@@ -1,8 +1,12 @@
 #include "matrixGenerator.h"
+#include "philox.h"
+#include <algorithm>
 #include <cmath>
+#include <random>
+#include <stdexcept>
 #include <vector>
 
-MatrixGenerator::MatrixGenerator(py::dict params) : gen(std::random_device{}()) {
+MatrixGenerator::MatrixGenerator(py::dict params) {
     n = params["n"].cast<int>();
     alpha_min = params["alpha_min"].cast<double>();
     alpha_max = params["alpha_max"].cast<double>();
@@ -13,53 +17,239 @@ MatrixGenerator::MatrixGenerator(py::dict params) : gen(std::random_device{}())
     v = use_ripening ? params["v"].cast<int>() : 0;
     beta_max = use_ripening ? params["beta_max"].cast<double>() : 1.0;
     use_inorganic = params["use_inorganic"].cast<bool>();
+
+    std::string layout = params.contains("layout") ? params["layout"].cast<std::string>() : "C";
+    if (layout != "C" && layout != "F") throw std::invalid_argument("layout must be 'C' or 'F'");
+    column_major = (layout == "F");
+
+    std::string dtype = params.contains("dtype") ? params["dtype"].cast<std::string>() : "float64";
+    if (dtype != "float64" && dtype != "float32") throw std::invalid_argument("dtype must be 'float64' or 'float32'");
+    single_precision = (dtype == "float32");
+
+    std::string name = params.contains("sampler") ? params["sampler"].cast<std::string>() : "mc";
+    if (name == "mc") sampler = Sampler::MonteCarlo;
+    else if (name == "antithetic") sampler = Sampler::Antithetic;
+    else if (name == "sobol") sampler = Sampler::Sobol;
+    else throw std::invalid_argument("sampler must be 'mc', 'antithetic' or 'sobol'");
+
+    if (params.contains("seed") && !params["seed"].is_none()) {
+        seed = params["seed"].cast<std::uint64_t>();
+    } else {
+        // 63 бита: seed без потерь помещается в INTEGER SQLite
+        std::random_device rd;
+        seed = ((static_cast<std::uint64_t>(rd()) << 32) | rd()) & 0x7FFFFFFFFFFFFFFFULL;
+    }
+    init_sampler();
 }
 
-double MatrixGenerator::get_uniform(double min, double max) {
+// Перемешивание Соболя зависит от seed, поэтому таблица строится заново и в spawn
+void MatrixGenerator::init_sampler() {
+    sobol.reset();
+    if (sampler != Sampler::Sobol) return;
+    long long draws = 7LL * n + static_cast<long long>(n) * (n - 1);
+    sobol = std::make_shared<const SobolTable>(seed, static_cast<int>(std::min<long long>(draws, SOBOL_MAX_DIMS)));
+}
+
+const char* MatrixGenerator::sampler_name() const {
+    switch (sampler) {
+        case Sampler::Antithetic: return "antithetic";
+        case Sampler::Sobol: return "sobol";
+        default: return "mc";
+    }
+}
+
+// Числа эксперимента k: draw d -> [0, 1) с учетом sampler
+class ExperimentDraws {
+public:
+    ExperimentDraws(const MatrixGenerator& g, long long k)
+        : philox(g.seed, static_cast<std::uint64_t>(g.sampler == Sampler::Antithetic ? (k & ~1LL) : k)),
+          flip(g.sampler == Sampler::Antithetic && (k & 1)), sobol(g.sobol.get()),
+          index(static_cast<std::uint64_t>(k)) {}
+
+    double at(std::uint64_t draw) {
+        if (sobol && draw < static_cast<std::uint64_t>(sobol->dims()))
+            return sobol->at(index, static_cast<int>(draw));
+        double u = philox.at(draw);
+        return flip ? 1.0 - u : u;
+    }
+
+private:
+    PhiloxStream philox;
+    bool flip;
+    const SobolTable* sobol;
+    std::uint64_t index;
+};
+
+static double get_uniform(ExperimentDraws& gen, std::uint64_t draw, double min, double max) {
     if (min >= max) return min;
-    std::uniform_real_distribution<> dis(min, max);
-    return dis(gen);
+    return min + (max - min) * gen.at(draw);
+}
+
+py::array MatrixGenerator::generate() {
+    long long k = next_index++;
+    return generate_at(k);
+}
+
+template <typename T>
+static py::array_t<T> make_matrix(const MatrixGenerator& gen, long long k) {
+    int n = gen.n;
+    // В Fortran-порядке столбец, вдоль которого идут и генерация, и эвристики, лежит подряд
+    std::ptrdiff_t item = sizeof(T), line = static_cast<std::ptrdiff_t>(n) * item;
+    py::array_t<T> result({n, n}, gen.column_major ? std::vector<std::ptrdiff_t>{item, line}
+                                                   : std::vector<std::ptrdiff_t>{line, item});
+    MatrixView<T> view = gen.column_major ? MatrixView<T>{result.mutable_data(), n, 1, n}
+                                          : MatrixView<T>{result.mutable_data(), n, n, 1};
+    {
+        py::gil_scoped_release release;
+        gen.fill_experiment(k, view);
+    }
+    return result;
+}
+
+py::array MatrixGenerator::generate_at(long long k) const {
+    if (k < 0) throw std::out_of_range("experiment index must be non-negative");
+    if (single_precision) return make_matrix<float>(*this, k);
+    return make_matrix<double>(*this, k);
 }
 
-py::array_t<double> MatrixGenerator::generate() {
-    py::array_t<double> result({n, n});
-    auto mat = result.mutable_unchecked<2>();
+// Пакет (k, n, n) одним массивом; каждая матрица в раскладке генератора.
+// Числа Philox считаются поэкспериментно: вариант с k дорожками в структуре массивов
+// векторизуется компилятором хуже скалярного (замерено), а рекуррентность по столбцу
+// на фоне Philox почти ничего не стоит.
+template <typename T>
+static py::array_t<T> make_batch(const MatrixGenerator& gen, long long first, long long k) {
+    int n = gen.n;
+    std::ptrdiff_t item = sizeof(T), line = static_cast<std::ptrdiff_t>(n) * item;
+    std::ptrdiff_t plane = static_cast<std::ptrdiff_t>(n) * line;
+    py::array_t<T> result({static_cast<py::ssize_t>(k), static_cast<py::ssize_t>(n), static_cast<py::ssize_t>(n)},
+                          gen.column_major ? std::vector<std::ptrdiff_t>{plane, item, line}
+                                           : std::vector<std::ptrdiff_t>{plane, line, item});
+    T* data = result.mutable_data();
+    {
+        py::gil_scoped_release release;
+        for (long long l = 0; l < k; l++) {
+            T* slice = data + l * static_cast<std::ptrdiff_t>(n) * n;
+            MatrixView<T> view = gen.column_major ? MatrixView<T>{slice, n, 1, n} : MatrixView<T>{slice, n, n, 1};
+            gen.fill_experiment(first + l, view);
+        }
+    }
+    return result;
+}
+
+// Матрицы экспериментов next_index .. next_index + k - 1 массивом (k, n, n)
+py::array MatrixGenerator::generate_batch(long long k) {
+    if (k < 0) throw std::invalid_argument("batch size must be non-negative");
+    long long first = next_index;
+    py::array result = single_precision ? py::array(make_batch<float>(*this, first, k))
+                                        : py::array(make_batch<double>(*this, first, k));
+    next_index += k;
+    return result;
+}
+
+template <typename T>
+static void fill_into(const MatrixGenerator& gen, long long k, py::array& out) {
+    auto item = static_cast<py::ssize_t>(sizeof(T));
+    if (out.strides(0) % item != 0 || out.strides(1) % item != 0)
+        throw std::invalid_argument("out strides must be multiples of the element size");
+    MatrixView<T> view{static_cast<T*>(out.mutable_data()), gen.n,
+                       static_cast<std::ptrdiff_t>(out.strides(0) / item),
+                       static_cast<std::ptrdiff_t>(out.strides(1) / item)};
+    py::gil_scoped_release release;
+    gen.fill_experiment(k, view);
+}
+
+// Заполняет буфер вызывающего (любой раскладки, в т.ч. срез большего массива) матрицей
+// эксперимента next_index без выделения памяти и сдвигает next_index.
+void MatrixGenerator::generate_into(py::array out) {
+    if (out.ndim() != 2 || out.shape(0) != n || out.shape(1) != n)
+        throw std::invalid_argument("out must have shape (n, n)");
+    if (!out.writeable()) throw std::invalid_argument("out must be writeable");
+    py::dtype expected = single_precision ? py::dtype::of<float>() : py::dtype::of<double>();
+    if (!out.dtype().equal(expected))
+        throw py::type_error("out must have dtype " + std::string(py::str(expected)) + " in native byte order");
+
+    if (single_precision) fill_into<float>(*this, next_index, out);
+    else fill_into<double>(*this, next_index, out);
+    next_index++;
+}
+
+void MatrixGenerator::jump(long long k) {
+    next_index += k;
+    if (next_index < 0) next_index = 0;
+}
+
+MatrixGenerator MatrixGenerator::spawn(std::uint64_t stream) const {
+    MatrixGenerator child(*this);
+    child.seed = derive_seed(seed, stream);
+    child.next_index = 0;
+    child.init_sampler();
+    return child;
+}
+
+// Эксперимент k - это поток Philox с ключом seed и счетчиком (номер числа, k).
+// Номера случайных чисел внутри эксперимента фиксированы:
+//   [0, n)            alpha строк
+//   [n, 3n)           delta и center концентрированного распределения
+//   [3n, 7n)          K, Na, N, I0 неорганики
+//   [7n, 7n + n(n-1)) коэффициенты b по столбцам j = 1..n-1
+// Поэтому матрица зависит только от (seed, k) и строится за O(n^2) без прокрутки потока.
+// Номер числа - это и размерность точки Соболя в режиме sampler='sobol'.
+// Арифметика ведется в double; в матрицу float32 каждое значение пишется с округлением,
+// и следующий столбец считается уже от округленного.
+template <typename T>
+void MatrixGenerator::fill_experiment(long long k, const MatrixView<T>& mat) const {
+    ExperimentDraws gen(*this, k);
+    const std::uint64_t rows = static_cast<std::uint64_t>(n);
 
-    for (int i = 0; i < n; i++) mat(i, 0) = get_uniform(alpha_min, alpha_max);
+    for (int i = 0; i < n; i++) mat(i, 0) = static_cast<T>(get_uniform(gen, i, alpha_min, alpha_max));
 
     std::vector<std::pair<double, double>> conc_bounds(n);
     if (dist_concentrated) {
         double len = beta2 - beta1;
         for (int i = 0; i < n; i++) {
-            double delta = get_uniform(0, len / 4.0);
-            double center = get_uniform(beta1 + delta, beta2 - delta);
+            double delta = get_uniform(gen, rows + 2 * i, 0, len / 4.0);
+            double center = get_uniform(gen, rows + 2 * i + 1, beta1 + delta, beta2 - delta);
             conc_bounds[i] = {center - delta, center + delta};
         }
     }
 
     for (int j = 1; j < n; j++) {
         bool is_ripening = use_ripening && (j <= v - 1);
+        std::uint64_t base = 7 * rows + static_cast<std::uint64_t>(j - 1) * rows;
         for (int i = 0; i < n; i++) {
             double b;
-            if (is_ripening) b = get_uniform(1.000001, beta_max);
-            else if (dist_concentrated) b = get_uniform(conc_bounds[i].first, conc_bounds[i].second);
-            else b = get_uniform(beta1, beta2);
+            if (is_ripening) b = get_uniform(gen, base + i, 1.000001, beta_max);
+            else if (dist_concentrated) b = get_uniform(gen, base + i, conc_bounds[i].first, conc_bounds[i].second);
+            else b = get_uniform(gen, base + i, beta1, beta2);
             
             double val = mat(i, j - 1) * b;
-            mat(i, j) = (val > 1.0) ? 1.0 : val;
+            mat(i, j) = static_cast<T>((val > 1.0) ? 1.0 : val);
         }
     }
 
     if (use_inorganic) {
+        std::vector<double> base_loss(n), I0(n), growth(n);
         for (int i = 0; i < n; i++) {
-            double K = get_uniform(4.8, 7.05), Na = get_uniform(0.21, 0.82);
-            double N = get_uniform(1.58, 2.8), I0 = get_uniform(0.62, 0.64);
-            for (int j = 0; j < n; j++) {
-                double I_val = I0 * std::pow(1.029, 7 * j);
-                double loss = (1.1 + 0.1541*(K+Na) + 0.2159*N + 0.9989*I_val + 0.1967) / 100.0;
-                mat(i, j) = std::max(0.0, mat(i, j) - loss);
-            }
+            std::uint64_t base = 3 * rows + 4 * static_cast<std::uint64_t>(i);
+            double K = get_uniform(gen, base, 4.8, 7.05), Na = get_uniform(gen, base + 1, 0.21, 0.82);
+            double N = get_uniform(gen, base + 2, 1.58, 2.8);
+            I0[i] = get_uniform(gen, base + 3, 0.62, 0.64);
+            base_loss[i] = 1.1 + 0.1541*(K+Na) + 0.2159*N;
+        }
+        for (int j = 0; j < n; j++) growth[j] = std::pow(1.029, 7 * j);
+
+        auto apply = [&](int i, int j) {
+            double I_val = I0[i] * growth[j];
+            double loss = (base_loss[i] + 0.9989*I_val + 0.1967) / 100.0;
+            mat(i, j) = static_cast<T>(std::max(0.0, mat(i, j) - loss));
+        };
+        if (is_column_major(mat)) {
+            for (int j = 0; j < n; j++) for (int i = 0; i < n; i++) apply(i, j);
+        } else {
+            for (int i = 0; i < n; i++) for (int j = 0; j < n; j++) apply(i, j);
         }
     }
-    return result;
-}
\ No newline at end of file
+}
+
+template void MatrixGenerator::fill_experiment<double>(long long, const MatrixView<double>&) const;
+template void MatrixGenerator::fill_experiment<float>(long long, const MatrixView<float>&) const;
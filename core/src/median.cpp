@@ -1,27 +1,42 @@
 #include "median.h"
+#include "batch.h"
 #include <vector>
 #include <algorithm>
+#include <numeric>
 
-double run_median(pybind11::array_t<double> input_matrix) {
-    auto mat = input_matrix.unchecked<2>();
-    int n = static_cast<int>(mat.shape(0)); 
-    std::vector<bool> available(n, true);
+template <typename T>
+double median_total(const MatrixView<const T>& mat) {
+    int n = mat.n; 
+    std::vector<int> rows(n);
+    std::iota(rows.begin(), rows.end(), 0);
     double total = 0;
-    std::vector<std::pair<double, int>> candidates; 
+    std::vector<std::pair<T, int>> candidates; 
     candidates.reserve(n);
 
+    // Пары (значение, строка) упорядочены полностью, поэтому медиана не зависит
+    // от порядка кандидатов; столбец j собирает только n - j свободных строк.
     for (int j = 0; j < n; j++) {
-        candidates.clear();
-        for (int i = 0; i < n; i++) {
-            if (available[i]) candidates.push_back({mat(i, j), i});
+        if (rows.empty()) break;
+        candidates.resize(rows.size());
+        for (size_t k = 0; k < rows.size(); k++) {
+            candidates[k] = {mat(rows[k], j), rows[k]};
         }
-        if (candidates.empty()) break;
 
         size_t mid = candidates.size() / 2;
         std::nth_element(candidates.begin(), candidates.begin() + mid, candidates.end());
         
         total += candidates[mid].first;
-        available[candidates[mid].second] = false;
+        rows.erase(std::lower_bound(rows.begin(), rows.end(), candidates[mid].second));
     }
     return total;
-}
\ No newline at end of file
+}
+
+template <typename T>
+pybind11::object run_median(pybind11::array_t<T> input_matrix) {
+    return map_totals(input_matrix, [](const MatrixView<const T>& view) { return median_total(view); });
+}
+
+template double median_total<double>(const MatrixView<const double>&);
+template double median_total<float>(const MatrixView<const float>&);
+template pybind11::object run_median<double>(pybind11::array_t<double>);
+template pybind11::object run_median<float>(pybind11::array_t<float>);
@@ -0,0 +1,35 @@
+#include "runningStats.h"
+#include <cmath>
+#include <stdexcept>
+
+void RunningStats::merge(const RunningStats& other) {
+    if (other.count == 0) return;
+    if (count == 0) { *this = other; return; }
+    long long total = count + other.count;
+    double delta = other.mean - mean;
+    double weight = static_cast<double>(other.count) / total;
+    mean += delta * weight;
+    m2 += other.m2 + delta * delta * static_cast<double>(count) * weight;
+    count = total;
+    if (other.min < min) min = other.min;
+    if (other.max > max) max = other.max;
+}
+
+double RunningStats::std() const { return std::sqrt(variance()); }
+
+double RunningStats::sem() const { return count > 0 ? std() / std::sqrt(static_cast<double>(count)) : 0.0; }
+
+void RunningStats::add_array(const py::array_t<double, py::array::c_style | py::array::forcecast>& values) {
+    const double* data = values.data();
+    py::ssize_t size = values.size();
+    py::gil_scoped_release release;
+    for (py::ssize_t i = 0; i < size; i++) add(data[i]);
+}
+
+RunningStats RunningStats::from_state(const State& s) {
+    RunningStats stats;
+    std::tie(stats.count, stats.mean, stats.m2, stats.min, stats.max) = s;
+    if (stats.count < 0 || stats.m2 < 0)
+        throw std::invalid_argument("invalid RunningStats state: negative count or m2");
+    return stats;
+}
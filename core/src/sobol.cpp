@@ -0,0 +1,103 @@
+#include "sobol.h"
+#include "philox.h"
+
+// Ключ потока Philox для начальных направляющих чисел ("Sobol") и номер дочернего
+// потока seed для перемешивания
+static const std::uint64_t SOBOL_INIT_KEY = 0x536F626F6CULL;
+static const std::uint64_t SOBOL_SCRAMBLE_STREAM = 0x5CA;
+
+// Произведение многочленов над GF(2) по модулю poly степени degree
+static std::uint32_t mulmod(std::uint32_t a, std::uint32_t b, std::uint32_t poly, int degree) {
+    std::uint32_t result = 0;
+    for (; b; b >>= 1) {
+        if (b & 1) result ^= a;
+        a <<= 1;
+        if (a >> degree & 1) a ^= poly;
+    }
+    return result;
+}
+
+static std::uint32_t powmod_x(std::uint64_t e, std::uint32_t poly, int degree) {
+    std::uint32_t result = 1, base = degree > 1 ? 2u : (2u ^ poly);
+    for (; e; e >>= 1) {
+        if (e & 1) result = mulmod(result, base, poly, degree);
+        base = mulmod(base, base, poly, degree);
+    }
+    return result;
+}
+
+// poly примитивен, если порядок x по модулю poly равен 2^d - 1
+static bool is_primitive(std::uint32_t poly, int degree) {
+    std::uint64_t order = (1ULL << degree) - 1;
+    if (powmod_x(order, poly, degree) != 1) return false;
+    // ... и x^(order/q) != 1 для каждого простого делителя q
+    std::uint64_t rest = order;
+    for (std::uint64_t q = 2; q * q <= rest; q++) {
+        if (rest % q) continue;
+        if (powmod_x(order / q, poly, degree) == 1) return false;
+        while (rest % q == 0) rest /= q;
+    }
+    return rest == 1 || powmod_x(order / rest, poly, degree) != 1;
+}
+
+const std::vector<std::uint32_t>& sobol_directions() {
+    static const std::vector<std::uint32_t> table = [] {
+        std::vector<std::uint32_t> v(static_cast<std::size_t>(SOBOL_MAX_DIMS) * SOBOL_BITS);
+        // Размерность 0 - последовательность ван дер Корпута
+        for (int k = 0; k < SOBOL_BITS; k++) v[k] = 1u << (SOBOL_BITS - 1 - k);
+
+        int dim = 1;
+        for (int degree = 1; dim < SOBOL_MAX_DIMS; degree++) {
+            for (std::uint32_t poly = (1u << degree) | 1u; poly < (2u << degree) && dim < SOBOL_MAX_DIMS; poly += 2) {
+                if (!is_primitive(poly, degree)) continue;
+                PhiloxStream init(SOBOL_INIT_KEY, static_cast<std::uint64_t>(dim));
+                std::uint32_t m[SOBOL_BITS];
+                for (int k = 0; k < SOBOL_BITS; k++) {
+                    if (k < degree) {
+                        // Нечетное m_{k+1} < 2^{k+1}
+                        m[k] = 2 * static_cast<std::uint32_t>(init.at(k) * static_cast<double>(1u << k)) + 1;
+                    } else {
+                        std::uint32_t next = m[k - degree] ^ (m[k - degree] << degree);
+                        for (int a = 1; a < degree; a++)
+                            if (poly >> (degree - a) & 1) next ^= m[k - a] << a;
+                        m[k] = next;
+                    }
+                }
+                std::uint32_t* row = v.data() + static_cast<std::size_t>(dim) * SOBOL_BITS;
+                for (int k = 0; k < SOBOL_BITS; k++) row[k] = m[k] << (SOBOL_BITS - 1 - k);
+                dim++;
+            }
+        }
+        return v;
+    }();
+    return table;
+}
+
+SobolTable::SobolTable(std::uint64_t seed, int dims)
+    : dims_(dims), directions_(static_cast<std::size_t>(dims) * SOBOL_BITS), shifts_(dims) {
+    const std::vector<std::uint32_t>& base = sobol_directions();
+    std::uint64_t key = splitmix64(seed, SOBOL_SCRAMBLE_STREAM);
+    for (int d = 0; d < dims; d++) {
+        PhiloxStream gen(key, static_cast<std::uint64_t>(d));
+        // Строка j матрицы LMS: единица на диагонали и случайные биты старше нее
+        std::uint32_t rows[SOBOL_BITS];
+        for (int j = 0; j < SOBOL_BITS; j++) {
+            int pos = SOBOL_BITS - 1 - j;
+            std::uint32_t word = static_cast<std::uint32_t>(gen.at(j) * 4294967296.0);
+            std::uint32_t above = pos == SOBOL_BITS - 1 ? 0u : ~((2u << pos) - 1);
+            rows[j] = (word & above) | (1u << pos);
+        }
+        shifts_[d] = static_cast<std::uint32_t>(gen.at(SOBOL_BITS) * 4294967296.0);
+
+        for (int k = 0; k < SOBOL_BITS; k++) {
+            std::uint32_t src = base[static_cast<std::size_t>(d) * SOBOL_BITS + k], dst = 0;
+            for (int j = 0; j < SOBOL_BITS; j++) {
+                std::uint32_t bits = rows[j] & src;
+                // Четность числа единиц
+                bits ^= bits >> 16; bits ^= bits >> 8; bits ^= bits >> 4; bits ^= bits >> 2; bits ^= bits >> 1;
+                dst |= (bits & 1u) << (SOBOL_BITS - 1 - j);
+            }
+            directions_[static_cast<std::size_t>(d) * SOBOL_BITS + k] = dst;
+        }
+    }
+}
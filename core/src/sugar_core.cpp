@@ -6,6 +6,10 @@
 #include "median.h"
 #include "greedyThrifty.h"
 #include "thriftyGreedy.h"
+#include "allHeuristics.h"
+#include "experiments.h"
+#include "inputPolicy.h"
+#include "runningStats.h"
 
 namespace py = pybind11;
 
@@ -14,12 +18,108 @@ PYBIND11_MODULE(sugar_core, m) {
 
     py::class_<MatrixGenerator>(m, "MatrixGenerator")
         .def(py::init<py::dict>())
-        .def("generate", &MatrixGenerator::generate);
-
-    m.def("solve_exact", &solve_exact, "Hungarian Algorithm");
-    m.def("run_greedy", &run_greedy);
-    m.def("run_thrifty", &run_thrifty);
-    m.def("run_median", &run_median);
-    m.def("run_greedy_thrifty", &run_greedy_thrifty);
-    m.def("run_thrifty_greedy", &run_thrifty_greedy);
+        .def("generate", &MatrixGenerator::generate, "Matrix of experiment next_index, then advances it")
+        .def("generate_at", &MatrixGenerator::generate_at, py::arg("k"),
+             "Matrix of experiment k, computed in O(n^2) from (seed, k) without touching next_index")
+        .def("generate_into", &MatrixGenerator::generate_into, py::arg("out"),
+             "Fills a caller-owned (n, n) array of the generator's dtype with experiment next_index, "
+             "then advances it; never allocates")
+        .def("generate_batch", &MatrixGenerator::generate_batch, py::arg("k"),
+             "Matrices of experiments next_index .. next_index + k - 1 as one contiguous (k, n, n) array, "
+             "then advances next_index by k")
+        .def("jump", &MatrixGenerator::jump, py::arg("k"), "Skips k experiments")
+        .def("spawn", &MatrixGenerator::spawn, py::arg("stream"),
+             "Independent generator with a seed derived from (seed, stream)")
+        .def_readonly("seed", &MatrixGenerator::seed)
+        .def_property_readonly("dtype", [](const MatrixGenerator& g) { return g.single_precision ? "float32" : "float64"; },
+                               "Element type of generated matrices")
+        .def_property_readonly("layout", [](const MatrixGenerator& g) { return g.column_major ? "F" : "C"; },
+                               "Memory order of generated matrices: 'C' (rows) or 'F' (columns)")
+        .def_property_readonly("sampler", &MatrixGenerator::sampler_name,
+                               "Source of uniforms: 'mc', 'antithetic' (experiments 2m, 2m+1 use u and 1 - u) "
+                               "or 'sobol' (scrambled Sobol point k, padded with Philox past 4096 draws)")
+        .def_readwrite("next_index", &MatrixGenerator::next_index);
+
+    py::class_<HungarianSolver>(m, "HungarianSolver")
+        .def(py::init<>())
+        .def("solve", &HungarianSolver::solve_array, py::arg("matrix"),
+             "Optimal (maximum) total; buffers are reused between calls")
+        .def("solve", [](HungarianSolver& solver, const py::object& matrix) {
+            return solver.solve_array(coerce_matrix(matrix));
+        }, py::arg("matrix"))
+        .def_property_readonly("assignment", &HungarianSolver::assignment,
+                               "Row -> column of the last optimal assignment")
+        .def_property_readonly("row_potentials", &HungarianSolver::row_potentials)
+        .def_property_readonly("col_potentials", &HungarianSolver::col_potentials);
+
+    // Каждое ядро зарегистрировано для float64 и float32 (чтение на месте) и третьей
+    // перегрузкой для всего остального: приведение к float64 со счетчиком или TypeError
+    // в строгом режиме (inputPolicy.h). Вход (n, n) дает число, пакет (k, n, n) - массив длины k.
+    m.def("solve_exact", &solve_exact<double>, py::arg("matrix"), py::arg("engine") = "hungarian",
+          "Exact optimum of the assignment problem: engine='hungarian' or 'lapjv' (Jonker-Volgenant); "
+          "a (k, n, n) batch gives an array of k optima");
+    m.def("solve_exact", &solve_exact<float>, py::arg("matrix"), py::arg("engine") = "hungarian");
+    m.def("solve_exact", converting(&solve_exact<double>), py::arg("matrix"), py::arg("engine") = "hungarian");
+    m.def("run_greedy", &run_greedy<double>);
+    m.def("run_greedy", &run_greedy<float>);
+    m.def("run_greedy", converting(&run_greedy<double>));
+    m.def("run_thrifty", &run_thrifty<double>);
+    m.def("run_thrifty", &run_thrifty<float>);
+    m.def("run_thrifty", converting(&run_thrifty<double>));
+    m.def("run_median", &run_median<double>);
+    m.def("run_median", &run_median<float>);
+    m.def("run_median", converting(&run_median<double>));
+    m.def("run_greedy_thrifty", &run_greedy_thrifty<double>);
+    m.def("run_greedy_thrifty", &run_greedy_thrifty<float>);
+    m.def("run_greedy_thrifty", converting(&run_greedy_thrifty<double>));
+    m.def("run_thrifty_greedy", &run_thrifty_greedy<double>);
+    m.def("run_thrifty_greedy", &run_thrifty_greedy<float>);
+    m.def("run_thrifty_greedy", converting(&run_thrifty_greedy<double>));
+    m.def("run_all_heuristics", &run_all_heuristics<double>, py::arg("matrix"), py::arg("v"),
+          "Totals of all heuristics in one pass over the matrix: "
+          "[greedy, thrifty, median, greedy_thrifty, thrifty_greedy]; a (k, n, n) batch gives (k, 5)");
+    m.def("run_all_heuristics", &run_all_heuristics<float>, py::arg("matrix"), py::arg("v"));
+    m.def("run_all_heuristics", converting(&run_all_heuristics<double>), py::arg("matrix"), py::arg("v"));
+
+    m.def("set_strict_inputs", &set_strict_inputs, py::arg("enabled"),
+          "Strict mode: kernels read float64/float32 arrays in place and raise TypeError on anything "
+          "that would need a converted copy");
+    m.def("strict_inputs", &strict_inputs);
+    m.def("input_conversions", &input_conversions,
+          "Number of kernel inputs silently converted to float64 since start or last reset");
+    m.def("reset_input_conversions", &reset_input_conversions);
+
+    py::class_<RunningStats>(m, "RunningStats",
+        "Constant-memory streaming statistics (Welford): count, mean, variance, min, max; "
+        "mergeable across threads, chunks and shards")
+        .def(py::init<>())
+        .def("add", &RunningStats::add, py::arg("x"))
+        .def("add_array", &RunningStats::add_array, py::arg("values"), "Adds every element of an array")
+        .def("merge", &RunningStats::merge, py::arg("other"),
+             "Folds another accumulator into this one (Chan et al. pairwise update)")
+        .def("copy", [](const RunningStats& s) { return s; })
+        .def_readonly("count", &RunningStats::count)
+        .def_readonly("mean", &RunningStats::mean)
+        .def_readonly("min", &RunningStats::min)
+        .def_readonly("max", &RunningStats::max)
+        .def_property_readonly("variance", &RunningStats::variance, "Sample variance (ddof=1)")
+        .def_property_readonly("std", &RunningStats::std)
+        .def_property_readonly("sem", &RunningStats::sem, "Standard error of the mean")
+        .def_property_readonly("state", &RunningStats::state, "(count, mean, m2, min, max)")
+        .def_static("from_state", &RunningStats::from_state, py::arg("state"))
+        .def(py::pickle([](const RunningStats& s) { return s.state(); },
+                        [](const RunningStats::State& state) { return RunningStats::from_state(state); }))
+        .def("__repr__", [](const RunningStats& s) {
+            return "RunningStats(count=" + std::to_string(s.count) + ", mean=" +
+                   std::string(py::str(py::float_(s.mean))) + ", sem=" + std::string(py::str(py::float_(s.sem()))) + ")";
+        });
+
+    m.def("run_experiments", &run_experiments,
+          py::arg("params"), py::arg("T"), py::arg("threads") = 1, py::arg("start") = 0,
+          py::arg("keep_losses") = true,
+          "Full Monte Carlo loop for experiments [start, start + T): generation, exact solve and "
+          "all heuristics in native code. threads=0 uses every hardware thread. Besides per-experiment "
+          "'losses' the result has per-strategy RunningStats in 'stats' and RunningStats of the paired "
+          "differences loss_a - loss_b in 'pair_stats' keyed by (a, b); keep_losses=False drops the "
+          "arrays so memory does not grow with T.");
 }
\ No newline at end of file
@@ -1,26 +1,40 @@
 #include "thrifty.h"
-#include <vector>
+#include "batch.h"
 #include <limits>
+#include <numeric>
+#include <vector>
 
-double run_thrifty(pybind11::array_t<double> input_matrix) {
-    auto mat = input_matrix.unchecked<2>();
-    int n = static_cast<int>(mat.shape(0)); 
-    std::vector<bool> available(n, true);
+template <typename T>
+double thrifty_total(const MatrixView<const T>& mat) {
+    int n = mat.n; 
+    std::vector<int> rows(n);
+    std::iota(rows.begin(), rows.end(), 0);
     double total = 0;
 
     for (int j = 0; j < n; j++) {
-        double min_val = std::numeric_limits<double>::max();
-        int best_row = -1;
-        for (int i = 0; i < n; i++) {
-            if (available[i] && mat(i, j) < min_val) {
-                min_val = mat(i, j);
-                best_row = i;
+        T min_val = std::numeric_limits<T>::max();
+        int best_pos = -1;
+        for (int k = 0; k < (int)rows.size(); k++) {
+            T val = mat(rows[k], j);
+            if (val < min_val) {
+                min_val = val;
+                best_pos = k;
             }
         }
-        if (best_row != -1) {
+        if (best_pos != -1) {
             total += min_val;
-            available[best_row] = false;
+            rows.erase(rows.begin() + best_pos);
         }
     }
     return total;
-}
\ No newline at end of file
+}
+
+template <typename T>
+pybind11::object run_thrifty(pybind11::array_t<T> input_matrix) {
+    return map_totals(input_matrix, [](const MatrixView<const T>& view) { return thrifty_total(view); });
+}
+
+template double thrifty_total<double>(const MatrixView<const double>&);
+template double thrifty_total<float>(const MatrixView<const float>&);
+template pybind11::object run_thrifty<double>(pybind11::array_t<double>);
+template pybind11::object run_thrifty<float>(pybind11::array_t<float>);
@@ -0,0 +1,117 @@
+"""
+Кэш результатов прогонов по содержимому.
+
+Эксперимент k однозначно задается парой (seed, k), поэтому статистики первых count экспериментов
+для тех же параметров и seed всегда одни и те же. Кэш хранит их (RunningStats каждой стратегии и
+парных разностей) под ключом — хэшем нормализованных параметров и seed:
+
+    * повторный прогон с теми же параметрами, seed и T отвечает сразу;
+    * прогон с большим T продолжает лучший сохраненный префикс и досчитывает только недостающие
+      эксперименты.
+
+Параметры, не влияющие на значения потерь (T, правило остановки, layout), в ключ не входят;
+beta_max без дозаривания не используется и тоже отбрасывается. v в ключе остается и без
+дозаривания: это этап переключения комбинированных стратегий.
+"""
+import hashlib
+import json
+import sqlite3
+from datetime import datetime
+
+import data.database as db
+
+# Не влияют на потери первых count экспериментов
+IGNORED_KEYS = ('T', 'seed', 'stop_rule', 'half_width', 'confidence', 'layout')
+DEFAULTS = {'exact_engine': 'hungarian', 'dtype': 'float64', 'sampler': 'mc', 'v': 0}
+INT_KEYS = ('n', 'v')
+BOOL_KEYS = ('use_ripening', 'use_inorganic')
+
+
+def normalize_params(params):
+    """Канонический вид параметров: без лишних ключей, с умолчаниями и единым форматом чисел."""
+    norm = dict(DEFAULTS)
+    for key, value in params.items():
+        if key in IGNORED_KEYS:
+            continue
+        if key in INT_KEYS:
+            value = int(value)
+        elif key in BOOL_KEYS:
+            value = bool(value)
+        elif isinstance(value, (int, float)) and not isinstance(value, bool):
+            # 0.1, 0.10 и 0.1000000000001 из разных полей ввода — одно и то же значение
+            value = float(format(float(value), '.12g'))
+        norm[key] = value
+    if not norm.get('use_ripening'):
+        norm.pop('beta_max', None)
+    return norm
+
+
+def cache_key(params, seed):
+    """SHA-256 от нормализованных параметров и seed."""
+    text = json.dumps({'params': normalize_params(params), 'seed': int(seed)}, sort_keys=True)
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+def dump_stats(stats, pair_stats):
+    """JSON с состояниями накопителей {стратегия: state} и {"a|b": state}."""
+    return json.dumps({
+        'stats': {name: list(s.state) for name, s in stats.items()},
+        'pair_stats': {f"{a}|{b}": list(s.state) for (a, b), s in pair_stats.items()},
+    })
+
+
+def load_stats(text, core):
+    """Обратно к dump_stats: (stats, pair_stats) из RunningStats модуля core."""
+    data = json.loads(text)
+    stats = {name: core.RunningStats.from_state(tuple(state)) for name, state in data['stats'].items()}
+    pair_stats = {tuple(pair.split('|')): core.RunningStats.from_state(tuple(state))
+                  for pair, state in data['pair_stats'].items()}
+    return stats, pair_stats
+
+
+def _connect():
+    conn = db.connect()
+    db.ensure_table(conn, 'result_cache', db.CACHE_SCHEMA)
+    return conn
+
+
+def lookup(params, seed, T, core):
+    """
+    Самый длинный сохраненный префикс не длиннее T: словарь count, stats, pair_stats
+    (RunningStats модуля core) или None. Ошибки базы не мешают расчету и дают None.
+    """
+    if seed is None:
+        return None
+    try:
+        conn = _connect()
+        row = conn.execute('SELECT count, stats FROM result_cache WHERE key = ? AND count <= ? '
+                           'ORDER BY count DESC LIMIT 1', (cache_key(params, seed), T)).fetchone()
+    except sqlite3.Error:
+        return None
+    if row is None:
+        return None
+    stats, pair_stats = load_stats(row[1], core)
+    return {'count': row[0], 'stats': stats, 'pair_stats': pair_stats}
+
+
+def store(params, seed, count, stats, pair_stats):
+    """Сохраняет статистики первых count экспериментов; повторная запись того же префикса заменяет старую."""
+    if seed is None or count <= 0:
+        return
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute('INSERT OR REPLACE INTO result_cache (key, count, timestamp, params, stats) '
+                         'VALUES (?, ?, ?, ?, ?)',
+                         (cache_key(params, seed), count, timestamp,
+                          json.dumps(normalize_params(params)), dump_stats(stats, pair_stats)))
+    except sqlite3.Error:
+        pass
+
+
+def clear():
+    """Удаляет весь кэш."""
+    conn = _connect()
+    with conn:
+        conn.execute('DELETE FROM result_cache')
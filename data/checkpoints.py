@@ -0,0 +1,104 @@
+"""
+Контрольные точки незавершенных прогонов.
+
+Генератор основан на счетчике (эксперимент k задается парой (seed, k)), поэтому позиция
+генератора — это seed и номер следующего эксперимента. Вместе с накопителями RunningStats
+(по 5 чисел на стратегию и на пару стратегий) этого достаточно, чтобы продолжить расчет после
+сбоя или закрытия окна ровно с того места, где он прервался.
+
+Поток вычислений сохраняет точку не чаще чем раз в interval() секунд (запись — несколько
+килобайт в одной транзакции), а также при паузе; после завершения прогона точка удаляется.
+Интервал задается переменной окружения SUGAR_CHECKPOINT_INTERVAL (секунды, 0 — только при паузе).
+"""
+import json
+import os
+import sqlite3
+from datetime import datetime
+
+import data.database as db
+from data.cache import dump_stats, load_stats
+
+DEFAULT_INTERVAL = 30.0
+ENV_VAR = 'SUGAR_CHECKPOINT_INTERVAL'
+
+
+def interval():
+    """Интервал между контрольными точками, с."""
+    value = os.environ.get(ENV_VAR)
+    if not value:
+        return DEFAULT_INTERVAL
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        raise ValueError(f"{ENV_VAR} must be a number of seconds, got '{value}'")
+
+
+def _connect():
+    conn = db.connect()
+    db.ensure_table(conn, 'checkpoints', db.CHECKPOINT_SCHEMA)
+    return conn
+
+
+def save(checkpoint_id, params, seed, next_index, stats, pair_stats):
+    """
+    Записывает контрольную точку и возвращает ее id. checkpoint_id=None — новая точка,
+    иначе обновляется существующая. Ошибки базы не прерывают расчет (возвращается прежний id).
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    row = (timestamp, json.dumps(params), seed, next_index, dump_stats(stats, pair_stats))
+    try:
+        conn = _connect()
+        with conn:
+            if checkpoint_id is None:
+                cursor = conn.execute('INSERT INTO checkpoints (timestamp, params, seed, next_index, stats) '
+                                      'VALUES (?, ?, ?, ?, ?)', row)
+                checkpoint_id = cursor.lastrowid
+            else:
+                conn.execute('INSERT OR REPLACE INTO checkpoints (id, timestamp, params, seed, next_index, stats) '
+                             'VALUES (?, ?, ?, ?, ?, ?)', (checkpoint_id,) + row)
+    except sqlite3.Error:
+        pass
+    return checkpoint_id
+
+
+def get_all(core):
+    """Незавершенные прогоны от новых к старым: id, timestamp, params, seed, next_index, stats, pair_stats."""
+    conn = _connect()
+    rows = conn.execute('SELECT id, timestamp, params, seed, next_index, stats FROM checkpoints '
+                        'ORDER BY timestamp DESC, id DESC').fetchall()
+
+    checkpoints = []
+    for row in rows:
+        try:
+            stats, pair_stats = load_stats(row[5], core)
+            checkpoints.append({
+                'id': row[0],
+                'timestamp': row[1],
+                'params': json.loads(row[2]),
+                'seed': row[3],
+                'next_index': row[4],
+                'stats': stats,
+                'pair_stats': pair_stats,
+            })
+        except (json.JSONDecodeError, KeyError, ValueError):
+            continue
+    return checkpoints
+
+
+def delete(checkpoint_id):
+    """Удаляет контрольную точку (None — ничего не делает)."""
+    if checkpoint_id is None:
+        return
+    try:
+        conn = _connect()
+        with conn:
+            conn.execute('DELETE FROM checkpoints WHERE id = ?', (checkpoint_id,))
+    except sqlite3.Error:
+        pass
+
+
+def delete_all():
+    """Удаляет все контрольные точки."""
+    conn = _connect()
+    with conn:
+        conn.execute('DELETE FROM checkpoints')
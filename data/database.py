@@ -1,6 +1,10 @@
 import sqlite3
 import json
 import os
+import queue
+import threading
+import itertools
+import atexit
 from datetime import datetime, timedelta
 import sys
 
@@ -10,87 +14,586 @@ from utils import get_app_path
 BASE_DIR = get_app_path()
 DB_PATH = os.path.join(BASE_DIR, "experiments_history.db")
 
+# Параметры эксперимента хранятся типизированными столбцами history (NULL — ключа не было),
+# а средние потери и их стандартные ошибки — строками history_results, по одной на стратегию.
+# Поэтому фильтры и агрегаты ("средние потери жадной стратегии по n") считаются в SQL.
+# Прочие ключи params, если появятся, сохраняются JSON-ом в столбце extra.
+# imported_at — время загрузки записи из файла (data/transfer.py); такие записи хранят исходное
+# время прогона и автоматической очисткой не удаляются.
+PARAM_COLUMNS = {
+    'T': int, 'n': int, 'alpha_min': float, 'alpha_max': float, 'beta1': float, 'beta2': float,
+    'dist_type': str, 'use_ripening': bool, 'v': int, 'beta_max': float, 'use_inorganic': bool,
+    'exact_engine': str, 'dtype': str, 'sampler': str, 'stop_rule': str, 'half_width': float,
+}
+_SQL_TYPES = {int: 'INTEGER', float: 'REAL', str: 'TEXT', bool: 'INTEGER'}
+
+HISTORY_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        seed INTEGER,
+        {columns},
+        extra TEXT,
+        imported_at TEXT
+    )
+'''.format(columns=',\n        '.join(f'{key} {_SQL_TYPES[kind]}' for key, kind in PARAM_COLUMNS.items()))
+
+RESULTS_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS history_results (
+        history_id INTEGER NOT NULL REFERENCES history (id) ON DELETE CASCADE,
+        strategy TEXT NOT NULL,
+        loss REAL,
+        std_error REAL,
+        PRIMARY KEY (history_id, strategy)
+    ) WITHOUT ROWID
+'''
+
+# Потери по каждому эксперименту прогона, сжатые порциями (data/losses.py); same_as — ссылка
+# на стратегию с тем же вектором потерь вместо повторного хранения
+LOSSES_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS history_losses (
+        history_id INTEGER NOT NULL REFERENCES history (id) ON DELETE CASCADE,
+        strategy TEXT NOT NULL,
+        chunk INTEGER NOT NULL,
+        count INTEGER,
+        data BLOB,
+        same_as TEXT,
+        PRIMARY KEY (history_id, strategy, chunk)
+    )
+'''
+
+# Версия схемы в PRAGMA user_version: 0 — params/results JSON-текстом, 1 — нормализованная
+SCHEMA_VERSION = 1
+
+# Кэш накопленных статистик прогонов (data/cache.py); ключ — хэш нормализованных параметров и seed
+CACHE_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS result_cache (
+        key TEXT,
+        count INTEGER,
+        timestamp TEXT,
+        params TEXT,
+        stats TEXT,
+        PRIMARY KEY (key, count)
+    )
+'''
+
+# Контрольные точки незавершенных прогонов (data/checkpoints.py)
+CHECKPOINT_SCHEMA = '''
+    CREATE TABLE IF NOT EXISTS checkpoints (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        timestamp TEXT,
+        params TEXT,
+        seed INTEGER,
+        next_index INTEGER,
+        stats TEXT
+    )
+'''
+
+# Сколько заданий фоновый поток записи фиксирует одной транзакцией
+WRITE_BATCH = 512
+
+# Постоянные соединения: по одному на поток (объект sqlite3 нельзя делить между потоками).
+# Соединение открывается заново, только если сменился DB_PATH.
+_local = threading.local()
+
+def connect(path=None):
+    """Постоянное соединение текущего потока с базой (WAL: чтение не ждет записи)."""
+    path = path or DB_PATH
+    if getattr(_local, 'path', None) != path:
+        close()
+        conn = sqlite3.connect(path, timeout=30)
+        conn.execute('PRAGMA journal_mode=WAL')
+        # В режиме WAL NORMAL не теряет данные при падении программы, только при отключении питания
+        conn.execute('PRAGMA synchronous=NORMAL')
+        # Удаление записи истории удаляет и ее строки history_results и history_losses
+        conn.execute('PRAGMA foreign_keys=ON')
+        _local.conn, _local.path = conn, path
+    return _local.conn
+
+def close():
+    """Закрывает соединение текущего потока."""
+    conn = getattr(_local, 'conn', None)
+    if conn is not None:
+        conn.close()
+    _local.conn = _local.path = None
+
+class _Writer:
+    """
+    Фоновый поток записи. Задания (функции от соединения) копятся в очереди; поток забирает
+    все накопившиеся и фиксирует их одной транзакцией, так что вызывающий поток (в том числе GUI)
+    не ждет диска, а тысячи вставок серии дают десятки коммитов вместо тысяч.
+    """
+    def __init__(self):
+        self.queue = queue.Queue()
+        self.lock = threading.Lock()
+        self.thread = None
+        self.errors = []
+
+    def submit(self, job):
+        with self.lock:
+            if self.thread is None or not self.thread.is_alive():
+                self.thread = threading.Thread(target=self.run, name='history-writer', daemon=True)
+                self.thread.start()
+        self.queue.put((DB_PATH, job))
+
+    def flush(self):
+        self.queue.join()
+        if self.errors:
+            error = self.errors[0]
+            self.errors.clear()
+            raise error
+
+    def run(self):
+        while True:
+            batch = [self.queue.get()]
+            while len(batch) < WRITE_BATCH:
+                try:
+                    batch.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self.commit(batch)
+            finally:
+                for _ in batch:
+                    self.queue.task_done()
+
+    def commit(self, batch):
+        for path, group in itertools.groupby(batch, key=lambda item: item[0]):
+            jobs = [job for _, job in group]
+            try:
+                conn = connect(path)
+                with conn:
+                    for job in jobs:
+                        job(conn)
+            except Exception:
+                # Пачка откатилась целиком: повторяем задания по одному, чтобы потерять только ошибочное
+                for job in jobs:
+                    try:
+                        with connect(path) as conn:
+                            job(conn)
+                    except Exception as e:
+                        self.errors.append(e)
+
+_writer = _Writer()
+
+def flush():
+    """Ждет, пока фоновый поток зафиксирует все отправленные записи; ошибку записи пробрасывает."""
+    _writer.flush()
+
+def wait():
+    """
+    Ждет фиксации отправленных записей, не пробрасывая ошибок записи: чтение истории не падает
+    из-за чужого неудачного add_record, ошибки забирают flush() или pending_errors().
+    """
+    _writer.queue.join()
+
+def pending_errors():
+    """Забирает ошибки фоновой записи, накопленные с прошлого вызова (flush() их тоже забирает)."""
+    wait()
+    errors = list(_writer.errors)
+    _writer.errors.clear()
+    return errors
+
+# Записи, поставленные в очередь перед выходом из программы, не теряются
+atexit.register(wait)
+
 def init_db():
-    """Создает таблицу history и удаляет старые записи при запуске."""
+    """
+    Создает таблицы и индексы; удаление старых записей уходит в фоновый поток записи. Старая история
+    (params/results JSON-текстом) переносится в нормализованную схему тоже в фоновом потоке записи,
+    чтобы окно программы не ждало переноса; ход переноса — migration_progress().
+    """
     os.makedirs(BASE_DIR, exist_ok=True)
     
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('''
-        CREATE TABLE IF NOT EXISTS history (
-            id INTEGER PRIMARY KEY AUTOINCREMENT,
-            timestamp TEXT,
-            params TEXT,
-            results TEXT
-        )
-    ''')
-    conn.commit()
-    conn.close()
+    conn = connect()
+    with conn:
+        ensure_table(conn, 'result_cache', CACHE_SCHEMA)
+        ensure_table(conn, 'checkpoints', CHECKPOINT_SCHEMA)
+    columns = [row[1] for row in conn.execute('PRAGMA table_info(history)')]
+    if conn.execute('PRAGMA user_version').fetchone()[0] < SCHEMA_VERSION and 'params' in columns:
+        global _migration
+        _migration = (0, None)
+        _writer.submit(_migrate_json_history)
+    else:
+        with conn:
+            _create_history_schema(conn)
+            conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
     
     cleanup_old_records()
 
-def cleanup_old_records():
-    """Удаляет записи, которые старше 14 дней."""
+def _create_history_schema(conn):
+    conn.execute(HISTORY_SCHEMA)
+    # Базы, созданные до появления загрузки из файла
+    if 'imported_at' not in [row[1] for row in conn.execute('PRAGMA table_info(history)')]:
+        conn.execute('ALTER TABLE history ADD COLUMN imported_at TEXT')
+    conn.execute(RESULTS_SCHEMA)
+    # Очистка и delete_last_minutes выбирают диапазон по времени
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_history_timestamp ON history (timestamp)')
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_history_n ON history (n)')
+    # Поиск дубликатов при импорте (data/transfer.py)
+    conn.execute('CREATE INDEX IF NOT EXISTS idx_history_seed ON history (seed)')
+    conn.execute(LOSSES_SCHEMA)
+
+def ensure_table(conn, name, schema):
+    """
+    Создает таблицу name по schema, если ее нет. Сначала проверка чтением: CREATE TABLE даже
+    с IF NOT EXISTS ждет блокировки записи, а ее надолго занимает перенос старой истории.
+    """
+    if conn.execute('SELECT 1 FROM sqlite_master WHERE type = ? AND name = ?', ('table', name)).fetchone() is None:
+        conn.execute(schema)
+
+# Ход переноса старой истории: None — переноса нет, иначе (перенесено записей, всего или None)
+_migration = None
+
+def migration_progress():
+    """(перенесено записей, всего) пока идет перенос старой истории, иначе None."""
+    return _migration
+
+def _migrate_json_history(conn):
+    """
+    Задание фонового потока записи: переносит таблицу history с params/results в виде JSON-текста
+    в нормализованную схему. Перенос, создание схемы и смена user_version идут одной транзакцией
+    потока записи: при ошибке база остается в старом формате, а ошибка пробрасывается из flush().
+    id записей сохраняются, строки с испорченным JSON пропускаются (их и раньше не показывало окно истории).
+    """
+    global _migration
     try:
-        conn = sqlite3.connect(DB_PATH)
-        cursor = conn.cursor()
-        
-        cutoff = (datetime.now() - timedelta(days=14)).strftime("%Y-%m-%d %H:%M:%S")
-        cursor.execute('DELETE FROM history WHERE timestamp < ?', (cutoff,))
-            
-        conn.commit()
-        conn.close()
-    except Exception:
-        pass
+        # DDL не открывает транзакцию неявно, поэтому она начинается явно
+        if not conn.in_transaction:
+            conn.execute('BEGIN')
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(history)')]
+        # Повторный init_db до окончания переноса ставит второе задание: тогда переносить уже нечего
+        if 'params' in columns:
+            # Базы, созданные до появления seed и стандартных ошибок, не имеют этих столбцов
+            seed = 'seed' if 'seed' in columns else 'NULL'
+            errors = 'std_errors' if 'std_errors' in columns else 'NULL'
+            conn.execute('DROP INDEX IF EXISTS idx_history_timestamp')
+            conn.execute('ALTER TABLE history RENAME TO history_json')
+            conn.execute(HISTORY_SCHEMA)
+            conn.execute(RESULTS_SCHEMA)
+            total = conn.execute('SELECT COUNT(*) FROM history_json').fetchone()[0]
+            done = 0
+            _migration = (done, total)
+            old = conn.execute(f'SELECT id, timestamp, params, results, {seed}, {errors} FROM history_json ORDER BY id')
+            # Одни и те же параметры повторяются от прогона к прогону: каждый текст разбирается один раз
+            columns_by_text = {}
+            while True:
+                chunk = old.fetchmany(10000)
+                if not chunk:
+                    break
+                records, results = [], []
+                for record_id, timestamp, params, values, seed_value, std_errors in chunk:
+                    try:
+                        if params not in columns_by_text:
+                            columns_by_text[params] = param_values(json.loads(params))
+                        values = json.loads(values)
+                        std_errors = json.loads(std_errors) if std_errors is not None else None
+                    except (TypeError, json.JSONDecodeError):
+                        continue
+                    records.append((record_id, timestamp, seed_value) + columns_by_text[params])
+                    results.extend(_result_rows(record_id, values, std_errors))
+                conn.executemany(_INSERT_HISTORY_WITH_ID, records)
+                conn.executemany(_INSERT_RESULT, results)
+                done += len(chunk)
+                _migration = (done, total)
+            conn.execute('DROP TABLE history_json')
+        _create_history_schema(conn)
+        conn.execute(f'PRAGMA user_version = {SCHEMA_VERSION}')
+    finally:
+        _migration = None
+
+_PARAM_LIST = ', '.join(PARAM_COLUMNS)
+_INSERT_HISTORY = (f'INSERT INTO history (timestamp, seed, {_PARAM_LIST}, extra, imported_at) '
+                   f'VALUES (?, ?, {", ".join("?" * len(PARAM_COLUMNS))}, ?, ?)')
+_INSERT_HISTORY_WITH_ID = (f'INSERT INTO history (id, timestamp, seed, {_PARAM_LIST}, extra) '
+                           f'VALUES (?, ?, ?, {", ".join("?" * len(PARAM_COLUMNS))}, ?)')
+_INSERT_RESULT = 'INSERT INTO history_results (history_id, strategy, loss, std_error) VALUES (?, ?, ?, ?)'
+
+# Точные типы значений, которые ложатся в столбец (bool — подкласс int, поэтому не isinstance)
+_ACCEPTED = {key: {int: (int,), float: (float, int), str: (str,), bool: (bool,)}[kind]
+             for key, kind in PARAM_COLUMNS.items()}
+
+def param_values(params):
+    """Значения столбцов PARAM_COLUMNS и JSON прочих ключей (или None)."""
+    values, extra = [], {}
+    for key, accepted in _ACCEPTED.items():
+        value = params.get(key)
+        if value is not None and type(value) not in accepted:
+            extra[key] = value
+            value = None
+        values.append(value)
+    extra.update((key, value) for key, value in params.items() if key not in PARAM_COLUMNS)
+    return tuple(values) + (json.dumps(extra) if extra else None,)
+
+def params_from_row(values, extra):
+    """Параметры записи из значений столбцов PARAM_COLUMNS и JSON extra (обратно к param_values)."""
+    params = {key: kind(value) for (key, kind), value in zip(PARAM_COLUMNS.items(), values) if value is not None}
+    if extra:
+        params.update(json.loads(extra))
+    return params
+
+def _result_rows(record_id, results, std_errors):
+    std_errors = std_errors or {}
+    return [(record_id, name, loss, std_errors.get(name)) for name, loss in results.items()]
+
+def _insert(conn, timestamp, params, results, seed, std_errors, losses=None, imported_at=None):
+    cursor = conn.execute(_INSERT_HISTORY, (timestamp, seed) + param_values(params) + (imported_at,))
+    conn.executemany(_INSERT_RESULT, _result_rows(cursor.lastrowid, results, std_errors))
+    if losses:
+        # Сжатие идет здесь, в потоке записи, а не в вызывающем потоке
+        from data.losses import blob_rows
+        conn.executemany('INSERT INTO history_losses (history_id, strategy, chunk, count, data, same_as) '
+                         'VALUES (?, ?, ?, ?, ?, ?)', blob_rows(cursor.lastrowid, losses))
 
-def add_record(params, results):
-    """Сохраняет эксперимент в базу данных."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
+def cleanup_old_records():
+    """Удаляет записи и кэшированные прогоны, которые старше 14 дней (в фоне); загруженные из файла записи остаются."""
+    cutoff = (datetime.now() - timedelta(days=14)).strftime("%Y-%m-%d %H:%M:%S")
     
+    def job(conn):
+        try:
+            conn.execute('DELETE FROM history WHERE timestamp < ? AND imported_at IS NULL', (cutoff,))
+            conn.execute('DELETE FROM result_cache WHERE timestamp < ?', (cutoff,))
+        except sqlite3.Error:
+            pass
+    _writer.submit(job)
+
+def add_record(params, results, seed=None, std_errors=None, losses=None):
+    """
+    Сохраняет эксперимент в базу данных. seed позволяет воспроизвести любую матрицу прогона,
+    std_errors — стандартные ошибки средних потерь {стратегия: SE}, losses — необязательные
+    векторы потерь по экспериментам {стратегия: массив} (хранятся сжатыми, см. data/losses.py).
+    Запись выполняет фоновый поток: вызов не ждет диска; flush() дожидается фиксации.
+    """
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    params_json = json.dumps(params)
-    results_json = json.dumps(results)
+    params, results = dict(params), dict(results)
+    std_errors = dict(std_errors) if std_errors is not None else None
+    losses = dict(losses) if losses else None
+    _writer.submit(lambda conn: _insert(conn, timestamp, params, results, seed, std_errors, losses))
+
+def add_records(entries):
+    """
+    Сохраняет несколько экспериментов одной транзакцией (серии, слияние шардов).
+    entries — словари с ключами params, results и необязательными seed, std_errors.
+    """
+    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    entries = [(dict(e['params']), dict(e['results']), e.get('seed'), e.get('std_errors')) for e in entries]
     
-    cursor.execute('INSERT INTO history (timestamp, params, results) VALUES (?, ?, ?)',
-                   (timestamp, params_json, results_json))
-    conn.commit()
-    conn.close()
+    def job(conn):
+        for params, results, seed, std_errors in entries:
+            _insert(conn, timestamp, params, results, seed, std_errors)
+    _writer.submit(job)
+
+def import_records(entries):
+    """
+    Загружает записи из другой истории (data/transfer.py) одной транзакцией в текущем потоке.
+    В отличие от add_records время прогона сохраняется, а запись отмечается временем загрузки
+    (imported_at), поэтому очистка старых записей ее не удаляет. entries — итерируемое словарей
+    с ключами timestamp, params, results и необязательными seed, std_errors, losses; оно читается
+    по одной записи, так что потери всей порции в памяти не собираются. Возвращает число записей.
+    """
+    wait()
+    imported_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    conn = connect()
+    count = 0
+    with conn:
+        for e in entries:
+            _insert(conn, e['timestamp'], e['params'], e['results'], e.get('seed'), e.get('std_errors'),
+                    e.get('losses'), imported_at)
+            count += 1
+    return count
+
+def _record(row, results, errors):
+    """Запись истории из строки (id, timestamp, seed, extra, *PARAM_COLUMNS) и потерь по id."""
+    return {
+        'id': row[0],
+        'timestamp': row[1],
+        'params': params_from_row(row[4:], row[3]),
+        'results': results.get(row[0], {}),
+        'seed': row[2],
+        'std_errors': errors.get(row[0])
+    }
+
+def _collect_results(rows):
+    results, errors = {}, {}
+    for record_id, strategy, loss, std_error in rows:
+        results.setdefault(record_id, {})[strategy] = loss
+        if std_error is not None:
+            errors.setdefault(record_id, {})[strategy] = std_error
+    return results, errors
 
 def get_all_records():
-    """Возвращает все записи, отсортированные от новых к старым."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('SELECT id, timestamp, params, results FROM history ORDER BY id DESC')
-    rows = cursor.fetchall()
-    conn.close()
-    
-    records = []
-    for row in rows:
-        try:
-            records.append({
-                'id': row[0],
-                'timestamp': row[1],
-                'params': json.loads(row[2]),
-                'results': json.loads(row[3])
-            })
-        except json.JSONDecodeError:
-            continue
-    return records
+    """Возвращает все записи, отсортированные от новых к старым (с учетом еще не записанных)."""
+    wait()
+    conn = connect()
+    results, errors = _collect_results(conn.execute(
+        'SELECT history_id, strategy, loss, std_error FROM history_results'))
+    rows = conn.execute(f'SELECT id, timestamp, seed, extra, {_PARAM_LIST} FROM history ORDER BY id DESC')
+    return [_record(row, results, errors) for row in rows]
+
+FILTER_COLUMNS = ('id', 'timestamp', 'seed') + tuple(PARAM_COLUMNS)
+
+def _where(filters, alias='h'):
+    """
+    SQL-условие и аргументы по фильтрам {столбец: значение}. Значение — равенство,
+    кортеж (от, до) — диапазон с границами (None — без границы), список — IN.
+    """
+    clauses, args = [], []
+    for key, value in filters.items():
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"unknown history column '{key}' (expected one of {FILTER_COLUMNS})")
+        column = f'{alias}.{key}'
+        if isinstance(value, tuple):
+            low, high = value
+            if low is not None:
+                clauses.append(f'{column} >= ?')
+                args.append(low)
+            if high is not None:
+                clauses.append(f'{column} <= ?')
+                args.append(high)
+        elif isinstance(value, list):
+            clauses.append(f'{column} IN ({", ".join("?" * len(value))})')
+            args.extend(value)
+        elif value is None:
+            clauses.append(f'{column} IS NULL')
+        else:
+            clauses.append(f'{column} = ?')
+            args.append(value)
+    return ' AND '.join(clauses) or '1', args
+
+def get_records_page(before_id=None, limit=200, **filters):
+    """
+    Страница истории от новых к старым: не больше limit записей с id < before_id (None — с начала),
+    подходящих под фильтры (см. _where). Следующая страница — before_id = id последней записи,
+    поэтому цена страницы не зависит ни от ее номера, ни от размера истории.
+    """
+    wait()
+    where, args = _where(filters)
+    if before_id is not None:
+        where += ' AND h.id < ?'
+        args.append(before_id)
+    conn = connect()
+    rows = conn.execute(f'SELECT h.id, h.timestamp, h.seed, h.extra, {", ".join("h." + key for key in PARAM_COLUMNS)} '
+                        f'FROM history h WHERE {where} ORDER BY h.id DESC LIMIT ?', args + [limit]).fetchall()
+    ids = [row[0] for row in rows]
+    results, errors = _collect_results(conn.execute(
+        f'SELECT history_id, strategy, loss, std_error FROM history_results '
+        f'WHERE history_id IN ({", ".join("?" * len(ids))})', ids)) if ids else ({}, {})
+    return [_record(row, results, errors) for row in rows]
+
+def iter_records(chunk=5000, **filters):
+    """
+    Все записи, подходящие под фильтры, порциями от старых к новым (списки словарей, как в
+    get_all_records). Порция выбирается по id последней записи предыдущей, поэтому память
+    не зависит от размера истории.
+    """
+    wait()
+    conn = connect()
+    columns = ", ".join("h." + key for key in PARAM_COLUMNS)
+    last_id = None
+    while True:
+        where, args = _where(filters)
+        if last_id is not None:
+            where += ' AND h.id > ?'
+            args.append(last_id)
+        rows = conn.execute(f'SELECT h.id, h.timestamp, h.seed, h.extra, {columns} FROM history h '
+                            f'WHERE {where} ORDER BY h.id LIMIT ?', args + [chunk]).fetchall()
+        if not rows:
+            return
+        ids = [row[0] for row in rows]
+        results, errors = _collect_results(conn.execute(
+            f'SELECT history_id, strategy, loss, std_error FROM history_results '
+            f'WHERE history_id IN ({", ".join("?" * len(ids))})', ids))
+        yield [_record(row, results, errors) for row in rows]
+        last_id = ids[-1]
+
+_YES = ('1', 'true', 'да', 'yes')
+_NO = ('0', 'false', 'нет', 'no')
+
+def _filter_value(key, text):
+    kind = {'id': int, 'seed': int, 'timestamp': str}.get(key) or PARAM_COLUMNS[key]
+    if kind is str:
+        return text
+    if kind is bool:
+        if text.lower() in _YES:
+            return True
+        if text.lower() in _NO:
+            return False
+        raise ValueError(f"'{text}' is not a boolean value for '{key}'")
+    try:
+        value = float(text.replace(',', '.'))
+    except ValueError:
+        raise ValueError(f"'{text}' is not a number for '{key}'")
+    if kind is int:
+        if value != int(value):
+            raise ValueError(f"'{key}' must be an integer, got {text}")
+        return int(value)
+    return value
+
+def parse_filters(text):
+    """
+    Фильтры из строки поиска: условия через пробел вида key=value, key=a|b (любое из),
+    key>=value, key<=value; например "n=15|20 beta1>=0.8 dist_type=uniform".
+    """
+    filters = {}
+    for term in text.split():
+        for op in ('>=', '<=', '='):
+            key, sep, value = term.partition(op)
+            if sep:
+                break
+        else:
+            raise ValueError(f"search term must look like key=value, key>=value or key<=value, got '{term}'")
+        key, value = key.strip(), value.strip()
+        if key == 't':
+            key = 'T'
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"unknown history column '{key}' (expected one of {FILTER_COLUMNS})")
+        if not value:
+            raise ValueError(f"missing value for '{key}'")
+        if op == '=':
+            values = [_filter_value(key, item) for item in value.split('|')]
+            filters[key] = values if len(values) > 1 else values[0]
+        else:
+            low, high = filters.get(key) if isinstance(filters.get(key), tuple) else (None, None)
+            bound = _filter_value(key, value)
+            filters[key] = (bound, high) if op == '>=' else (low, bound)
+    return filters
+
+def count_records(**filters):
+    """Число записей истории, подходящих под фильтры (см. _where)."""
+    wait()
+    where, args = _where(filters)
+    return connect().execute(f'SELECT COUNT(*) FROM history h WHERE {where}', args).fetchone()[0]
+
+def aggregate_losses(group_by='n', strategy=None, **filters):
+    """
+    Средние потери по группам средствами SQL: список словарей со значениями столбцов group_by
+    (строка или кортеж столбцов), strategy и mean, min, max, count.
+    Например, aggregate_losses('n', 'greedy', dist_type='uniform', beta1=(0.8, None)).
+    """
+    wait()
+    group_by = (group_by,) if isinstance(group_by, str) else tuple(group_by)
+    for key in group_by:
+        if key not in FILTER_COLUMNS:
+            raise ValueError(f"unknown history column '{key}' (expected one of {FILTER_COLUMNS})")
+    where, args = _where(filters)
+    if strategy is not None:
+        where += ' AND r.strategy = ?'
+        args.append(strategy)
+    keys = ', '.join(f'h.{key}' for key in group_by)
+    rows = connect().execute(
+        f'SELECT {keys}, r.strategy, AVG(r.loss), MIN(r.loss), MAX(r.loss), COUNT(*) '
+        f'FROM history_results r JOIN history h ON h.id = r.history_id '
+        f'WHERE {where} GROUP BY {keys}, r.strategy ORDER BY {keys}, r.strategy', args)
+    names = group_by + ('strategy', 'mean', 'min', 'max', 'count')
+    return [dict(zip(names, row)) for row in rows]
 
 def delete_last_minutes(minutes):
     """Удаляет записи за последние N минут."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
     cutoff = (datetime.now() - timedelta(minutes=minutes)).strftime("%Y-%m-%d %H:%M:%S")
-    cursor.execute('DELETE FROM history WHERE timestamp >= ?', (cutoff,))
-    conn.commit()
-    conn.close()
+    _writer.submit(lambda conn: conn.execute('DELETE FROM history WHERE timestamp >= ?', (cutoff,)))
+    wait()
 
 def delete_all():
     """Полная очистка истории."""
-    conn = sqlite3.connect(DB_PATH)
-    cursor = conn.cursor()
-    cursor.execute('DELETE FROM history')
-    conn.commit()
-    conn.close()
\ No newline at end of file
+    _writer.submit(lambda conn: conn.execute('DELETE FROM history'))
+    wait()
@@ -0,0 +1,109 @@
+"""
+Потери по каждому эксперименту прогона, сжатые и привязанные к записи истории.
+
+В истории хранятся только средние потери; чтобы строить гистограммы и квантили без повторного
+расчета, прогон может сохранить и сами векторы потерь (по одному на стратегию) в таблицу
+history_losses. Вектор делится на порции по CHUNK_SIZE экспериментов, каждая порция хранится так:
+
+    * float32 (4 байта вместо 8; относительная ошибка ~6e-8, для потерь в процентах — ~1e-6 п.п.);
+    * байты перегруппированы по разрядам (сначала все первые байты чисел, затем вторые и т.д.):
+      старшие байты (знак, порядок) почти одинаковы и хорошо сжимаются;
+    * zlib уровня 1 (уровень 9 на этих данных почти не выигрывает, но в разы медленнее).
+
+Разности соседних значений (delta) не помогают: эксперименты независимы. Вместо этого
+одинаковые векторы хранятся один раз: без дозаривания (v=0) жадно-бережливая стратегия
+совпадает с бережливой, а бережливо-жадная — с жадной, и их строки ссылаются на исходную (same_as).
+Итого около 3 байт на эксперимент и стратегию: ~15 МБ на 1e6 экспериментов, ~9 МБ при v=0.
+
+Чтение потоковое: iter_losses отдает порции по одной, не загружая таблицу целиком.
+"""
+import zlib
+
+import numpy as np
+
+import data.database as db
+
+CHUNK_SIZE = 65536
+LEVEL = 1
+
+
+def encode(values):
+    """Сжатая порция: float32, перегруппировка байтов, zlib."""
+    values = np.ascontiguousarray(values, dtype=np.float32)
+    return zlib.compress(values.view(np.uint8).reshape(-1, 4).T.tobytes(), LEVEL)
+
+
+def decode(blob, count):
+    """Обратно к encode: массив float32 длины count."""
+    shuffled = np.frombuffer(zlib.decompress(blob), dtype=np.uint8).reshape(4, count)
+    return np.ascontiguousarray(shuffled.T).view(np.float32).ravel()
+
+
+def blob_rows(history_id, losses):
+    """Строки history_losses для {стратегия: вектор потерь}; одинаковые векторы хранятся один раз."""
+    rows, stored = [], {}
+    for name, values in losses.items():
+        values = np.asarray(values, dtype=np.float32).ravel()
+        original = next((other for other, kept in stored.items() if np.array_equal(kept, values)), None)
+        if original is not None:
+            rows.append((history_id, name, 0, len(values), None, original))
+            continue
+        stored[name] = values
+        for chunk, first in enumerate(range(0, max(len(values), 1), CHUNK_SIZE)):
+            part = values[first:first + CHUNK_SIZE]
+            rows.append((history_id, name, chunk, len(part), encode(part), None))
+    return rows
+
+
+def iter_losses(history_id, strategy):
+    """Потери стратегии в записи истории порциями (массивы float32) по порядку экспериментов."""
+    db.wait()
+    conn = db.connect()
+    row = conn.execute('SELECT same_as FROM history_losses WHERE history_id = ? AND strategy = ? AND chunk = 0',
+                       (history_id, strategy)).fetchone()
+    if row is not None and row[0] is not None:
+        strategy = row[0]
+    for count, blob in conn.execute('SELECT count, data FROM history_losses WHERE history_id = ? AND strategy = ? '
+                                    'ORDER BY chunk', (history_id, strategy)):
+        yield decode(blob, count)
+
+
+def load_losses(history_id, strategies=None):
+    """Векторы потерь записи {стратегия: float32-массив}; пустой словарь, если они не сохранялись."""
+    if strategies is None:
+        strategies = stored_strategies(history_id)
+    losses = {}
+    for name in strategies:
+        chunks = list(iter_losses(history_id, name))
+        if chunks:
+            losses[name] = np.concatenate(chunks)
+    return losses
+
+
+def stored_counts(history_id):
+    """Число сохраненных потерь записи по стратегиям {стратегия: count} в порядке сохранения."""
+    db.wait()
+    return dict(db.connect().execute(
+        'SELECT strategy, SUM(count) FROM history_losses WHERE history_id = ? '
+        'GROUP BY strategy ORDER BY MIN(rowid)', (history_id,)))
+
+
+def stored_strategies(history_id):
+    """Стратегии, для которых у записи сохранены потери."""
+    return list(stored_counts(history_id))
+
+
+def storage_stats():
+    """Объем сохраненных потерь: записей, пар (эксперимент, стратегия), байт и байт на 1e6 экспериментов записи."""
+    db.wait()
+    records, values, size = db.connect().execute(
+        'SELECT COUNT(DISTINCT history_id), COALESCE(SUM(count), 0), COALESCE(SUM(LENGTH(data)), 0) '
+        'FROM history_losses').fetchone()
+    experiments = db.connect().execute(
+        'SELECT COALESCE(SUM(count), 0) FROM history_losses WHERE strategy = ?', ('greedy',)).fetchone()[0]
+    return {
+        'records': records,
+        'values': values,
+        'bytes': size,
+        'bytes_per_million': size / experiments * 1e6 if experiments else 0.0,
+    }
@@ -0,0 +1,530 @@
+"""
+Выгрузка и загрузка истории экспериментов: CSV, NPZ и Arrow IPC.
+
+Запись истории выгружается одной плоской строкой: id, timestamp, seed, столбцы параметров
+(PARAM_COLUMNS), extra (JSON прочих ключей), loss_<стратегия> и se_<стратегия>. Потери по каждому
+эксперименту (data/losses.py), если они сохранялись, идут отдельно:
+
+    csv    ИМЯ.csv — записи; ИМЯ.losses.csv — строки history_id, strategy, experiment, loss;
+    npz    один архив: history_NNNNNN — порции записей (структурные массивы; NULL отмечен битом
+           в столбце null_mask), losses/<id>/<стратегия> — векторы float32;
+    arrow  ИМЯ.arrow — записи; ИМЯ.losses.arrow — строки history_id, strategy, values (список float32).
+           Нужен пакет pyarrow (необязательная зависимость).
+
+И выгрузка, и загрузка идут порциями по CHUNK_ROWS записей, а потери — порциями по CHUNK_SIZE
+экспериментов, поэтому память не зависит от размера истории. Записи выгружаются по возрастанию id,
+и потери идут в том же порядке: при загрузке они сопоставляются записям одним проходом.
+
+Загрузка пишет порции отдельными транзакциями и пропускает записи, которые уже есть в истории
+(или встретились раньше в том же файле): ключ — параметры и seed, а для записей без seed
+еще и время. id записей при загрузке назначаются заново, время прогона сохраняется, а сами записи
+отмечаются временем загрузки (db.import_records): очистка старых записей их не удаляет.
+
+Использование:
+    python -m data.transfer export FILE [--format csv|npz|arrow] [--filter "n=15 beta1>=0.8"] [--no-losses]
+    python -m data.transfer import FILE [--format csv|npz|arrow]
+"""
+import argparse
+import csv
+import io
+import itertools
+import json
+import os
+import sys
+import zipfile
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import data.database as db
+from data import losses as loss_store
+
+FORMATS = ('csv', 'npz', 'arrow')
+EXTENSIONS = {'.csv': 'csv', '.npz': 'npz', '.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow'}
+CHUNK_ROWS = 5000
+# Биты null_mask в NPZ: seed, столбцы параметров, extra
+NULLABLE = ('seed',) + tuple(db.PARAM_COLUMNS) + ('extra',)
+
+
+def detect_format(path, fmt=None):
+    """Формат по явному выбору или по расширению файла."""
+    fmt = fmt or EXTENSIONS.get(os.path.splitext(path)[1].lower())
+    if fmt not in FORMATS:
+        raise ValueError(f"unknown export format for '{path}' (expected one of {FORMATS} or a matching extension)")
+    return fmt
+
+
+def losses_path(path):
+    """Файл потерь рядом с файлом записей: ИМЯ.csv -> ИМЯ.losses.csv."""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}.losses{ext}"
+
+
+def _import_arrow():
+    try:
+        import pyarrow
+        import pyarrow.ipc  # noqa: F401
+    except ImportError:
+        raise ImportError("Arrow IPC export/import requires pyarrow (pip install pyarrow)")
+    return pyarrow
+
+
+# --- ПЛОСКИЕ СТРОКИ ---
+
+def strategies():
+    """Стратегии, встречающиеся в истории (порядок столбцов loss_*/se_*)."""
+    db.wait()
+    return [row[0] for row in db.connect().execute('SELECT DISTINCT strategy FROM history_results ORDER BY strategy')]
+
+
+def columns(names):
+    return (['id', 'timestamp'] + list(NULLABLE)
+            + [f'loss_{name}' for name in names] + [f'se_{name}' for name in names])
+
+
+def flatten(record, names):
+    """Запись истории (как в get_all_records) -> плоская строка {столбец: значение или None}."""
+    values = db.param_values(record['params'])
+    row = {'id': record['id'], 'timestamp': record['timestamp'], 'seed': record['seed']}
+    row.update(zip(db.PARAM_COLUMNS, values[:-1]))
+    row['extra'] = values[-1]
+    std_errors = record['std_errors'] or {}
+    for name in names:
+        row[f'loss_{name}'] = record['results'].get(name)
+        row[f'se_{name}'] = std_errors.get(name)
+    return row
+
+
+def unflatten(row):
+    """Плоская строка -> (timestamp, params, results, seed, std_errors)."""
+    params = db.params_from_row([row.get(key) for key in db.PARAM_COLUMNS], row.get('extra'))
+    results, std_errors = {}, {}
+    for key, value in row.items():
+        if value is None:
+            continue
+        if key.startswith('loss_'):
+            results[key[5:]] = value
+        elif key.startswith('se_'):
+            std_errors[key[3:]] = value
+    return row.get('timestamp'), params, results, row.get('seed'), std_errors or None
+
+
+# --- ВЫГРУЗКА ---
+
+class _CsvWriter:
+    def __init__(self, path, names):
+        self.path, self.names = path, names
+        self.file = open(path, 'w', newline='', encoding='utf-8')
+        self.writer = csv.DictWriter(self.file, fieldnames=columns(names))
+        self.writer.writeheader()
+        self.losses_file = None
+
+    def write_records(self, rows):
+        for row in rows:
+            self.writer.writerow({key: _csv_text(value) for key, value in row.items()})
+
+    def write_losses(self, record_id, strategy, count, chunks):
+        if self.losses_file is None:
+            self.losses_file = open(losses_path(self.path), 'w', newline='', encoding='utf-8')
+            self.losses_writer = csv.writer(self.losses_file)
+            self.losses_writer.writerow(['history_id', 'strategy', 'experiment', 'loss'])
+        index = 0
+        for chunk in chunks:
+            # Кратчайшая запись float32, которая читается обратно без потерь
+            texts = np.asarray(chunk, dtype=np.float32).astype(str)
+            self.losses_writer.writerows(zip(itertools.repeat(record_id), itertools.repeat(strategy),
+                                             range(index, index + len(texts)), texts))
+            index += len(texts)
+
+    def close(self):
+        self.file.close()
+        if self.losses_file is not None:
+            self.losses_file.close()
+
+
+def _csv_text(value):
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return int(value)
+    return repr(value) if isinstance(value, float) else value
+
+
+class _NpzWriter:
+    def __init__(self, path, names):
+        self.names = names
+        self.zip = zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED, allowZip64=True)
+        self.chunk = 0
+
+    def write_records(self, rows):
+        self.zip.writestr(f'history_{self.chunk:06d}.npy', _npy_bytes(_structured(rows, self.names)))
+        self.chunk += 1
+
+    def write_losses(self, record_id, strategy, count, chunks):
+        # Заголовок .npy пишется заранее (длина известна), данные — порциями прямо в архив
+        with self.zip.open(f'losses/{record_id}/{strategy}.npy', 'w', force_zip64=True) as member:
+            np.lib.format.write_array_header_1_0(
+                member, {'descr': np.lib.format.dtype_to_descr(np.dtype('<f4')), 'fortran_order': False,
+                         'shape': (int(count),)})
+            for chunk in chunks:
+                member.write(np.ascontiguousarray(chunk, dtype='<f4').tobytes())
+
+    def close(self):
+        self.zip.close()
+
+
+def _npy_bytes(array):
+    buffer = io.BytesIO()
+    np.save(buffer, array, allow_pickle=False)
+    return buffer.getvalue()
+
+
+def _structured(rows, names):
+    """Порция записей как структурный массив; NULL числовых столбцов отмечается битом null_mask."""
+    kinds = {'seed': int, 'extra': str, **db.PARAM_COLUMNS}
+    numpy_types = {int: 'i8', float: 'f8', bool: 'i1'}
+    fields = [('id', 'i8'), ('timestamp', f'U{max([len(r["timestamp"] or "") for r in rows] + [1])}')]
+    for key in NULLABLE:
+        if kinds[key] is str:
+            fields.append((key, f'U{max([len(r[key] or "") for r in rows] + [1])}'))
+        else:
+            fields.append((key, numpy_types[kinds[key]]))
+    fields += [(f'loss_{name}', 'f8') for name in names] + [(f'se_{name}', 'f8') for name in names]
+    fields.append(('null_mask', 'u4'))
+
+    array = np.zeros(len(rows), dtype=fields)
+    for i, row in enumerate(rows):
+        mask = 0
+        for bit, key in enumerate(NULLABLE):
+            if row[key] is None:
+                mask |= 1 << bit
+            else:
+                array[key][i] = row[key]
+        for name in names:
+            for prefix in ('loss_', 'se_'):
+                value = row[prefix + name]
+                array[prefix + name][i] = np.nan if value is None else value
+        array['id'][i] = row['id']
+        array['timestamp'][i] = row['timestamp'] or ''
+        array['null_mask'][i] = mask
+    return array
+
+
+class _ArrowWriter:
+    def __init__(self, path, names):
+        pa = self.pa = _import_arrow()
+        types = {int: pa.int64(), float: pa.float64(), str: pa.string(), bool: pa.bool_()}
+        kinds = {'seed': int, 'extra': str, **db.PARAM_COLUMNS}
+        fields = [('id', pa.int64()), ('timestamp', pa.string())] + [(key, types[kinds[key]]) for key in NULLABLE]
+        fields += [(f'loss_{name}', pa.float64()) for name in names] + [(f'se_{name}', pa.float64()) for name in names]
+        self.path, self.schema = path, pa.schema(fields)
+        self.sink = pa.OSFile(path, 'wb')
+        self.writer = pa.ipc.new_file(self.sink, self.schema)
+        self.losses_schema = pa.schema([('history_id', pa.int64()), ('strategy', pa.string()),
+                                        ('values', pa.list_(pa.float32()))])
+        self.losses_sink = self.losses_writer = None
+
+    def write_records(self, rows):
+        data = {name: [row[name] for row in rows] for name in self.schema.names}
+        self.writer.write_batch(self.pa.RecordBatch.from_pydict(data, schema=self.schema))
+
+    def write_losses(self, record_id, strategy, count, chunks):
+        pa = self.pa
+        if self.losses_writer is None:
+            self.losses_sink = pa.OSFile(losses_path(self.path), 'wb')
+            self.losses_writer = pa.ipc.new_file(self.losses_sink, self.losses_schema)
+        for chunk in chunks:
+            values = pa.ListArray.from_arrays(pa.array([0, len(chunk)], pa.int32()),
+                                              pa.array(np.asarray(chunk, dtype=np.float32)))
+            self.losses_writer.write_batch(pa.RecordBatch.from_arrays(
+                [pa.array([record_id], pa.int64()), pa.array([strategy]), values], schema=self.losses_schema))
+
+    def close(self):
+        self.writer.close()
+        self.sink.close()
+        if self.losses_writer is not None:
+            self.losses_writer.close()
+            self.losses_sink.close()
+
+
+_WRITERS = {'csv': _CsvWriter, 'npz': _NpzWriter, 'arrow': _ArrowWriter}
+
+
+def export_history(path, fmt=None, include_losses=True, **filters):
+    """
+    Выгружает записи истории (с фильтрами, см. database._where) и, если include_losses,
+    их потери по экспериментам. Возвращает {'records': N, 'losses': число выгруженных потерь}.
+    """
+    fmt = detect_format(path, fmt)
+    names = strategies()
+    writer = _WRITERS[fmt](path, names)
+    exported = {'records': 0, 'losses': 0}
+    try:
+        for records in db.iter_records(CHUNK_ROWS, **filters):
+            writer.write_records([flatten(record, names) for record in records])
+            exported['records'] += len(records)
+            if not include_losses:
+                continue
+            ids = [record['id'] for record in records]
+            with_losses = [row[0] for row in db.connect().execute(
+                f'SELECT DISTINCT history_id FROM history_losses WHERE history_id IN ({", ".join("?" * len(ids))}) '
+                f'ORDER BY history_id', ids)]
+            for record_id in with_losses:
+                for strategy, count in loss_store.stored_counts(record_id).items():
+                    writer.write_losses(record_id, strategy, count, loss_store.iter_losses(record_id, strategy))
+                    exported['losses'] += count
+    finally:
+        writer.close()
+    return exported
+
+
+# --- ЗАГРУЗКА ---
+
+def _parse_csv_value(key, text):
+    if text == '':
+        return None
+    if key in ('id', 'seed'):
+        return int(text)
+    if key in ('timestamp', 'extra'):
+        return text
+    kind = db.PARAM_COLUMNS.get(key, float)
+    if kind is bool:
+        return bool(int(text))
+    return kind(text)
+
+
+class _LossStream:
+    """Потери из отдельного файла, упорядоченного по history_id: сопоставляются записям одним проходом."""
+    def __init__(self, items):
+        # items — итератор (history_id, strategy, функция -> массив значений) по возрастанию
+        # history_id; значения пропускаемых при загрузке записей не разбираются
+        self.items = items
+        self.pending = next(self.items, None)
+
+    def losses_for(self, record_id, load=True):
+        while self.pending is not None and self.pending[0] < record_id:
+            self.pending = next(self.items, None)
+        losses = {}
+        while self.pending is not None and self.pending[0] == record_id:
+            _, strategy, values = self.pending
+            if load:
+                losses.setdefault(strategy, []).append(values())
+            self.pending = next(self.items, None)
+        return {name: np.concatenate(parts) for name, parts in losses.items()} or None
+
+
+class _CsvReader:
+    def __init__(self, path):
+        self.path = path
+        self.losses = _LossStream(self._loss_items())
+
+    def records(self):
+        with open(self.path, newline='', encoding='utf-8') as f:
+            for row in csv.DictReader(f):
+                yield {key: _parse_csv_value(key, text) for key, text in row.items()}
+
+    def _loss_items(self):
+        path = losses_path(self.path)
+        if not os.path.exists(path):
+            return
+        with open(path, newline='', encoding='utf-8') as f:
+            reader = csv.reader(f)
+            next(reader, None)
+            key, texts = None, []
+            for history_id, strategy, _, loss in reader:
+                if (history_id, strategy) != key or len(texts) >= loss_store.CHUNK_SIZE:
+                    if texts:
+                        yield int(key[0]), key[1], lambda texts=texts: np.array(texts, dtype=np.float32)
+                    key, texts = (history_id, strategy), []
+                texts.append(loss)
+            if texts:
+                yield int(key[0]), key[1], lambda texts=texts: np.array(texts, dtype=np.float32)
+
+    def losses_for(self, record_id, load=True):
+        return self.losses.losses_for(record_id, load)
+
+    def close(self):
+        self.losses.items.close()
+
+
+class _NpzReader:
+    def __init__(self, path):
+        self.npz = np.load(path, allow_pickle=False)
+        self.loss_members = {}
+        for name in self.npz.files:
+            if name.startswith('losses/'):
+                _, record_id, strategy = name.split('/', 2)
+                self.loss_members.setdefault(int(record_id), []).append((strategy, name))
+
+    def records(self):
+        for name in sorted(n for n in self.npz.files if n.startswith('history_')):
+            chunk = self.npz[name]
+            # Порция разбирается по столбцам целиком, а не поэлементно
+            data = {}
+            for field in chunk.dtype.names:
+                if field == 'null_mask':
+                    continue
+                column = chunk[field]
+                if db.PARAM_COLUMNS.get(field) is bool:
+                    column = column.astype(bool)
+                if field in NULLABLE:
+                    null = chunk['null_mask'] & (1 << NULLABLE.index(field)) != 0
+                elif field.startswith(('loss_', 'se_')):
+                    null = np.isnan(column)
+                else:
+                    null = None
+                data[field] = column.tolist()
+                if null is not None and null.any():
+                    for i in np.flatnonzero(null).tolist():
+                        data[field][i] = None
+            for values in zip(*data.values()):
+                yield dict(zip(data, values))
+
+    def losses_for(self, record_id, load=True):
+        members = self.loss_members.get(record_id)
+        if not members or not load:
+            return None
+        return {strategy: self.npz[name] for strategy, name in members}
+
+    def close(self):
+        self.npz.close()
+
+
+class _ArrowReader:
+    def __init__(self, path):
+        self.pa = _import_arrow()
+        self.path = path
+        self.losses = _LossStream(self._loss_items())
+
+    def records(self):
+        with self.pa.OSFile(self.path, 'rb') as source:
+            reader = self.pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                yield from reader.get_batch(i).to_pylist()
+
+    def _loss_items(self):
+        path = losses_path(self.path)
+        if not os.path.exists(path):
+            return
+        with self.pa.OSFile(path, 'rb') as source:
+            reader = self.pa.ipc.open_file(source)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                ids, names = batch.column('history_id').to_pylist(), batch.column('strategy').to_pylist()
+                values = batch.column('values')
+                for j in range(batch.num_rows):
+                    yield ids[j], names[j], lambda j=j: values[j].values.to_numpy(zero_copy_only=False)
+
+    def losses_for(self, record_id, load=True):
+        return self.losses.losses_for(record_id, load)
+
+    def close(self):
+        self.losses.items.close()
+
+
+_READERS = {'csv': _CsvReader, 'npz': _NpzReader, 'arrow': _ArrowReader}
+
+
+def _run_key(seed, timestamp, values):
+    """Ключ дубликата: seed, столбцы параметров и extra (без порядка ключей); время — только без seed."""
+    *columns_values, extra = values
+    extra = json.dumps(json.loads(extra), sort_keys=True) if extra else None
+    return (seed, timestamp if seed is None else None, *columns_values, extra)
+
+
+def _existing_keys(conn, batch):
+    """Ключи записей истории с теми же seed (или тем же временем для записей без seed), что в порции."""
+    seeds = sorted({seed for seed, timestamp, _ in batch if seed is not None})
+    stamps = sorted({timestamp for seed, timestamp, _ in batch if seed is None})
+    select = f'SELECT seed, timestamp, {", ".join(db.PARAM_COLUMNS)}, extra FROM history WHERE '
+    keys = set()
+    for start in range(0, len(seeds), 500):
+        part = seeds[start:start + 500]
+        for row in conn.execute(select + f'seed IN ({", ".join("?" * len(part))})', part):
+            keys.add(_run_key(row[0], row[1], row[2:]))
+    for start in range(0, len(stamps), 500):
+        part = stamps[start:start + 500]
+        for row in conn.execute(select + f'seed IS NULL AND timestamp IN ({", ".join("?" * len(part))})', part):
+            keys.add(_run_key(row[0], row[1], row[2:]))
+    return keys
+
+
+def import_history(path, fmt=None):
+    """
+    Загружает записи (и их потери по экспериментам) из файла export_history порциями по
+    CHUNK_ROWS, каждая порция — одна транзакция db.import_records. Время прогонов сохраняется,
+    а очистка старых записей загруженные записи не удаляет. Возвращает {'imported', 'skipped', 'losses'}.
+    """
+    fmt = detect_format(path, fmt)
+    reader = _READERS[fmt](path)
+    db.wait()
+    conn = db.connect()
+    imported = {'imported': 0, 'skipped': 0, 'losses': 0}
+
+    def entries(parsed, existing):
+        for seed, timestamp, values, params, results, std_errors, old_id in parsed:
+            key = _run_key(seed, timestamp, values)
+            duplicate = key in existing
+            # Поток потерь идет вместе с записями и продвигается и для пропущенных записей
+            losses = reader.losses_for(old_id, load=not duplicate) if old_id is not None else None
+            if duplicate:
+                imported['skipped'] += 1
+                continue
+            existing.add(key)
+            imported['losses'] += sum(len(v) for v in losses.values()) if losses else 0
+            yield {'timestamp': timestamp, 'params': params, 'results': results, 'seed': seed,
+                   'std_errors': std_errors, 'losses': losses}
+
+    def load(rows):
+        parsed = []
+        for row in rows:
+            timestamp, params, results, seed, std_errors = unflatten(row)
+            values = tuple(row.get(key) for key in db.PARAM_COLUMNS) + (row.get('extra'),)
+            parsed.append((seed, timestamp, values, params, results, std_errors, row.get('id')))
+        existing = _existing_keys(conn, [(seed, timestamp, values) for seed, timestamp, values, *_ in parsed])
+        imported['imported'] += db.import_records(entries(parsed, existing))
+
+    try:
+        rows = []
+        for row in reader.records():
+            rows.append(row)
+            if len(rows) >= CHUNK_ROWS:
+                load(rows)
+                rows = []
+        if rows:
+            load(rows)
+    finally:
+        reader.close()
+    return imported
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Выгрузка и загрузка истории экспериментов (CSV, NPZ, Arrow IPC).")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_export = sub.add_parser('export', help="выгрузить историю в файл")
+    p_export.add_argument('file')
+    p_export.add_argument('--format', choices=FORMATS, help="по умолчанию — по расширению файла")
+    p_export.add_argument('--filter', default='', help="условия как в строке поиска истории: \"n=15|20 beta1>=0.8\"")
+    p_export.add_argument('--no-losses', action='store_true', help="без потерь по экспериментам")
+
+    p_import = sub.add_parser('import', help="загрузить историю из файла (дубликаты пропускаются)")
+    p_import.add_argument('file')
+    p_import.add_argument('--format', choices=FORMATS)
+
+    args = parser.parse_args(argv)
+    db.init_db()
+    if args.command == 'export':
+        result = export_history(args.file, args.format, include_losses=not args.no_losses,
+                                **db.parse_filters(args.filter))
+        print(f"Выгружено записей: {result['records']}, потерь по экспериментам: {result['losses']}")
+    else:
+        result = import_history(args.file, args.format)
+        print(f"Загружено записей: {result['imported']}, пропущено дубликатов: {result['skipped']}, "
+              f"потерь по экспериментам: {result['losses']}")
+    db.flush()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,66 @@
+"""
+Выбор вычислительного модуля.
+
+    native — C++ расширение sugar_core;
+    numpy  — запасной модуль engine.numpy_backend (NumPy + scipy.optimize.linear_sum_assignment).
+
+Оба модуля дают одинаковый API: MatrixGenerator, RunningStats, solve_exact, run_* и run_experiments.
+Без явного выбора (аргумент name или переменная окружения SUGAR_BACKEND) берется sugar_core,
+если он импортируется и проходит самопроверку, иначе — NumPy.
+"""
+import os
+import sys
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+BACKENDS = ('native', 'numpy')
+ENV_VAR = 'SUGAR_BACKEND'
+
+_loaded = {}
+
+
+def _load_native():
+    import sugar_core
+    # Расширение со сломанным ABI может импортироваться и упасть на первом же вызове
+    totals = sugar_core.run_all_heuristics(np.array([[2.0, 1.0], [1.0, 2.0]]), 1)
+    if list(totals) != [4.0, 2.0, 4.0, 4.0, 2.0]:
+        raise ImportError(f"sugar_core self-check failed: {list(totals)}")
+    return sugar_core
+
+
+def _load_numpy():
+    import scipy.optimize  # noqa: F401 — без SciPy нет точного решения
+    from engine import numpy_backend
+    return numpy_backend
+
+
+_LOADERS = {'native': _load_native, 'numpy': _load_numpy}
+
+
+def _load(name):
+    if name not in _loaded:
+        try:
+            _loaded[name] = (_LOADERS[name](), None)
+        except Exception as e:
+            _loaded[name] = (None, f"{type(e).__name__}: {e}")
+    return _loaded[name]
+
+
+def load_backend(name=None):
+    """Возвращает (имя, модуль). name: 'native', 'numpy' или None/'auto' — автоматический выбор.
+
+    ImportError, если выбранный (или ни один при автовыборе) модуль недоступен.
+    """
+    name = name or os.environ.get(ENV_VAR) or 'auto'
+    if name != 'auto' and name not in BACKENDS:
+        raise ValueError(f"unknown backend '{name}' (expected one of {BACKENDS} or 'auto')")
+
+    errors = []
+    for candidate in (BACKENDS if name == 'auto' else (name,)):
+        module, error = _load(candidate)
+        if module is not None:
+            return candidate, module
+        errors.append(f"{candidate}: {error}")
+    raise ImportError("; ".join(errors))
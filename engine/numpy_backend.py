@@ -0,0 +1,545 @@
+"""
+Запасной вычислительный модуль на NumPy/SciPy с тем же API, что и sugar_core.
+
+Используется, когда C++ расширение не собрано или не загружается. Генератор повторяет
+счетчиковую схему Philox4x32-10 и раскладку номеров случайных чисел из matrixGenerator.cpp,
+поэтому при том же seed выдает те же матрицы. Точное решение — scipy.optimize.linear_sum_assignment,
+эвристики векторизованы по пакету матриц: один шаг цикла обрабатывает столбец j сразу
+во всех матрицах пакета и для всех стратегий.
+"""
+import functools
+import math
+import secrets
+
+import numpy as np
+
+STRATEGY_NAMES = ('greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy')
+
+# Размер порции экспериментов в run_experiments и ограничение на объем одного пакета Philox
+BLOCK_SIZE = 256
+_MAX_BATCH_CELLS = 1 << 18
+
+_MASK32 = np.uint64(0xFFFFFFFF)
+_M0, _M1 = np.uint64(0xD2511F53), np.uint64(0xCD9E8D57)
+_W0, _W1 = 0x9E3779B9, 0xBB67AE85
+
+
+def philox_blocks(blocks, experiments, seed):
+    """Philox4x32-10 для счетчиков (block, experiment) и ключа seed; возвращает 4 слова uint64."""
+    blocks = np.asarray(blocks, dtype=np.uint64)
+    experiments = np.asarray(experiments, dtype=np.uint64)
+    c0 = blocks & _MASK32
+    c1 = blocks >> np.uint64(32)
+    c2 = experiments & _MASK32
+    c3 = experiments >> np.uint64(32)
+    c0, c1, c2, c3 = np.broadcast_arrays(c0, c1, c2, c3)
+    k0, k1 = seed & 0xFFFFFFFF, (seed >> 32) & 0xFFFFFFFF
+    for _ in range(10):
+        p0 = _M0 * c0
+        p1 = _M1 * c2
+        c0, c1, c2, c3 = ((p1 >> np.uint64(32)) ^ c1 ^ np.uint64(k0), p1 & _MASK32,
+                          (p0 >> np.uint64(32)) ^ c3 ^ np.uint64(k1), p0 & _MASK32)
+        k0 = (k0 + _W0) & 0xFFFFFFFF
+        k1 = (k1 + _W1) & 0xFFFFFFFF
+    return c0, c1, c2, c3
+
+
+def philox_uniforms(experiments, count, seed):
+    """Числа [0, count) потоков экспериментов experiments: массив (len(experiments), count) в [0, 1)."""
+    experiments = np.asarray(experiments, dtype=np.uint64)[:, None]
+    blocks = np.arange((count + 1) // 2, dtype=np.uint64)[None, :]
+    w0, w1, w2, w3 = philox_blocks(blocks, experiments, seed)
+    hi = np.stack([w0, w2], axis=-1).reshape(len(experiments), -1)[:, :count]
+    lo = np.stack([w1, w3], axis=-1).reshape(len(experiments), -1)[:, :count]
+    return ((hi >> np.uint64(5)).astype(np.float64) * 67108864.0
+            + (lo >> np.uint64(6)).astype(np.float64)) * (1.0 / 9007199254740992.0)
+
+
+def splitmix64(seed, stream):
+    """splitmix64, как в philox.h."""
+    mask = (1 << 64) - 1
+    z = (seed + 0x9E3779B97F4A7C15 * (stream + 1)) & mask
+    z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & mask
+    z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & mask
+    return z ^ (z >> 31)
+
+
+def derive_seed(seed, stream):
+    """seed дочернего потока, как derive_seed в philox.h: 63 бита."""
+    return splitmix64(seed, stream) & 0x7FFFFFFFFFFFFFFF
+
+
+# --- ПОСЛЕДОВАТЕЛЬНОСТЬ СОБОЛЯ (как sobol.cpp) ---
+
+SOBOL_MAX_DIMS = 4096
+_SOBOL_BITS = 32
+_SOBOL_INIT_KEY = 0x536F626F6C
+_SOBOL_SCRAMBLE_STREAM = 0x5CA
+
+
+def _mulmod(a, b, polys, degree):
+    """Произведение многочленов над GF(2) по модулю polys (вектор многочленов степени degree)."""
+    result = np.zeros_like(polys)
+    for bit in range(degree):
+        result ^= a * ((b >> np.uint64(bit)) & np.uint64(1))
+        a = a << np.uint64(1)
+        a ^= polys * ((a >> np.uint64(degree)) & np.uint64(1))
+    return result
+
+
+def _powmod_x(e, polys, degree):
+    result = np.ones_like(polys)
+    base = np.full_like(polys, 2) if degree > 1 else polys ^ np.uint64(2)
+    while e:
+        if e & 1:
+            result = _mulmod(result, base, polys, degree)
+        base = _mulmod(base, base, polys, degree)
+        e >>= 1
+    return result
+
+
+def _prime_factors(value):
+    factors, q = [], 2
+    while q * q <= value:
+        if value % q == 0:
+            factors.append(q)
+            while value % q == 0:
+                value //= q
+        q += 1
+    return factors + ([value] if value > 1 else [])
+
+
+@functools.lru_cache(maxsize=4)
+def sobol_directions(dims):
+    """Неперемешанные направляющие числа размерностей [0, dims): массив (dims, 32) uint64."""
+    v = np.zeros((dims, _SOBOL_BITS), dtype=np.uint64)
+    v[0] = [1 << (_SOBOL_BITS - 1 - k) for k in range(_SOBOL_BITS)]
+    dim, degree = 1, 1
+    while dim < dims:
+        polys = np.arange((1 << degree) | 1, 2 << degree, 2, dtype=np.uint64)
+        order = (1 << degree) - 1
+        ok = _powmod_x(order, polys, degree) == 1
+        for q in _prime_factors(order):
+            ok &= _powmod_x(order // q, polys, degree) != 1
+        polys = polys[ok][:dims - dim]
+        rows = np.arange(dim, dim + len(polys))
+
+        init = philox_uniforms(rows, degree, _SOBOL_INIT_KEY)
+        m = np.zeros((len(polys), _SOBOL_BITS), dtype=np.uint64)
+        for k in range(_SOBOL_BITS):
+            if k < degree:
+                m[:, k] = 2 * np.floor(init[:, k] * (1 << k)).astype(np.uint64) + 1
+            else:
+                nxt = m[:, k - degree] ^ (m[:, k - degree] << np.uint64(degree))
+                for a in range(1, degree):
+                    coef = (polys >> np.uint64(degree - a)) & np.uint64(1)
+                    nxt ^= (m[:, k - a] << np.uint64(a)) * coef
+                m[:, k] = nxt
+        shifts = np.array([_SOBOL_BITS - 1 - k for k in range(_SOBOL_BITS)], dtype=np.uint64)
+        v[rows] = (m << shifts) & _MASK32
+        dim += len(polys)
+        degree += 1
+    return v
+
+
+def _parity(x):
+    for shift in (32, 16, 8, 4, 2, 1):
+        x = x ^ (x >> np.uint64(shift))
+    return x & np.uint64(1)
+
+
+@functools.lru_cache(maxsize=8)
+def sobol_scramble(seed, dims):
+    """Направляющие числа после LMS и цифровой сдвиг для seed: ((dims, 32), (dims,)) uint64."""
+    base = sobol_directions(dims)
+    u = philox_uniforms(np.arange(dims), _SOBOL_BITS + 1, splitmix64(seed, _SOBOL_SCRAMBLE_STREAM))
+    words = np.floor(u * 4294967296.0).astype(np.uint64)
+    directions = np.zeros_like(base)
+    for j in range(_SOBOL_BITS):
+        pos = _SOBOL_BITS - 1 - j
+        above = np.uint64(~((2 << pos) - 1) & 0xFFFFFFFF)
+        row = (words[:, j] & above) | np.uint64(1 << pos)
+        directions |= _parity(row[:, None] & base) << np.uint64(pos)
+    return directions, words[:, _SOBOL_BITS]
+
+
+def sobol_points(directions, shifts, indices):
+    """Точки indices (по модулю 2^32) перемешанной последовательности: (len(indices), dims) в (0, 1)."""
+    indices = np.asarray(indices, dtype=np.uint64) & _MASK32
+    x = np.broadcast_to(shifts, (len(indices), len(shifts))).copy()
+    for bit in range(_SOBOL_BITS):
+        x ^= ((indices >> np.uint64(bit)) & np.uint64(1))[:, None] * directions[None, :, bit]
+    return x.astype(np.float64) * (1.0 / 4294967296.0) + (1.0 / 8589934592.0)
+
+
+def _uniform(u, low, high):
+    low, high = np.broadcast_arrays(np.asarray(low, dtype=np.float64), np.asarray(high, dtype=np.float64))
+    return np.where(low >= high, low, low + (high - low) * u)
+
+
+class MatrixGenerator:
+    """Генератор матриц сахаристости; поведение и параметры как у sugar_core.MatrixGenerator."""
+
+    def __init__(self, params):
+        self.n = int(params['n'])
+        self.alpha_min = float(params['alpha_min'])
+        self.alpha_max = float(params['alpha_max'])
+        self.beta1 = float(params['beta1'])
+        self.beta2 = float(params['beta2'])
+        self.dist_concentrated = params['dist_type'] == 'concentrated'
+        self.use_ripening = bool(params['use_ripening'])
+        self.v = int(params['v']) if self.use_ripening else 0
+        self.beta_max = float(params['beta_max']) if self.use_ripening else 1.0
+        self.use_inorganic = bool(params['use_inorganic'])
+
+        layout = params.get('layout', 'C')
+        if layout not in ('C', 'F'):
+            raise ValueError("layout must be 'C' or 'F'")
+        self.layout = layout
+        dtype = params.get('dtype', 'float64')
+        if dtype not in ('float64', 'float32'):
+            raise ValueError("dtype must be 'float64' or 'float32'")
+        self.dtype = dtype
+        sampler = params.get('sampler', 'mc')
+        if sampler not in ('mc', 'antithetic', 'sobol'):
+            raise ValueError("sampler must be 'mc', 'antithetic' or 'sobol'")
+        self.sampler = sampler
+
+        seed = params.get('seed')
+        # 63 бита: seed без потерь помещается в INTEGER SQLite
+        self.seed = secrets.randbits(63) if seed is None else int(seed) & ((1 << 64) - 1)
+        self.next_index = 0
+        self._init_sampler()
+
+    def _init_sampler(self):
+        self._sobol = None
+        if self.sampler == 'sobol':
+            dims = min(7 * self.n + self.n * (self.n - 1), SOBOL_MAX_DIMS)
+            self._sobol = sobol_scramble(self.seed, dims)
+
+    def _draws(self, first, count):
+        """Равномерные числа экспериментов [first, first + count) с учетом sampler."""
+        n = self.n
+        ks = np.arange(first, first + count, dtype=np.uint64)
+        if self.sampler == 'antithetic':
+            u = philox_uniforms(ks & ~np.uint64(1), 7 * n + n * (n - 1), self.seed)
+            odd = (ks & np.uint64(1)).astype(bool)
+            u[odd] = 1.0 - u[odd]
+            return u
+        u = philox_uniforms(ks, 7 * n + n * (n - 1), self.seed)
+        if self._sobol is not None:
+            directions, shifts = self._sobol
+            u[:, :len(shifts)] = sobol_points(directions, shifts, ks)
+        return u
+
+    def _fill(self, first, count):
+        """Матрицы экспериментов [first, first + count) массивом (count, n, n) в float64 или float32."""
+        n, dt = self.n, np.dtype(self.dtype)
+        u = self._draws(first, count)
+        mats = np.empty((count, n, n), dtype=dt)
+        mats[:, :, 0] = _uniform(u[:, :n], self.alpha_min, self.alpha_max)
+
+        if self.dist_concentrated:
+            delta = _uniform(u[:, n:3 * n:2], 0.0, (self.beta2 - self.beta1) / 4.0)
+            center = _uniform(u[:, n + 1:3 * n:2], self.beta1 + delta, self.beta2 - delta)
+            low, high = center - delta, center + delta
+
+        for j in range(1, n):
+            draws = u[:, 7 * n + (j - 1) * n:7 * n + j * n]
+            if self.use_ripening and j <= self.v - 1:
+                b = _uniform(draws, 1.000001, self.beta_max)
+            elif self.dist_concentrated:
+                b = _uniform(draws, low, high)
+            else:
+                b = _uniform(draws, self.beta1, self.beta2)
+            val = mats[:, :, j - 1].astype(np.float64) * b
+            mats[:, :, j] = np.where(val > 1.0, 1.0, val)
+
+        if self.use_inorganic:
+            chem = u[:, 3 * n:7 * n].reshape(count, n, 4)
+            K = _uniform(chem[:, :, 0], 4.8, 7.05)
+            Na = _uniform(chem[:, :, 1], 0.21, 0.82)
+            N = _uniform(chem[:, :, 2], 1.58, 2.8)
+            I0 = _uniform(chem[:, :, 3], 0.62, 0.64)
+            base_loss = 1.1 + 0.1541 * (K + Na) + 0.2159 * N
+            # math.pow — тот же libm pow, что и std::pow; векторный np.power расходится в последнем бите
+            growth = np.array([math.pow(1.029, 7 * j) for j in range(n)])
+            I_val = I0[:, :, None] * growth[None, None, :]
+            loss = (base_loss[:, :, None] + 0.9989 * I_val + 0.1967) / 100.0
+            mats[...] = np.maximum(0.0, mats.astype(np.float64) - loss)
+        return mats
+
+    def _batches(self, first, count):
+        step = max(1, _MAX_BATCH_CELLS // max(1, self.n * self.n))
+        for start in range(first, first + count, step):
+            yield self._fill(start, min(step, first + count - start))
+
+    def _arrange(self, mats):
+        if self.layout == 'F':
+            return np.ascontiguousarray(mats.transpose(0, 2, 1)).transpose(0, 2, 1) if mats.ndim == 3 \
+                else np.asfortranarray(mats)
+        return mats
+
+    def generate(self):
+        k = self.next_index
+        self.next_index += 1
+        return self.generate_at(k)
+
+    def generate_at(self, k):
+        if k < 0:
+            raise IndexError("experiment index must be non-negative")
+        return self._arrange(self._fill(k, 1)[0])
+
+    def generate_batch(self, k):
+        if k < 0:
+            raise ValueError("batch size must be non-negative")
+        first = self.next_index
+        mats = np.concatenate(list(self._batches(first, k))) if k else \
+            np.empty((0, self.n, self.n), dtype=self.dtype)
+        self.next_index += k
+        return self._arrange(mats)
+
+    def generate_into(self, out):
+        if out.ndim != 2 or out.shape != (self.n, self.n):
+            raise ValueError("out must have shape (n, n)")
+        if not out.flags.writeable:
+            raise ValueError("out must be writeable")
+        if out.dtype != np.dtype(self.dtype):
+            raise TypeError(f"out must have dtype {self.dtype} in native byte order")
+        out[...] = self._fill(self.next_index, 1)[0]
+        self.next_index += 1
+
+    def jump(self, k):
+        self.next_index = max(0, self.next_index + k)
+
+    def spawn(self, stream):
+        child = MatrixGenerator.__new__(MatrixGenerator)
+        child.__dict__.update(self.__dict__)
+        child.seed = derive_seed(self.seed, stream)
+        child.next_index = 0
+        child._init_sampler()
+        return child
+
+
+# --- ЯДРА ---
+
+def _as_batch(matrix):
+    """Матрица (n, n) или пакет (k, n, n) -> (пакет float64/float32, был ли вход одной матрицей)."""
+    arr = np.asarray(matrix)
+    if arr.dtype != np.float32:
+        arr = arr.astype(np.float64, copy=False)
+    if arr.ndim == 2 and arr.shape[0] == arr.shape[1]:
+        return arr[None], True
+    if arr.ndim == 3 and arr.shape[1] == arr.shape[2]:
+        return arr, False
+    raise ValueError("matrix must be a square 2-D array or a (k, n, n) batch")
+
+
+def heuristic_totals(batch, v, names=STRATEGY_NAMES):
+    """Итоги стратегий names для пакета (k, n, n): массив (k, len(names)).
+
+    Выбор и разрешение равенств как в C++: максимум берется строго больше -1, минимум —
+    строго меньше наибольшего конечного числа типа, при равенстве побеждает меньшая строка;
+    медиана — элемент len // 2 среди пар (значение, строка) свободных строк.
+    """
+    k, n = batch.shape[0], batch.shape[1]
+    big = np.finfo(batch.dtype).max
+    rows = np.arange(n)
+    totals = np.zeros((k, len(names)))
+    available = np.ones((len(names), k, n), dtype=bool)
+    for j in range(n):
+        col = batch[:, :, j]
+        for s, name in enumerate(names):
+            free = available[s]
+            if name == 'median':
+                keys = np.where(free, col, np.inf)
+                order = np.argsort(keys, axis=1, kind='stable')
+                count = free.sum(axis=1)
+                has = count > 0
+                best = order[np.arange(k), count // 2]
+            else:
+                if name == 'greedy_thrifty':
+                    take_max = j < v
+                elif name == 'thrifty_greedy':
+                    take_max = j >= v
+                else:
+                    take_max = name == 'greedy'
+                if take_max:
+                    best = np.argmax(np.where(free, col, -np.inf), axis=1)
+                    has = free[np.arange(k), best] & (col[np.arange(k), best] > -1.0)
+                else:
+                    best = np.argmin(np.where(free, col, np.inf), axis=1)
+                    has = free[np.arange(k), best] & (col[np.arange(k), best] < big)
+            picked = np.where(has, col[np.arange(k), best], 0.0)
+            totals[:, s] += picked
+            available[s, np.arange(k)[has], best[has]] = False
+    return totals
+
+
+def _map_totals(matrix, v, name):
+    batch, single = _as_batch(matrix)
+    res = heuristic_totals(batch, v, (name,))[:, 0]
+    return float(res[0]) if single else res
+
+
+def run_greedy(matrix):
+    return _map_totals(matrix, 0, 'greedy')
+
+
+def run_thrifty(matrix):
+    return _map_totals(matrix, 0, 'thrifty')
+
+
+def run_median(matrix):
+    return _map_totals(matrix, 0, 'median')
+
+
+def run_greedy_thrifty(matrix, v):
+    return _map_totals(matrix, v, 'greedy_thrifty')
+
+
+def run_thrifty_greedy(matrix, v):
+    return _map_totals(matrix, v, 'thrifty_greedy')
+
+
+def run_all_heuristics(matrix, v):
+    batch, single = _as_batch(matrix)
+    res = heuristic_totals(batch, v)
+    return res[0] if single else res
+
+
+def _exact_one(mat):
+    from scipy.optimize import linear_sum_assignment
+    rows, cols = linear_sum_assignment(mat, maximize=True)
+    return float(mat[rows, cols].astype(np.float64).sum())
+
+
+def solve_exact(matrix, engine='hungarian'):
+    """Точный оптимум через linear_sum_assignment; engine проверяется, но решатель один."""
+    if engine not in ('hungarian', 'lapjv'):
+        raise ValueError(f"unknown exact engine '{engine}' (expected 'hungarian' or 'lapjv')")
+    batch, single = _as_batch(matrix)
+    res = np.array([_exact_one(mat) for mat in batch])
+    return float(res[0]) if single else res
+
+
+class RunningStats:
+    """
+    Потоковая статистика выборки за O(1) памяти, как sugar_core.RunningStats.
+
+    add_array считает среднее и сумму квадратов отклонений порции средствами NumPy
+    и вливает ее формулой Чана, поэтому значения совпадают с C++ до округления.
+    """
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = math.inf, -math.inf
+
+    def add(self, x):
+        x = float(x)
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min, self.max = min(self.min, x), max(self.max, x)
+
+    def add_array(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        if values.size:
+            mean = float(values.mean())
+            self._merge_state(values.size, mean, float(np.square(values - mean).sum()),
+                              float(values.min()), float(values.max()))
+
+    def merge(self, other):
+        self._merge_state(*other.state)
+
+    def _merge_state(self, count, mean, m2, lo, hi):
+        if count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = count, mean, m2, lo, hi
+            return
+        total = self.count + count
+        delta = mean - self.mean
+        weight = count / total
+        self.mean += delta * weight
+        self.m2 += m2 + delta * delta * self.count * weight
+        self.count = total
+        self.min, self.max = min(self.min, lo), max(self.max, hi)
+
+    def copy(self):
+        return RunningStats.from_state(self.state)
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def std(self):
+        return math.sqrt(self.variance)
+
+    @property
+    def sem(self):
+        return self.std / math.sqrt(self.count) if self.count else 0.0
+
+    @property
+    def state(self):
+        return (self.count, self.mean, self.m2, self.min, self.max)
+
+    @staticmethod
+    def from_state(state):
+        count, mean, m2, lo, hi = state
+        if count < 0 or m2 < 0:
+            raise ValueError("invalid RunningStats state: negative count or m2")
+        stats = RunningStats()
+        stats.count, stats.mean, stats.m2, stats.min, stats.max = int(count), float(mean), float(m2), float(lo), float(hi)
+        return stats
+
+    def __getstate__(self):
+        return self.state
+
+    def __setstate__(self, state):
+        self.__dict__.update(RunningStats.from_state(state).__dict__)
+
+    def __repr__(self):
+        return f"RunningStats(count={self.count}, mean={self.mean!r}, sem={self.sem!r})"
+
+
+def run_experiments(params, T, threads=1, start=0, keep_losses=True):
+    """Тот же контракт, что у sugar_core.run_experiments; threads не используется."""
+    generator = MatrixGenerator(params)
+    v = int(params.get('v', 0))
+    solve_exact(np.zeros((1, 1)), params.get('exact_engine', 'hungarian'))
+    T = max(0, int(T))
+
+    losses = {name: [] for name in STRATEGY_NAMES}
+    stats = {name: RunningStats() for name in STRATEGY_NAMES}
+    pairs = [(a, b) for i, a in enumerate(STRATEGY_NAMES) for b in STRATEGY_NAMES[i + 1:]]
+    pair_stats = {pair: RunningStats() for pair in pairs}
+    skipped = 0
+    for first in range(start, start + T, BLOCK_SIZE):
+        for mats in generator._batches(first, min(BLOCK_SIZE, start + T - first)):
+            S_opt = np.array([_exact_one(mat) for mat in mats])
+            keep = S_opt > 1e-9
+            skipped += int((~keep).sum())
+            if not keep.any():
+                continue
+            totals = heuristic_totals(mats[keep], v)
+            block = {}
+            for s, name in enumerate(STRATEGY_NAMES):
+                block[name] = (S_opt[keep] - totals[:, s]) / S_opt[keep] * 100.0
+                stats[name].add_array(block[name])
+                if keep_losses:
+                    losses[name].append(block[name])
+            for a, b in pairs:
+                pair_stats[a, b].add_array(block[a] - block[b])
+
+    return {
+        'losses': {name: np.concatenate(vals) if vals else np.empty(0) for name, vals in losses.items()},
+        'stats': stats,
+        'pair_stats': pair_stats,
+        'skipped': skipped,
+        'count': T,
+        'seed': generator.seed,
+        'dtype': generator.dtype,
+    }
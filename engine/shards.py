@@ -0,0 +1,266 @@
+"""
+Распределенный прогон экспериментов через общую файловую систему.
+
+Очередь — это каталог:
+    manifest.json          параметры, seed, размер шарда
+    pending/shard_*.json   шарды, ожидающие обработки
+    claimed/shard_*.json   шарды, взятые в работу (захват через атомарный os.rename)
+    done/shard_*.npz       частичные результаты (состояния RunningStats), готовые к слиянию
+
+Шард k покрывает эксперименты [k * shard_size, ...) одного seed, поэтому итог
+не зависит от того, какой процесс или машина его посчитали.
+
+Использование:
+    python -m engine.shards plan QUEUE_DIR --T 1000000 --shard-size 10000 [--params params.json]
+    python -m engine.shards work QUEUE_DIR [--threads 0]
+    python -m engine.shards merge QUEUE_DIR [--no-record]
+    python -m engine.shards status QUEUE_DIR
+"""
+import argparse
+import json
+import os
+import random
+import socket
+import sys
+import time
+
+import numpy as np
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STRATEGIES = ['greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy']
+
+DEFAULT_PARAMS = {
+    'T': 50, 'n': 15, 'alpha_min': 0.12, 'alpha_max': 0.22,
+    'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+    'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+    'use_inorganic': False
+}
+
+
+def _dirs(queue_dir):
+    return (os.path.join(queue_dir, 'pending'),
+            os.path.join(queue_dir, 'claimed'),
+            os.path.join(queue_dir, 'done'))
+
+
+def _write_atomic(path, write):
+    """Пишет файл через временное имя и os.replace, чтобы читатели не увидели его частично."""
+    tmp = f"{path}.{socket.gethostname()}-{os.getpid()}.tmp"
+    write(tmp)
+    os.replace(tmp, path)
+
+
+def _write_json(path, data):
+    def write(tmp):
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+    _write_atomic(path, write)
+
+
+def load_manifest(queue_dir):
+    with open(os.path.join(queue_dir, 'manifest.json'), encoding='utf-8') as f:
+        return json.load(f)
+
+
+def plan(queue_dir, params, shard_size=10000, seed=None):
+    """Делит params['T'] экспериментов на шарды с общим seed и кладет их в очередь."""
+    if shard_size < 1:
+        raise ValueError("Размер шарда должен быть положительным.")
+    if os.path.exists(os.path.join(queue_dir, 'manifest.json')):
+        raise FileExistsError(f"Очередь уже создана: {queue_dir}")
+
+    if seed is None:
+        seed = params.get('seed')
+    if seed is None:
+        seed = random.SystemRandom().getrandbits(63)
+
+    for d in _dirs(queue_dir):
+        os.makedirs(d, exist_ok=True)
+
+    T = params['T']
+    shards = []
+    for idx, start in enumerate(range(0, T, shard_size)):
+        shard = {'id': idx, 'start': start, 'count': min(shard_size, T - start)}
+        _write_json(os.path.join(queue_dir, 'pending', f'shard_{idx:06d}.json'), shard)
+        shards.append(shard)
+
+    manifest = {'params': params, 'seed': seed, 'shard_size': shard_size, 'shards': len(shards)}
+    _write_json(os.path.join(queue_dir, 'manifest.json'), manifest)
+    return manifest
+
+
+def claim(queue_dir):
+    """Забирает один шард из pending. Возвращает путь в claimed или None, если очередь пуста."""
+    pending, claimed, _ = _dirs(queue_dir)
+    for name in sorted(os.listdir(pending)):
+        if not name.endswith('.json'):
+            continue
+        target = os.path.join(claimed, name)
+        try:
+            os.rename(os.path.join(pending, name), target)
+        except (FileNotFoundError, PermissionError):
+            continue  # шард уже забрал другой процесс
+        os.utime(target)
+        return target
+    return None
+
+
+def requeue_stale(queue_dir, max_age):
+    """Возвращает в pending шарды, которые захвачены дольше max_age секунд (упавшие процессы)."""
+    pending, claimed, done = _dirs(queue_dir)
+    now = time.time()
+    returned = 0
+    for name in os.listdir(claimed):
+        path = os.path.join(claimed, name)
+        try:
+            stale = now - os.path.getmtime(path) > max_age
+        except FileNotFoundError:
+            continue
+        finished = os.path.exists(os.path.join(done, name.replace('.json', '.npz')))
+        if stale or finished:
+            try:
+                if finished:
+                    os.remove(path)
+                else:
+                    os.rename(path, os.path.join(pending, name))
+                    returned += 1
+            except FileNotFoundError:
+                pass
+    return returned
+
+
+def run_shard(queue_dir, claimed_path, manifest, threads=1):
+    """Считает захваченный шард и сохраняет частичный результат в done/."""
+    from engine.backend import load_backend
+    _, core = load_backend()
+
+    with open(claimed_path, encoding='utf-8') as f:
+        shard = json.load(f)
+
+    run_params = dict(manifest['params'], seed=manifest['seed'])
+    res = core.run_experiments(run_params, shard['count'], threads=threads, start=shard['start'],
+                               keep_losses=False)
+
+    done_path = os.path.join(queue_dir, 'done', os.path.basename(claimed_path).replace('.json', '.npz'))
+
+    def write(tmp):
+        with open(tmp, 'wb') as f:
+            np.savez(f, start=shard['start'], count=shard['count'], skipped=res['skipped'],
+                     **{f'{name}_stats': np.array(res['stats'][name].state, dtype=np.float64)
+                        for name in STRATEGIES})
+    _write_atomic(done_path, write)
+    os.remove(claimed_path)
+    return done_path
+
+
+def work(queue_dir, threads=1, max_shards=None):
+    """Цикл рабочего процесса: забирает шарды, пока очередь не опустеет. Возвращает число шардов."""
+    manifest = load_manifest(queue_dir)
+    processed = 0
+    while max_shards is None or processed < max_shards:
+        claimed_path = claim(queue_dir)
+        if claimed_path is None:
+            break
+        run_shard(queue_dir, claimed_path, manifest, threads=threads)
+        processed += 1
+    return processed
+
+
+def status(queue_dir):
+    pending, claimed, done = _dirs(queue_dir)
+    count = lambda d, ext: sum(1 for name in os.listdir(d) if name.endswith(ext))
+    return {'total': load_manifest(queue_dir)['shards'], 'pending': count(pending, '.json'),
+            'claimed': count(claimed, '.json'), 'done': count(done, '.npz')}
+
+
+def _shard_stats(core, part, name):
+    count, mean, m2, lo, hi = part[f'{name}_stats'].tolist()
+    return core.RunningStats.from_state((int(count), mean, m2, lo, hi))
+
+
+def merge(queue_dir, record=True):
+    """
+    Сливает статистики шардов в порядке шардов (итог не зависит от того, кто их считал)
+    и дает средние потери со стандартными ошибками, как WorkerThread.
+    При record=True результат сохраняется в историю.
+    """
+    from engine.backend import load_backend
+    _, core = load_backend()
+
+    manifest = load_manifest(queue_dir)
+    _, _, done = _dirs(queue_dir)
+    stats = {name: core.RunningStats() for name in STRATEGIES}
+    skipped = 0
+    for idx in range(manifest['shards']):
+        path = os.path.join(done, f'shard_{idx:06d}.npz')
+        if not os.path.exists(path):
+            raise RuntimeError(f"Шард {idx} еще не посчитан, слияние невозможно.")
+        with np.load(path) as part:
+            for name in STRATEGIES:
+                stats[name].merge(_shard_stats(core, part, name))
+            skipped += int(part['skipped'])
+
+    if stats['greedy'].count == 0:
+        raise RuntimeError("Все эксперименты выдали 0 сахара или были пропущены.")
+    avg_losses = {name: s.mean for name, s in stats.items()}
+    std_errors = {name: s.sem for name, s in stats.items()}
+
+    if record:
+        import data.database as db
+        db.init_db()
+        db.add_record(manifest['params'], avg_losses, seed=manifest['seed'], std_errors=std_errors)
+    return {'avg_losses': avg_losses, 'std_errors': std_errors, 'stats': stats,
+            'skipped': skipped, 'seed': manifest['seed']}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Шардированный прогон экспериментов через каталог-очередь.")
+    sub = parser.add_subparsers(dest='command', required=True)
+
+    p_plan = sub.add_parser('plan', help="создать очередь шардов")
+    p_plan.add_argument('queue_dir')
+    p_plan.add_argument('--params', help="JSON-файл с параметрами (как в истории)")
+    p_plan.add_argument('--T', type=int)
+    p_plan.add_argument('--shard-size', type=int, default=10000)
+    p_plan.add_argument('--seed', type=int)
+
+    p_work = sub.add_parser('work', help="обрабатывать шарды, пока очередь не опустеет")
+    p_work.add_argument('queue_dir')
+    p_work.add_argument('--threads', type=int, default=0, help="потоков на процесс (0 - все ядра)")
+    p_work.add_argument('--max-shards', type=int)
+    p_work.add_argument('--requeue-after', type=float, help="вернуть в очередь шарды, захваченные дольше N секунд")
+
+    p_merge = sub.add_parser('merge', help="слить результаты и записать в историю")
+    p_merge.add_argument('queue_dir')
+    p_merge.add_argument('--no-record', action='store_true')
+
+    p_status = sub.add_parser('status', help="состояние очереди")
+    p_status.add_argument('queue_dir')
+
+    args = parser.parse_args(argv)
+    if args.command == 'plan':
+        params = dict(DEFAULT_PARAMS)
+        if args.params:
+            with open(args.params, encoding='utf-8') as f:
+                params.update(json.load(f))
+        if args.T is not None:
+            params['T'] = args.T
+        manifest = plan(args.queue_dir, params, args.shard_size, args.seed)
+        print(f"Создано шардов: {manifest['shards']}, seed={manifest['seed']}")
+    elif args.command == 'work':
+        if args.requeue_after is not None:
+            requeue_stale(args.queue_dir, args.requeue_after)
+        processed = work(args.queue_dir, threads=args.threads, max_shards=args.max_shards)
+        print(f"Обработано шардов: {processed}")
+    elif args.command == 'merge':
+        result = merge(args.queue_dir, record=not args.no_record)
+        for name, val in sorted(result['avg_losses'].items(), key=lambda item: item[1]):
+            print(f"{name:<16} : {val:.4f} ± {result['std_errors'][name]:.4f}% потерь")
+        print(f"Пропущено экспериментов: {result['skipped']}")
+    else:
+        print(json.dumps(status(args.queue_dir), ensure_ascii=False))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+"""
+Правила досрочной остановки серии экспериментов.
+
+В адаптивных режимах T — верхняя граница: расчет прекращается, как только результат
+статистически устоялся.
+
+    fixed      ровно T экспериментов (прежнее поведение)
+    precision  доверительный интервал среднего каждой стратегии уже не шире ±half_width п.п.
+    ranking    лучшая стратегия значимо лучше каждой из остальных по парному критерию:
+               потери сравниваются на одних и тех же матрицах (pair_stats из run_experiments),
+               поэтому общий для стратегий разброс сырья из сравнения исключается
+
+Проверка повторяется после каждой порции (не реже чем через CHECK_INTERVAL экспериментов),
+поэтому фактическая ошибка немного выше номинальной; уровень доверия по умолчанию — 0.99,
+а до MIN_EXPERIMENTS проверок нет.
+"""
+from statistics import NormalDist
+
+STOP_RULES = ('fixed', 'precision', 'ranking')
+DEFAULT_HALF_WIDTH = 0.05
+DEFAULT_CONFIDENCE = 0.99
+MIN_EXPERIMENTS = 200
+# Наибольшая порция между проверками: при T с большим запасом порция T // 100 была бы слишком крупной
+CHECK_INTERVAL = 200
+
+REASONS = {
+    'precision': "средние потери всех стратегий известны с точностью ±{half_width:g} п.п.",
+    'ranking': "лучшая стратегия значимо лучше остальных (парный критерий)",
+}
+
+
+def stop_rule(params):
+    """Правило из params['stop_rule'] (по умолчанию 'fixed'); неизвестное имя — ValueError."""
+    rule = params.get('stop_rule', 'fixed')
+    if rule not in STOP_RULES:
+        raise ValueError(f"unknown stop_rule '{rule}' (expected one of {STOP_RULES})")
+    return rule
+
+
+def z_value(confidence, comparisons=1):
+    """Двусторонний квантиль нормального распределения с поправкой Бонферрони."""
+    if not 0 < confidence < 1:
+        raise ValueError("confidence must be in (0, 1)")
+    alpha = (1 - confidence) / comparisons
+    return NormalDist().inv_cdf(1 - alpha / 2)
+
+
+def half_widths(stats, confidence=DEFAULT_CONFIDENCE):
+    """Полуширины доверительных интервалов средних {стратегия: п.п.}."""
+    z = z_value(confidence)
+    return {name: z * s.sem for name, s in stats.items()}
+
+
+def paired_difference(pair_stats, a, b):
+    """(среднее loss_a - loss_b, RunningStats разности); хранится одна из двух перестановок."""
+    if (a, b) in pair_stats:
+        return pair_stats[a, b].mean, pair_stats[a, b]
+    diff = pair_stats[b, a]
+    return -diff.mean, diff
+
+
+def ranking_settled(stats, pair_stats, confidence=DEFAULT_CONFIDENCE):
+    """
+    True, если стратегия с наименьшими потерями значимо лучше каждой из остальных.
+    Стратегии, совпавшие с лучшей во всех экспериментах (разность тождественно 0),
+    считаются ее копиями и в сравнении не участвуют.
+    """
+    best = min(stats, key=lambda name: stats[name].mean)
+    rivals = []
+    for name in stats:
+        if name == best:
+            continue
+        mean, diff = paired_difference(pair_stats, name, best)
+        if diff.count < 2:
+            return False
+        if diff.variance == 0 and mean == 0:
+            continue
+        rivals.append((mean, diff.sem))
+    if not rivals:
+        return False
+    z = z_value(confidence, comparisons=len(rivals))
+    return all(mean > z * sem for mean, sem in rivals)
+
+
+def runner_up(stats, pair_stats):
+    """
+    (лучшая стратегия, ближайшая отличная от нее, RunningStats их разности потерь).
+    Копии лучшей (разность тождественно 0) пропускаются; если других нет — (best, None, None).
+    """
+    best = min(stats, key=lambda name: stats[name].mean)
+    rivals = []
+    for name in stats:
+        if name == best:
+            continue
+        mean, diff = paired_difference(pair_stats, name, best)
+        if not (diff.variance == 0 and mean == 0):
+            rivals.append(name)
+    if not rivals:
+        return best, None, None
+    second = min(rivals, key=lambda name: stats[name].mean)
+    return best, second, paired_difference(pair_stats, second, best)[1]
+
+
+def stop_reason(params, stats, pair_stats=None):
+    """
+    Имя сработавшего правила ('precision' или 'ranking') или None, если считать дальше.
+    stats/pair_stats — накопители RunningStats, как в результате run_experiments.
+    """
+    rule = stop_rule(params)
+    if rule == 'fixed' or stats['greedy'].count < MIN_EXPERIMENTS:
+        return None
+    confidence = params.get('confidence', DEFAULT_CONFIDENCE)
+    if rule == 'precision':
+        target = params.get('half_width', DEFAULT_HALF_WIDTH)
+        if all(h <= target for h in half_widths(stats, confidence).values()):
+            return rule
+    elif ranking_settled(stats, pair_stats, confidence):
+        return rule
+    return None
+
+
+def describe(reason, params, done, T):
+    """Текст для отчета: почему расчет остановлен и сколько экспериментов сэкономлено."""
+    text = REASONS[reason].format(half_width=params.get('half_width', DEFAULT_HALF_WIDTH))
+    return f"Остановлено после {done} из {T} экспериментов: {text}; сэкономлено {T - done}."
@@ -0,0 +1,313 @@
+"""
+Серии экспериментов по сетке параметров (анализ чувствительности).
+
+Оси задаются списками или диапазонами значений для любого ключа params:
+    n=10,20,40              список
+    n=10:50:10              диапазон start:stop:step, stop включается
+    beta_range=0.80-0.90,0.86-0.99   пары (beta1, beta2); аналогично alpha_range
+    dist_type=uniform,concentrated
+Точки сетки — декартово произведение осей. Все точки считаются с одним seed (общие
+случайные числа), поэтому соседние клетки различаются только параметрами, а не шумом.
+
+Точки выполняются в пуле потоков через выбранный вычислительный модуль (engine/backend.py),
+самые дорогие — первыми. Большие точки считаются порциями, и каждой порции достается доля
+свободных ядер: когда точек в работе меньше, чем потоков (конец серии или серия из пары точек),
+оставшиеся точки досчитываются на всех ядрах, а не на одном.
+Результаты записываются в историю пачками, одной транзакцией на пачку.
+
+Использование:
+    python -m engine.sweep --axis n=10,20,40 --axis dist_type=uniform,concentrated --T 500
+        [--params base.json] [--workers 0] [--seed S] [--no-record]
+"""
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import re
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from engine import stopping
+
+DEFAULT_PARAMS = {
+    'T': 200, 'n': 15, 'alpha_min': 0.12, 'alpha_max': 0.22,
+    'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+    'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+    'use_inorganic': False
+}
+
+STRATEGIES = ('greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy')
+COMPOSITE_KEYS = {'beta_range': ('beta1', 'beta2'), 'alpha_range': ('alpha_min', 'alpha_max')}
+INT_KEYS = ('T', 'n', 'v', 'seed')
+BOOL_KEYS = ('use_ripening', 'use_inorganic')
+STR_KEYS = ('dist_type', 'exact_engine', 'dtype', 'sampler', 'layout', 'stop_rule')
+
+# Сколько готовых точек копится перед записью в историю
+RECORD_BATCH = 16
+# Точка с фиксированным T делится примерно на столько порций (но не мельче MIN_POINT_CHUNK
+# экспериментов), чтобы число потоков пересматривалось по ходу серии
+POINT_CHUNKS = 16
+MIN_POINT_CHUNK = 1024
+
+
+def _parse_scalar(key, text):
+    text = text.strip()
+    if key in STR_KEYS:
+        return text
+    if key in BOOL_KEYS:
+        if text.lower() in ('1', 'true', 'да', 'yes'):
+            return True
+        if text.lower() in ('0', 'false', 'нет', 'no'):
+            return False
+        raise ValueError(f"'{text}' is not a boolean value for '{key}'")
+    value = float(text.replace(',', '.'))
+    if key in INT_KEYS:
+        if value != int(value):
+            raise ValueError(f"'{key}' must be an integer, got {text}")
+        return int(value)
+    return value
+
+
+def parse_values(key, text):
+    """Значения оси из строки: 'a,b,c', 'start:stop:step' (stop включается) или пары 'lo-hi' для *_range."""
+    text = text.strip()
+    if key in COMPOSITE_KEYS:
+        values = []
+        for item in text.split(','):
+            match = re.fullmatch(r'\s*([\d.]+)\s*-\s*([\d.]+)\s*', item)
+            if not match:
+                raise ValueError(f"'{item.strip()}' is not a 'low-high' pair for '{key}'")
+            values.append((float(match.group(1)), float(match.group(2))))
+        return values
+    if ':' in text:
+        parts = [_parse_scalar(key, part) for part in text.split(':')]
+        if len(parts) != 3 or parts[2] <= 0 or parts[1] < parts[0]:
+            raise ValueError(f"range for '{key}' must be start:stop:step with step > 0 and stop >= start")
+        start, stop, step = parts
+        count = int(math.floor((stop - start) / step + 1e-9)) + 1
+        values = [start + i * step for i in range(count)]
+        return [int(x) for x in values] if key in INT_KEYS else [round(x, 10) for x in values]
+    return [_parse_scalar(key, item) for item in text.split(',') if item.strip()]
+
+
+def expand_grid(base, axes):
+    """Точки сетки: список params. axes — список пар (ключ, значения) в порядке осей."""
+    keys = [key for key, _ in axes]
+    if len(set(keys)) != len(keys):
+        raise ValueError("each axis key may appear only once")
+    points = []
+    for combo in itertools.product(*(values for _, values in axes)):
+        params = dict(base)
+        for key, value in zip(keys, combo):
+            if key in COMPOSITE_KEYS:
+                params.update(zip(COMPOSITE_KEYS[key], value))
+            else:
+                params[key] = value
+        points.append(params)
+    return points
+
+
+def point_cost(params):
+    """Оценка трудоемкости точки: T экспериментов с точным решением O(n^3)."""
+    return params['T'] * params['n'] ** 3
+
+
+def check_point(params):
+    """Текст ошибки для несовместимых значений (как в проверке ввода GUI) или None."""
+    if params['n'] < 1 or params['T'] < 1:
+        return "n и T должны быть положительными"
+    if params['alpha_min'] > params['alpha_max']:
+        return "alpha_min > alpha_max"
+    if params['beta1'] > params['beta2']:
+        return "beta1 > beta2"
+    if params.get('use_ripening') and not 1 <= params['v'] <= params['n']:
+        return "v вне диапазона [1, n]"
+    return None
+
+
+def run_point(core, params, use_cache=False, threads=None):
+    """
+    Считает одну точку (params['seed'] обязателен) и возвращает средние, SE, лучшую стратегию
+    и ее отрыв от ближайшей другой. Адаптивные правила остановки (engine/stopping.py) соблюдаются.
+    use_cache — брать готовый префикс из data/cache.py и сохранять туда результат.
+    threads() — сколько потоков дать очередной порции (по умолчанию 1); результат от числа
+    потоков не зависит.
+    """
+    T = params['T']
+    if stopping.stop_rule(params) == 'fixed':
+        chunk = max(MIN_POINT_CHUNK, -(-T // POINT_CHUNKS))
+    else:
+        chunk = stopping.CHECK_INTERVAL
+    cached = None
+    if use_cache:
+        from data import cache
+        cached = cache.lookup(params, params['seed'], T, core)
+    if cached:
+        stats, pair_stats, done = cached['stats'], cached['pair_stats'], cached['count']
+        reason = stopping.stop_reason(params, stats, pair_stats)
+    else:
+        stats = {name: core.RunningStats() for name in STRATEGIES}
+        pair_stats = {(a, b): core.RunningStats() for i, a in enumerate(STRATEGIES) for b in STRATEGIES[i + 1:]}
+        done, reason = 0, None
+    initial = done
+    while done < T and not reason:
+        count = min(chunk, T - done)
+        res = core.run_experiments(params, count, threads() if threads else 1, done, False)
+        for name, s in res['stats'].items():
+            stats[name].merge(s)
+        for pair, s in res['pair_stats'].items():
+            pair_stats[pair].merge(s)
+        done += count
+        reason = stopping.stop_reason(params, stats, pair_stats)
+    if use_cache and done > initial:
+        cache.store(params, params['seed'], done, stats, pair_stats)
+
+    # Пропущенные эксперименты (нулевой оптимум) в статистики не попадают
+    result = {'params': params, 'seed': params['seed'], 'count': done, 'skipped': done - stats['greedy'].count,
+              'stop_reason': reason if done < T else None}
+    if stats['greedy'].count == 0:
+        result['error'] = "все эксперименты пропущены"
+        return result
+    # Отрыв — средняя парная разность потерь ближайшей стратегии и лучшей (п.п., >= 0 в среднем)
+    best, second, _ = stopping.runner_up(stats, pair_stats)
+    margin, diff = stopping.paired_difference(pair_stats, second, best) if second else (0.0, None)
+    result.update({
+        'avg_losses': {name: s.mean for name, s in stats.items()},
+        'std_errors': {name: s.sem for name, s in stats.items()},
+        'best': best, 'runner_up': second,
+        'margin': margin,
+        'margin_sem': diff.sem if diff is not None else 0.0,
+    })
+    return result
+
+
+def run_sweep(base, axes, workers=None, record=True, backend=None, progress=None, cancelled=None):
+    """
+    Выполняет серию и возвращает результаты точек в порядке сетки (None — точка не посчитана
+    из-за отмены). progress(готово, всего, результат) вызывается по мере готовности точек,
+    cancelled() — проверка отмены перед запуском очередной точки. record — запись в историю
+    и использование кэша результатов (data/cache.py).
+    """
+    from engine.backend import load_backend
+    _, core = load_backend(backend)
+
+    stopping.stop_rule(base)
+    points = expand_grid(base, axes)
+    seed = base.get('seed')
+    if seed is None:
+        seed = core.MatrixGenerator(dict(base, seed=None)).seed
+    points = [dict(p, seed=seed) for p in points]
+
+    results = [None] * len(points)
+    pending_records = []
+
+    def flush():
+        if record and pending_records:
+            import data.database as db
+            db.add_records(pending_records)
+        pending_records.clear()
+
+    order = sorted(range(len(points)), key=lambda i: point_cost(points[i]), reverse=True)
+    workers = workers or os.cpu_count() or 1
+    done = 0
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        futures = {}
+        queue = iter(order)
+
+        def threads():
+            # Потоки делятся поровну между точками в работе
+            return max(1, workers // max(1, len(futures)))
+
+        def submit_next():
+            if cancelled and cancelled():
+                return
+            idx = next(queue, None)
+            if idx is None:
+                return
+            error = check_point(points[idx])
+            if error:
+                results[idx] = {'params': points[idx], 'seed': seed, 'error': error}
+                report(idx)
+                submit_next()
+                return
+            futures[pool.submit(run_point, core, points[idx], record, threads)] = idx
+
+        def report(idx):
+            nonlocal done
+            done += 1
+            if progress:
+                progress(done, len(points), results[idx])
+
+        for _ in range(workers):
+            submit_next()
+        while futures:
+            future = next(as_completed(futures))
+            idx = futures.pop(future)
+            try:
+                results[idx] = future.result()
+            except Exception as e:
+                # Одна неудачная точка не должна обрывать всю серию
+                results[idx] = {'params': points[idx], 'seed': seed, 'error': str(e)}
+            if 'error' not in results[idx]:
+                pending_records.append({'params': results[idx]['params'], 'results': results[idx]['avg_losses'],
+                                        'seed': seed, 'std_errors': results[idx]['std_errors']})
+                if len(pending_records) >= RECORD_BATCH:
+                    flush()
+            report(idx)
+            submit_next()
+    flush()
+    return results
+
+
+def parse_axis(spec):
+    """'key=values' -> (key, список значений)."""
+    if '=' not in spec:
+        raise ValueError(f"axis must look like key=values, got '{spec}'")
+    key, text = spec.split('=', 1)
+    key = key.strip()
+    return key, parse_values(key, text)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Серия экспериментов по сетке параметров.")
+    parser.add_argument('--axis', action='append', required=True, help="ось: key=a,b,c | key=start:stop:step")
+    parser.add_argument('--params', help="JSON-файл с базовыми параметрами (как в истории)")
+    parser.add_argument('--T', type=int)
+    parser.add_argument('--seed', type=int)
+    parser.add_argument('--workers', type=int, default=0, help="потоков (0 - все ядра)")
+    parser.add_argument('--no-record', action='store_true')
+    args = parser.parse_args(argv)
+
+    base = dict(DEFAULT_PARAMS)
+    if args.params:
+        with open(args.params, encoding='utf-8') as f:
+            base.update(json.load(f))
+    if args.T is not None:
+        base['T'] = args.T
+    base['seed'] = args.seed if args.seed is not None else random.SystemRandom().getrandbits(63)
+    axes = [parse_axis(spec) for spec in args.axis]
+
+    results = run_sweep(base, axes, workers=args.workers or None, record=not args.no_record)
+    keys = [key for key, _ in axes]
+    print(f"seed={base['seed']}")
+    for res in results:
+        point = ', '.join(f"{key}={_axis_value(res['params'], key)}" for key in keys)
+        if 'error' in res:
+            print(f"{point:<40} ошибка: {res['error']}")
+        else:
+            print(f"{point:<40} {res['best']:<16} {res['avg_losses'][res['best']]:.4f}% "
+                  f"отрыв {res['margin']:.4f} ± {res['margin_sem']:.4f}")
+
+
+def _axis_value(params, key):
+    if key in COMPOSITE_KEYS:
+        return '-'.join(str(params[k]) for k in COMPOSITE_KEYS[key])
+    return params[key]
+
+
+if __name__ == '__main__':
+    main()
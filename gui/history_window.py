@@ -1,11 +1,96 @@
-from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableWidget, 
-                             QTableWidgetItem, QHeaderView, QLabel, QPushButton, 
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QTableView, 
+                             QHeaderView, QLabel, QPushButton, QLineEdit, QComboBox,
                              QMenu, QMessageBox)
-from PyQt5.QtCore import Qt, pyqtSignal
+from PyQt5.QtCore import Qt, pyqtSignal, QAbstractTableModel, QModelIndex
 import data.database as db
 
+class HistoryModel(QAbstractTableModel):
+    """
+    История по страницам: записи подгружаются из базы по PAGE_SIZE штук, когда таблицу
+    прокручивают до конца (canFetchMore/fetchMore). Страница выбирается по id последней
+    загруженной записи, а фильтры уходят в SQL, поэтому открытие окна не зависит от размера истории.
+    """
+    PAGE_SIZE = 200
+    HEADERS = ["ID", "Время", "Параметры эксперимента"]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.records = []
+        self.filters = {}
+        self.exhausted = False
+
+    def set_filters(self, filters):
+        """Сбрасывает загруженные записи и загружает первую страницу с новыми фильтрами."""
+        self.beginResetModel()
+        self.filters = dict(filters)
+        self.records = []
+        self.exhausted = False
+        self.endResetModel()
+        self.fetchMore()
+
+    def refresh(self):
+        self.set_filters(self.filters)
+
+    def record(self, row):
+        return self.records[row]
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.records)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.HEADERS)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted:
+            return
+        before_id = self.records[-1]['id'] if self.records else None
+        page = db.get_records_page(before_id, self.PAGE_SIZE, **self.filters)
+        self.exhausted = len(page) < self.PAGE_SIZE
+        if page:
+            self.beginInsertRows(QModelIndex(), len(self.records), len(self.records) + len(page) - 1)
+            self.records.extend(page)
+            self.endInsertRows()
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if role == Qt.DisplayRole and orientation == Qt.Horizontal:
+            return self.HEADERS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        rec = self.records[index.row()]
+        if role == Qt.DisplayRole:
+            if index.column() == 0:
+                return str(rec['id'])
+            if index.column() == 1:
+                return rec['timestamp']
+            return self.describe(rec)
+        if role == Qt.TextAlignmentRole and index.column() == 0:
+            return Qt.AlignCenter
+        return None
+
+    @staticmethod
+    def describe(rec):
+        p = rec['params']
+        
+        dist_char = "Равн." if p.get('dist_type') == 'uniform' else "Конц."
+        chem_char = "Есть" if p.get('use_inorganic') else "Нет"
+        rip_char = f"Да(v={p.get('v')})" if p.get('use_ripening') else "Нет"
+        
+        desc = (f"T={p.get('T')}, n={p.get('n')} | "
+                f"α=[{p.get('alpha_min')}-{p.get('alpha_max')}] | "
+                f"β=[{p.get('beta1')}-{p.get('beta2')}] | Распред: {dist_char}"
+                f"Дозар: {rip_char}, Хим: {chem_char}")
+        if rec.get('seed') is not None:
+            desc += f" | seed={rec['seed']}"
+        return desc
+
 class HistoryWindow(QDialog):
-    experiment_selected = pyqtSignal(dict, dict)
+    experiment_selected = pyqtSignal(dict, dict, dict)
 
     def __init__(self, parent=None, dark_mode=True):
         super().__init__(parent)
@@ -23,9 +108,33 @@ class HistoryWindow(QDialog):
         self.lbl_info = QLabel("Дважды кликните по строке, чтобы загрузить параметры и результаты.")
         layout.addWidget(self.lbl_info)
 
-        self.table = QTableWidget()
-        self.table.setColumnCount(3)
-        self.table.setHorizontalHeaderLabels(["ID", "Время", "Параметры эксперимента"])
+        filter_layout = QHBoxLayout()
+        self.inp_search = QLineEdit()
+        self.inp_search.setPlaceholderText("Поиск: n=15|20 beta1>=0.8 T<=1000 seed=42 (Enter)")
+        self.inp_search.returnPressed.connect(self.load_data)
+        self.combo_dist = QComboBox()
+        self.combo_dist.addItem("Любое распределение", None)
+        self.combo_dist.addItem("Равномерное", 'uniform')
+        self.combo_dist.addItem("Концентрированное", 'concentrated')
+        self.combo_dist.currentIndexChanged.connect(self.load_data)
+        self.combo_ripening = QComboBox()
+        self.combo_ripening.addItem("Дозаривание: любое", None)
+        self.combo_ripening.addItem("С дозариванием", True)
+        self.combo_ripening.addItem("Без дозаривания", False)
+        self.combo_ripening.currentIndexChanged.connect(self.load_data)
+        filter_layout.addWidget(self.inp_search, 1)
+        filter_layout.addWidget(self.combo_dist)
+        filter_layout.addWidget(self.combo_ripening)
+        layout.addLayout(filter_layout)
+
+        self.lbl_error = QLabel("")
+        self.lbl_error.setStyleSheet("color: #D32F2F;")
+        self.lbl_error.hide()
+        layout.addWidget(self.lbl_error)
+
+        self.model = HistoryModel(self)
+        self.table = QTableView()
+        self.table.setModel(self.model)
         
         self.table.horizontalHeader().setVisible(False)
         self.table.verticalHeader().setVisible(False)
@@ -35,12 +144,12 @@ class HistoryWindow(QDialog):
         header.setSectionResizeMode(1, QHeaderView.ResizeToContents)
         header.setSectionResizeMode(2, QHeaderView.Stretch)
         
-        self.table.setSelectionBehavior(QTableWidget.SelectRows)
-        self.table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.table.setSelectionBehavior(QTableView.SelectRows)
+        self.table.setEditTriggers(QTableView.NoEditTriggers)
         
         self.table.setFocusPolicy(Qt.NoFocus)
         
-        self.table.cellDoubleClicked.connect(self.on_row_double_clicked)
+        self.table.doubleClicked.connect(self.on_row_double_clicked)
         
         layout.addWidget(self.table)
         
@@ -58,35 +167,39 @@ class HistoryWindow(QDialog):
         
         layout.addLayout(btn_layout)
 
+    def get_filters(self):
+        """Фильтры из строки поиска и списков; списки важнее одноименных условий поиска."""
+        filters = db.parse_filters(self.inp_search.text())
+        if self.combo_dist.currentData() is not None:
+            filters['dist_type'] = self.combo_dist.currentData()
+        if self.combo_ripening.currentData() is not None:
+            filters['use_ripening'] = self.combo_ripening.currentData()
+        return filters
+
     def load_data(self):
-        records = db.get_all_records()
-        self.table.setRowCount(len(records))
-        self.records_data = records 
+        try:
+            filters = self.get_filters()
+        except ValueError as e:
+            self.lbl_error.setText(f"Ошибка в строке поиска: {e}")
+            self.lbl_error.show()
+            return
+        self.lbl_error.hide()
+        self.model.set_filters(filters)
+        self.show_write_errors()
 
-        for row, rec in enumerate(records):
-            p = rec['params']
-            
-            dist_char = "Равн." if p.get('dist_type') == 'uniform' else "Конц."
-            chem_char = "Есть" if p.get('use_inorganic') else "Нет"
-            rip_char = f"Да(v={p.get('v')})" if p.get('use_ripening') else "Нет"
-            
-            desc = (f"T={p.get('T')}, n={p.get('n')} | "
-                    f"α=[{p.get('alpha_min')}-{p.get('alpha_max')}] | "
-                    f"β=[{p.get('beta1')}-{p.get('beta2')}] | Распред: {dist_char}"
-                    f"Дозар: {rip_char}, Хим: {chem_char}")
-            
-            item_id = QTableWidgetItem(str(rec['id']))
-            item_id.setTextAlignment(Qt.AlignCenter)
-            item_time = QTableWidgetItem(rec['timestamp'])
-            item_desc = QTableWidgetItem(desc)
-            
-            self.table.setItem(row, 0, item_id)
-            self.table.setItem(row, 1, item_time)
-            self.table.setItem(row, 2, item_desc)
+    def show_write_errors(self):
+        """Показывает в lbl_error ошибки фоновой записи истории (окно при этом не падает)."""
+        errors = db.pending_errors()
+        if errors:
+            self.lbl_error.setText(f"Не удалось сохранить записей: {len(errors)} ({errors[0]})")
+            self.lbl_error.show()
 
-    def on_row_double_clicked(self, row, column):
-        record = self.records_data[row]
-        self.experiment_selected.emit(record['params'], record['results'])
+    def on_row_double_clicked(self, index):
+        record = self.model.record(index.row())
+        params = dict(record['params'])
+        if record.get('seed') is not None:
+            params['seed'] = record['seed']
+        self.experiment_selected.emit(params, record['results'], record.get('std_errors') or {})
         self.close()
 
     def show_clear_menu(self):
@@ -130,7 +243,8 @@ class HistoryWindow(QDialog):
                 return
             db.delete_all()
         
-        self.load_data()
+        self.model.refresh()
+        self.show_write_errors()
 
     def apply_theme(self):
         if self.dark_mode:
@@ -150,12 +264,19 @@ class HistoryWindow(QDialog):
             QDialog {{ background-color: {bg}; color: {fg}; }}
             QLabel {{ color: {fg}; font-size: 12px; margin-bottom: 5px; }}
             
-            QTableWidget {{ 
+            QTableView {{ 
                 background-color: {input_bg}; 
                 color: {fg}; 
                 border: 1px solid {acc}; 
                 gridline-color: {border}; 
             }}
+            QLineEdit, QComboBox {{
+                background-color: {input_bg};
+                color: {fg};
+                border: 1px solid {acc};
+                border-radius: 4px;
+                padding: 4px;
+            }}
             
             /* Стили кнопок */
             QPushButton {{ 
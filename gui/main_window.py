@@ -4,20 +4,25 @@ from PyQt5.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
                              QComboBox, QMessageBox, QProgressBar, QGroupBox, 
                              QTextEdit, QApplication, QMenu, QColorDialog, QToolButton,
                              QScrollArea)
-from PyQt5.QtCore import Qt
+from PyQt5.QtCore import Qt, QTimer
 from PyQt5.QtGui import QPalette, QColor, QFont
 import matplotlib.pyplot as plt
 from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
 
 import data.database as db
+from data import checkpoints
 from gui.history_window import HistoryWindow
 from gui.help_window import HelpWindow
+from gui.sweep_window import SweepWindow
 
 try:
     from gui.worker import WorkerThread
 except ImportError:
     from worker import WorkerThread
 
+# Текст полосы прогресса во время переноса старой истории в новый формат
+MIGRATION_FORMAT = "Перенос истории: %p%"
+
 class MainWindow(QMainWindow):
     def __init__(self):
         super().__init__()
@@ -41,12 +46,23 @@ class MainWindow(QMainWindow):
         
         self.worker = None
         self.last_results = {}
+        self.last_errors = {}
+        self.stop_note = None
         
         self.resume_state = None      
         self.last_run_params = None   
+        # Контрольная точка текущего прогона в базе (data/checkpoints.py)
+        self.checkpoint_id = None
         
         self.init_ui()
         self.apply_theme()
+        # Предложение продолжить прерванный расчет — после показа окна
+        QTimer.singleShot(0, self.offer_resume)
+        # Старая история переносится в новый формат в фоне (data/database.py): ход — в полосе прогресса
+        self.migration_timer = QTimer(self)
+        self.migration_timer.timeout.connect(self.show_migration_progress)
+        if db.migration_progress() is not None:
+            self.migration_timer.start(200)
 
     def init_ui(self):
         central_widget = QWidget()
@@ -73,11 +89,40 @@ class MainWindow(QMainWindow):
         
         self.inp_T = QLineEdit("50") 
         self.inp_n = QLineEdit("15")
+        self.inp_seed = QLineEdit()
+        self.inp_seed.setPlaceholderText("случайный")
         self.inp_T.setMinimumHeight(38)
         self.inp_n.setMinimumHeight(38)
+        self.inp_seed.setMinimumHeight(38)
+        self.combo_engine = QComboBox()
+        self.combo_engine.addItems(["Венгерский", "LAPJV"])
+        self.combo_engine.setMinimumHeight(38)
+        self.combo_dtype = QComboBox()
+        self.combo_dtype.addItems(["Двойная (float64)", "Одинарная (float32)"])
+        self.combo_dtype.setMinimumHeight(38)
+        self.combo_sampler = QComboBox()
+        self.combo_sampler.addItems(["Монте-Карло", "Антитетическая", "Соболь (RQMC)"])
+        self.combo_sampler.setMinimumHeight(38)
+        # Векторы потерь по экспериментам для гистограмм и квантилей (data/losses.py); на расчет не влияет
+        self.chk_keep_losses = QCheckBox("Сохранять в историю")
+        self.chk_keep_losses.setStyleSheet("QCheckBox::indicator { width: 24px; height: 24px; }")
+        self.combo_stop = QComboBox()
+        self.combo_stop.addItems(["Ровно T", "По точности", "По ранжированию"])
+        self.combo_stop.setMinimumHeight(38)
+        self.combo_stop.currentIndexChanged.connect(self.toggle_stop_rule)
+        self.inp_half_width = QLineEdit("0.05")
+        self.inp_half_width.setMinimumHeight(38)
+        self.inp_half_width.setEnabled(False)
 
         form_gen.addRow("Экспериментов (T):", self.inp_T)
+        form_gen.addRow("Остановка:", self.combo_stop)
+        form_gen.addRow("Точность ±, п.п.:", self.inp_half_width)
         form_gen.addRow("Партий (n):", self.inp_n)
+        form_gen.addRow("Seed:", self.inp_seed)
+        form_gen.addRow("Точный метод:", self.combo_engine)
+        form_gen.addRow("Точность:", self.combo_dtype)
+        form_gen.addRow("Выборка:", self.combo_sampler)
+        form_gen.addRow("Потери опытов:", self.chk_keep_losses)
         grp_gen.setLayout(form_gen)
         settings_layout.addWidget(grp_gen)
         
@@ -193,6 +238,9 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(scroll_area)
         main_layout.addWidget(results_panel)
 
+    def toggle_stop_rule(self, index):
+        self.inp_half_width.setEnabled(index == 1)
+
     def toggle_ripening(self, state):
         is_checked = (state == Qt.Checked)
         self.inp_v.setEnabled(is_checked)
@@ -232,6 +280,15 @@ class MainWindow(QMainWindow):
             else:
                 p['v'], p['beta_max'] = 0, 1.0
             p['use_inorganic'] = self.chk_chem.isChecked()
+            p['exact_engine'] = 'hungarian' if self.combo_engine.currentIndex() == 0 else 'lapjv'
+            p['dtype'] = 'float64' if self.combo_dtype.currentIndex() == 0 else 'float32'
+            p['sampler'] = ('mc', 'antithetic', 'sobol')[self.combo_sampler.currentIndex()]
+            # В адаптивных режимах T — верхняя граница (engine/stopping.py)
+            p['stop_rule'] = ('fixed', 'precision', 'ranking')[self.combo_stop.currentIndex()]
+            if p['stop_rule'] == 'precision':
+                p['half_width'] = self.validate_input("Точность ±, п.п.", self.inp_half_width, 1e-6, 100.0, is_int=False)
+            if self.inp_seed.text().strip():
+                p['seed'] = self.validate_input("Seed", self.inp_seed, 0, 2**63 - 1)
             return p
         except ValueError as e:
             msg = QMessageBox(self)
@@ -249,27 +306,38 @@ class MainWindow(QMainWindow):
         if not params: return
         start_idx = 0
         prev_data = None
+        seed = None
+        prev_losses = None
         if self.resume_state and self.last_run_params == params:
-            start_idx, prev_data = self.resume_state
+            start_idx, prev_data, seed, prev_losses = self.resume_state
             if start_idx >= params['T']:
                 start_idx = 0
                 prev_data = None
+                seed = None
+                prev_losses = None
         else:
+            # Новый прогон вместо приостановленного: старая контрольная точка больше не нужна
+            checkpoints.delete(self.checkpoint_id)
+            self.checkpoint_id = None
             self.resume_state = None
             self.last_run_params = params
         self.btn_run.hide()
         self.btn_cancel.show()
+        self.stop_note = None
         if start_idx == 0:
             self.txt_output.clear()
             self.progress.setValue(0)
         self.progress.setMaximum(params['T'])
         self.progress.setFormat("%p%")
-        self.worker = WorkerThread(params, start_index=start_idx, prev_strategies=prev_data)
+        self.worker = WorkerThread(params, start_index=start_idx, prev_stats=prev_data, seed=seed,
+                                   checkpoint_id=self.checkpoint_id,
+                                   keep_losses=self.chk_keep_losses.isChecked(), prev_losses=prev_losses)
         self.worker.progress_updated.connect(self.progress.setValue)
-        self.worker.result_ready.connect(self.display_results)
+        self.worker.result_ready.connect(self.on_results_ready)
         self.worker.error_occurred.connect(self.handle_error)
         self.worker.finished.connect(self.on_worker_finished)
         self.worker.paused_state_saved.connect(self.save_state_on_pause)
+        self.worker.stopped_early.connect(self.on_stopped_early)
         self.worker.start()
 
     def cancel_experiment(self):
@@ -278,9 +346,14 @@ class MainWindow(QMainWindow):
             self.btn_cancel.setEnabled(False)
 
     def save_state_on_pause(self, idx, data):
-        self.resume_state = (idx, data)
+        self.resume_state = (idx, data, self.worker.seed, self.worker.losses)
+        self.checkpoint_id = self.worker.checkpoint_id
         self.progress.setFormat(f"Пауза ({idx}/{self.last_run_params['T']})")
 
+    def on_stopped_early(self, note):
+        self.stop_note = note
+        self.progress.setFormat(f"Досрочно: %v из {self.last_run_params['T']}")
+
     def on_worker_finished(self):
         self.btn_cancel.hide()
         self.btn_cancel.setEnabled(True)
@@ -289,6 +362,70 @@ class MainWindow(QMainWindow):
             self.btn_run.setText("ПРОДОЛЖИТЬ")
         else:
             self.btn_run.setText("ЗАПУСТИТЬ МОДЕЛИРОВАНИЕ")
+            self.checkpoint_id = self.worker.checkpoint_id if self.worker else None
+
+    def show_migration_progress(self):
+        """Ход переноса старой истории; полоса прогресса занимается, только пока она свободна."""
+        state = db.migration_progress()
+        running = self.worker is not None and self.worker.isRunning()
+        idle = not running and self.progress.format() in ("%p%", MIGRATION_FORMAT)
+        if state is not None:
+            done, total = state
+            if idle:
+                # Пока число записей неизвестно, maximum=0 — бегущая полоса
+                self.progress.setMaximum(total or 0)
+                self.progress.setValue(done)
+                self.progress.setFormat(MIGRATION_FORMAT)
+            return
+        self.migration_timer.stop()
+        if idle:
+            self.progress.setMaximum(100)
+            self.progress.setValue(0)
+            self.progress.setFormat("%p%")
+        try:
+            db.flush()
+        except Exception as e:
+            QMessageBox.warning(self, "История", f"Не удалось перенести историю в новый формат:\n{e}")
+
+    def offer_resume(self):
+        """Предлагает продолжить прогон, прерванный сбоем или закрытием окна."""
+        try:
+            from engine.backend import load_backend
+            _, core = load_backend()
+            saved = checkpoints.get_all(core)
+        except Exception:
+            return
+        if not saved:
+            return
+        cp = saved[0]
+        p = cp['params']
+        answer = QMessageBox.question(
+            self, "Незавершенный расчет",
+            f"Найден незавершенный расчет от {cp['timestamp']}:\n"
+            f"T={p.get('T')}, n={p.get('n')}, выполнено {cp['next_index']} экспериментов.\n\n"
+            f"Продолжить его? При отказе сохраненное состояние будет удалено.",
+            QMessageBox.Yes | QMessageBox.No)
+        if answer != QMessageBox.Yes:
+            checkpoints.delete_all()
+            return
+        # Остальные точки — от более старых прогонов, продолжить можно только один
+        for other in saved[1:]:
+            checkpoints.delete(other['id'])
+        self.fill_inputs(p)
+        self.last_run_params = p
+        self.resume_state = (cp['next_index'], {**cp['stats'], **cp['pair_stats']}, cp['seed'], None)
+        self.checkpoint_id = cp['id']
+        self.progress.setMaximum(p['T'])
+        self.progress.setValue(cp['next_index'])
+        self.progress.setFormat(f"Пауза ({cp['next_index']}/{p['T']})")
+        self.btn_run.setText("ПРОДОЛЖИТЬ")
+
+    def closeEvent(self, event):
+        # Работающий расчет приостанавливается: поток сохраняет контрольную точку
+        if self.worker and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().closeEvent(event)
 
     def handle_error(self, msg_text):
         self.btn_cancel.hide()
@@ -298,6 +435,11 @@ class MainWindow(QMainWindow):
         self.progress.setFormat("Ошибка")
         self.resume_state = None
         self.last_run_params = None
+        # После ошибки продолжать нечего: та же точка снова упала бы на том же эксперименте
+        if self.worker:
+            checkpoints.delete(self.worker.checkpoint_id)
+            self.worker.checkpoint_id = None
+        self.checkpoint_id = None
         self.btn_run.setText("ЗАПУСТИТЬ МОДЕЛИРОВАНИЕ")
         msg = QMessageBox(self)
         msg.setIcon(QMessageBox.Critical)
@@ -306,13 +448,28 @@ class MainWindow(QMainWindow):
         msg.setFont(QFont("Arial", 16))
         msg.exec_()
 
-    def display_results(self, avg_losses):
+    def on_results_ready(self, avg_losses, std_errors):
+        if self.last_run_params:
+            losses = self.worker.collected_losses()
+            db.add_record(self.last_run_params, avg_losses, seed=self.worker.seed, std_errors=std_errors,
+                          losses=losses)
+        self.display_results(avg_losses, std_errors)
+        if self.stop_note:
+            self.txt_output.append(f"\n⏱ {self.stop_note}")
+        if self.worker and self.worker.cached_count:
+            self.txt_output.append(f"\n💾 Из кэша взято {self.worker.cached_count} экспериментов (те же параметры и seed).")
+        if self.worker and self.worker.keep_losses:
+            if self.worker.losses is not None:
+                self.txt_output.append("\n📦 Потери по каждому эксперименту сохранены в историю.")
+            else:
+                self.txt_output.append("\n📦 Потери по экспериментам не сохранены: начало прогона считалось без их сбора (до паузы или перезапуска).")
+
+    def display_results(self, avg_losses, std_errors=None):
         self.resume_state = None 
         self.btn_run.setText("ЗАПУСТИТЬ МОДЕЛИРОВАНИЕ")
-        if self.last_run_params:
-            db.add_record(self.last_run_params, avg_losses)
         self.last_results = avg_losses
-        self.plot_results(avg_losses)
+        self.last_errors = std_errors or {}
+        self.plot_results(avg_losses, self.last_errors)
         report = "=== РЕЗУЛЬТАТЫ ЭКСПЕРИМЕНТА ===\n\n"
         names_ru = {'greedy': 'Жадная', 'thrifty': 'Бережливая',
                     'greedy_thrifty': 'Жадно-бережливая',
@@ -320,15 +477,20 @@ class MainWindow(QMainWindow):
         if avg_losses:
             sorted_res = sorted(avg_losses.items(), key=lambda item: item[1])
             for name, val in sorted_res:
-                report += f"{names_ru[name]:<20} : {val:.2f}% потерь\n"
+                if name in self.last_errors:
+                    report += f"{names_ru[name]:<20} : {val:.2f} ± {self.last_errors[name]:.2f}% потерь\n"
+                else:
+                    report += f"{names_ru[name]:<20} : {val:.2f}% потерь\n"
             best_strat = sorted_res[0][0]
             report += f"\n🏆 РЕКОМЕНДУЕМАЯ СТРАТЕГИЯ: {names_ru[best_strat].upper()}"
+            if self.last_errors:
+                report += "\n\n± — стандартная ошибка среднего"
         else:
             report += "Нет данных для отображения."
         self.txt_output.setText(report)
 
     # --- ГРАФИКИ (С УВЕЛИЧЕННЫМ ОТСТУПОМ) ---
-    def plot_results(self, avg_losses):
+    def plot_results(self, avg_losses, std_errors=None):
         self.ax.clear()
         bg_hex, fg_hex = self.bg_color.name(), self.text_color.name()
         self.figure.patch.set_facecolor(bg_hex)
@@ -336,6 +498,7 @@ class MainWindow(QMainWindow):
         labels = ['Жадная', 'Бережл.', 'Ж-Б', 'Б-Ж', 'Медиана']
         keys = ['greedy', 'thrifty', 'greedy_thrifty', 'thrifty_greedy', 'median']
         values = [avg_losses.get(k, 0) for k in keys]
+        errors = [std_errors[k] for k in keys] if std_errors else None
         bar_colors = ['#808080', '#FF9999', '#66B2FF', '#99FF99', '#FFCC99', '#C2C2F0']
         
         # --- ЛОГИКА УВЕЛИЧЕНИЯ ОТСТУПА СВЕРХУ ---
@@ -345,7 +508,8 @@ class MainWindow(QMainWindow):
         else:
             self.ax.set_ylim(0, 10)
 
-        bars = self.ax.bar(labels, values, color=bar_colors)
+        bars = self.ax.bar(labels, values, color=bar_colors, yerr=errors, capsize=6,
+                           error_kw={'ecolor': fg_hex, 'alpha': 0.7})
         
         self.ax.tick_params(axis='x', colors=fg_hex, labelsize=12)
         self.ax.tick_params(axis='y', colors=fg_hex, labelsize=12)
@@ -371,6 +535,8 @@ class MainWindow(QMainWindow):
         menu = QMenu(self)
         action_history = menu.addAction("📜 История запросов")
         action_history.triggered.connect(self.show_history)
+        action_sweep = menu.addAction("📊 Серия экспериментов")
+        action_sweep.triggered.connect(self.show_sweep)
         action_help = menu.addAction("❓ Помощь")
         action_help.triggered.connect(self.show_help)
         menu.addSeparator()
@@ -385,15 +551,36 @@ class MainWindow(QMainWindow):
         menu.exec_(self.btn_settings.mapToGlobal(self.btn_settings.rect().topRight()))
 
     def show_history(self):
+        state = db.migration_progress()
+        if state is not None:
+            done, total = state
+            status = f" ({done} из {total} записей)" if total else ""
+            QMessageBox.information(self, "История",
+                                    f"История переносится в новый формат{status}. Откройте ее после завершения.")
+            return
         self.history_window = HistoryWindow(self, self.dark_mode)
         self.history_window.experiment_selected.connect(self.load_from_history)
         self.history_window.exec_()
 
+    def show_sweep(self):
+        # Точки серии строятся от текущих настроек: ось заменяет соответствующий параметр
+        params = self.get_params()
+        if not params: return
+        self.sweep_window = SweepWindow(params, self, self.dark_mode)
+        self.sweep_window.exec_()
+
     def show_help(self):
         self.help_window = HelpWindow(self, self.dark_mode)
         self.help_window.exec_()
 
-    def load_from_history(self, params, results):
+    def load_from_history(self, params, results, std_errors):
+        self.fill_inputs(params)
+        self.last_run_params = params 
+        self.progress.setValue(100)
+        self.progress.setFormat("Из истории")
+        self.display_results(results, std_errors)
+
+    def fill_inputs(self, params):
         self.inp_T.setText(str(params.get('T')))
         self.inp_n.setText(str(params.get('n')))
         self.inp_alpha_min.setText(str(params.get('alpha_min')))
@@ -407,10 +594,14 @@ class MainWindow(QMainWindow):
             self.inp_v.setText(str(params.get('v')))
             self.inp_beta_max.setText(str(params.get('beta_max')))
         self.chk_chem.setChecked(params.get('use_inorganic', False))
-        self.last_run_params = params 
-        self.progress.setValue(100)
-        self.progress.setFormat("Из истории")
-        self.display_results(results)
+        self.combo_engine.setCurrentIndex(1 if params.get('exact_engine') == 'lapjv' else 0)
+        self.combo_dtype.setCurrentIndex(1 if params.get('dtype') == 'float32' else 0)
+        self.combo_sampler.setCurrentIndex({'antithetic': 1, 'sobol': 2}.get(params.get('sampler'), 0))
+        self.combo_stop.setCurrentIndex({'precision': 1, 'ranking': 2}.get(params.get('stop_rule'), 0))
+        if 'half_width' in params:
+            self.inp_half_width.setText(str(params['half_width']))
+        seed = params.get('seed')
+        self.inp_seed.setText("" if seed is None else str(seed))
 
     def toggle_dark_mode(self):
         self.dark_mode = not self.dark_mode
@@ -539,7 +730,7 @@ class MainWindow(QMainWindow):
         self.btn_cancel.setStyleSheet(f"background-color: #D32F2F; color: white; border-radius: 8px; font-weight: bold; font-size: 18px;")
         
         if self.last_results:
-            self.plot_results(self.last_results)
+            self.plot_results(self.last_results, self.last_errors)
         else:
             self.figure.patch.set_facecolor(bg)
             self.ax.set_facecolor(bg)
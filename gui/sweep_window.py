@@ -0,0 +1,245 @@
+from PyQt5.QtWidgets import (QDialog, QVBoxLayout, QHBoxLayout, QGridLayout, QLabel,
+                             QComboBox, QLineEdit, QPushButton, QProgressBar, QMessageBox)
+from PyQt5.QtCore import Qt
+import numpy as np
+import matplotlib.pyplot as plt
+from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+
+from engine.sweep import parse_values, COMPOSITE_KEYS
+from gui.worker import SweepThread
+
+# Ключи, по которым можно строить ось, и значения по умолчанию для поля ввода
+AXIS_KEYS = [
+    ('n', "Партий (n)", "5:25:5"),
+    ('T', "Экспериментов (T)", "100,200,400"),
+    ('beta_range', "Диапазон β", "0.80-0.90,0.86-0.99"),
+    ('alpha_range', "Диапазон α", "0.05-0.15,0.12-0.22"),
+    ('v', "Этапов дозаривания (v)", "1:5:1"),
+    ('beta_max', "Beta max", "1.0,1.05,1.1"),
+    ('dist_type', "Распределение", "uniform,concentrated"),
+    ('sampler', "Выборка", "mc,antithetic,sobol"),
+    ('use_ripening', "Дозаривание", "нет,да"),
+    ('use_inorganic', "Неорганика", "нет,да"),
+]
+SHORT_NAMES = {'greedy': 'Ж', 'thrifty': 'Б', 'median': 'Мед', 'greedy_thrifty': 'Ж-Б', 'thrifty_greedy': 'Б-Ж'}
+
+
+class SweepWindow(QDialog):
+    def __init__(self, base_params, parent=None, dark_mode=True):
+        super().__init__(parent)
+        self.setWindowTitle("Серия экспериментов")
+        self.resize(900, 700)
+        self.dark_mode = dark_mode
+        self.base_params = base_params
+        self.worker = None
+        self.setWindowFlags(self.windowFlags() & ~Qt.WindowContextHelpButtonHint)
+        self.init_ui()
+        self.apply_theme()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.lbl_info = QLabel("Значения: список 'a,b,c' или диапазон 'start:stop:step'. "
+                               "Все точки считаются с одним seed и сохраняются в историю.")
+        self.lbl_info.setWordWrap(True)
+        layout.addWidget(self.lbl_info)
+
+        grid = QGridLayout()
+        self.combo_x, self.inp_x = self.make_axis_row(grid, 0, "Ось X:", 0)
+        self.combo_y, self.inp_y = self.make_axis_row(grid, 1, "Ось Y:", 2, optional=True)
+        layout.addLayout(grid)
+
+        self.progress = QProgressBar()
+        self.progress.setValue(0)
+        layout.addWidget(self.progress)
+
+        self.figure = plt.figure()
+        self.canvas = FigureCanvas(self.figure)
+        self.ax = self.figure.add_subplot(111)
+        layout.addWidget(self.canvas)
+
+        btn_layout = QHBoxLayout()
+        self.btn_run = QPushButton("Запустить серию")
+        self.btn_run.clicked.connect(self.start_sweep)
+        self.btn_cancel = QPushButton("Остановить")
+        self.btn_cancel.clicked.connect(self.cancel_sweep)
+        self.btn_cancel.hide()
+        self.btn_close = QPushButton("Закрыть")
+        self.btn_close.clicked.connect(self.close)
+        btn_layout.addWidget(self.btn_run)
+        btn_layout.addWidget(self.btn_cancel)
+        btn_layout.addStretch()
+        btn_layout.addWidget(self.btn_close)
+        layout.addLayout(btn_layout)
+
+    def make_axis_row(self, grid, row, title, default_index, optional=False):
+        combo = QComboBox()
+        if optional:
+            combo.addItem("—", None)
+        for key, label, _ in AXIS_KEYS:
+            combo.addItem(label, key)
+        inp = QLineEdit()
+        combo.currentIndexChanged.connect(lambda: inp.setText(self.default_values(combo.currentData())))
+        combo.setCurrentIndex(default_index + (1 if optional else 0))
+        inp.setText(self.default_values(combo.currentData()))
+        grid.addWidget(QLabel(title), row, 0)
+        grid.addWidget(combo, row, 1)
+        grid.addWidget(inp, row, 2)
+        return combo, inp
+
+    @staticmethod
+    def default_values(key):
+        return next((values for k, _, values in AXIS_KEYS if k == key), "")
+
+    def get_axes(self):
+        axes = []
+        for combo, inp in ((self.combo_x, self.inp_x), (self.combo_y, self.inp_y)):
+            key = combo.currentData()
+            if key is None:
+                continue
+            values = parse_values(key, inp.text())
+            if not values:
+                raise ValueError(f"Не заданы значения для оси '{combo.currentText()}'.")
+            axes.append((key, values))
+        if len(axes) == 2 and axes[0][0] == axes[1][0]:
+            raise ValueError("Оси X и Y должны быть разными.")
+        return axes
+
+    # --- УПРАВЛЕНИЕ ПОТОКОМ ---
+    def start_sweep(self):
+        try:
+            self.axes = self.get_axes()
+        except ValueError as e:
+            QMessageBox.critical(self, "Ошибка ввода", str(e))
+            return
+        base = dict(self.base_params)
+        # Оси с дозариванием: без него v не имеет смысла
+        if any(key == 'v' for key, _ in self.axes):
+            base['use_ripening'] = True
+            base.setdefault('beta_max', 1.0)
+        self.btn_run.hide()
+        self.btn_cancel.show()
+        self.progress.setValue(0)
+        self.worker = SweepThread(base, self.axes)
+        self.worker.progress_updated.connect(self.on_progress)
+        self.worker.sweep_finished.connect(self.on_sweep_finished)
+        self.worker.error_occurred.connect(self.on_error)
+        self.worker.start()
+
+    def cancel_sweep(self):
+        if self.worker:
+            self.worker.requestInterruption()
+
+    def on_progress(self, done, total):
+        self.progress.setMaximum(total)
+        self.progress.setValue(done)
+
+    def on_sweep_finished(self, results):
+        self.btn_cancel.hide()
+        self.btn_run.show()
+        self.results = results
+        self.plot_heatmap(results)
+
+    def on_error(self, message):
+        self.btn_cancel.hide()
+        self.btn_run.show()
+        QMessageBox.critical(self, "Ошибка", message)
+
+    def closeEvent(self, event):
+        if self.worker and self.worker.isRunning():
+            self.worker.requestInterruption()
+            self.worker.wait()
+        super().closeEvent(event)
+
+    # --- ТЕПЛОВАЯ КАРТА ---
+    def plot_heatmap(self, results):
+        """Цвет клетки — отрыв лучшей стратегии от ближайшей (п.п.), подпись — лучшая стратегия."""
+        self.figure.clear()
+        self.ax = self.figure.add_subplot(111)
+        fg_hex = "#FFFFFF" if self.dark_mode else "#000000"
+        bg_hex = "#282828" if self.dark_mode else "#F0F0F0"
+        self.figure.patch.set_facecolor(bg_hex)
+
+        x_key, x_values = self.axes[0]
+        y_key, y_values = self.axes[1] if len(self.axes) > 1 else (None, [None])
+        # Точки идут в порядке декартова произведения: X — внешний цикл, Y — внутренний
+        margins = np.full((len(y_values), len(x_values)), np.nan)
+        for i, res in enumerate(results):
+            if res is None or 'error' in res:
+                continue
+            margins[i % len(y_values), i // len(y_values)] = res['margin']
+
+        image = self.ax.imshow(np.ma.masked_invalid(margins), cmap='viridis', aspect='auto', origin='lower')
+        cbar = self.figure.colorbar(image, ax=self.ax)
+        cbar.set_label('Отрыв от второй стратегии, п.п.', color=fg_hex)
+        cbar.ax.tick_params(colors=fg_hex)
+
+        for i, res in enumerate(results):
+            row, col = i % len(y_values), i // len(y_values)
+            if res is None:
+                text = "—"
+            elif 'error' in res:
+                text = "ошибка"
+            else:
+                text = f"{SHORT_NAMES[res['best']]}\n{res['margin']:.2f}±{res['margin_sem']:.2f}"
+            self.ax.text(col, row, text, ha='center', va='center', color=fg_hex, fontsize=9,
+                         bbox={'facecolor': bg_hex, 'alpha': 0.4, 'edgecolor': 'none'})
+
+        self.ax.set_xticks(range(len(x_values)))
+        self.ax.set_xticklabels([self.format_value(x_key, v) for v in x_values])
+        self.ax.set_xlabel(self.combo_x.currentText(), color=fg_hex)
+        self.ax.set_yticks(range(len(y_values)))
+        if y_key is None:
+            self.ax.set_yticklabels([""])
+        else:
+            self.ax.set_yticklabels([self.format_value(y_key, v) for v in y_values])
+            self.ax.set_ylabel(self.combo_y.currentText(), color=fg_hex)
+        self.ax.tick_params(colors=fg_hex)
+        self.ax.set_title('Лучшая стратегия и ее отрыв', color=fg_hex, fontsize=14)
+        self.figure.tight_layout()
+        self.canvas.draw()
+
+    @staticmethod
+    def format_value(key, value):
+        if key in COMPOSITE_KEYS:
+            return f"{value[0]:g}-{value[1]:g}"
+        if isinstance(value, bool):
+            return "да" if value else "нет"
+        return f"{value:g}" if isinstance(value, float) else str(value)
+
+    def apply_theme(self):
+        if self.dark_mode:
+            bg = "#282828"
+            fg = "#FFFFFF"
+            input_bg = "#3C3C3C"
+            acc = "#4CAF50"
+        else:
+            bg = "#F0F0F0"
+            fg = "#000000"
+            input_bg = "#FFFFFF"
+            acc = "#2196F3"
+
+        self.setStyleSheet(f"""
+            QDialog {{ background-color: {bg}; color: {fg}; }}
+            QLabel {{ color: {fg}; font-size: 12px; }}
+            QLineEdit, QComboBox {{
+                background-color: {input_bg};
+                color: {fg};
+                border: 1px solid {acc};
+                border-radius: 4px;
+                padding: 4px;
+            }}
+            QProgressBar {{ border: 1px solid {acc}; border-radius: 4px; text-align: center; color: {fg}; }}
+            QProgressBar::chunk {{ background-color: {acc}; }}
+
+            /* Стили кнопок */
+            QPushButton {{
+                background-color: {acc};
+                color: white;
+                border-radius: 5px;
+                padding: 8px;
+                font-weight: bold;
+                min-width: 80px;
+            }}
+            QPushButton:hover {{ background-color: {acc}CC; }}
+        """)
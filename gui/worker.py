@@ -1,26 +1,44 @@
-import numpy as np
 from PyQt5.QtCore import QThread, pyqtSignal
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 import sys
 import os
+import time
+import numpy as np
 
 
 class WorkerThread(QThread):
     progress_updated = pyqtSignal(int)
-    result_ready = pyqtSignal(dict)
+    result_ready = pyqtSignal(dict, dict)
     error_occurred = pyqtSignal(str)
     paused_state_saved = pyqtSignal(int, dict)
+    stopped_early = pyqtSignal(str)
 
-    def __init__(self, params, start_index=0, prev_strategies=None):
+    def __init__(self, params, start_index=0, prev_stats=None, seed=None, workers=None, backend=None,
+                 checkpoint_id=None, checkpoint_interval=None, keep_losses=False, prev_losses=None):
         super().__init__()
         self.params = params
+        self.backend = backend
         self.start_index = start_index
-        if prev_strategies:
-            self.strategies = prev_strategies
-        else:
-            self.strategies = {
-                'greedy': [], 'thrifty': [], 'median': [],
-                'greedy_thrifty': [], 'thrifty_greedy': []
-            }
+        self.seed = seed if seed is not None else params.get('seed')
+        self.workers = workers or os.cpu_count() or 1
+        # Накопленные до паузы статистики {стратегия: RunningStats} и {(a, b): RunningStats}
+        # разностей потерь: по 5 чисел на накопитель вместо списка потерь по каждому эксперименту
+        self.prev_stats = prev_stats
+        self.stats = None
+        self.pair_stats = None
+        self.stop_reason = None
+        self.completed = start_index
+        # Сколько экспериментов взято из кэша результатов (data/cache.py)
+        self.cached_count = 0
+        # Контрольная точка в базе (data/checkpoints.py): id строки и период записи, с
+        self.checkpoint_id = checkpoint_id
+        self.checkpoint_interval = checkpoint_interval
+        # Потери по каждому эксперименту {стратегия: [порции]} для истории (data/losses.py).
+        # Собираются, только если покрывают прогон с начала: после паузы порции передаются
+        # новому потоку через prev_losses, а после перезапуска программы их уже нет.
+        self.keep_losses = keep_losses
+        self.losses = prev_losses if start_index else None
 
     def run(self):
         try:
@@ -29,47 +47,160 @@ class WorkerThread(QThread):
             if project_root not in sys.path:
                 sys.path.insert(0, project_root)
             
-            import sugar_core
-            generator = sugar_core.MatrixGenerator(self.params)
+            # sugar_core, а если он не собран или не загружается — NumPy/SciPy (engine/backend.py)
+            from engine.backend import load_backend
+            from engine import stopping
+            from data import cache, checkpoints
+            self.backend, core = load_backend(self.backend)
+            if self.checkpoint_interval is None:
+                self.checkpoint_interval = checkpoints.interval()
             
+            # Эксперимент k однозначно задается парой (seed, k), поэтому после паузы
+            # расчет продолжается с того же seed без повторов и пропусков.
+            if self.seed is None:
+                self.seed = core.MatrixGenerator(self.params).seed
+            run_params = dict(self.params, seed=self.seed)
             T = self.params['T']
-            v_val = self.params.get('v', 0)
             
-            for i in range(self.start_index, T):
-                if self.isInterruptionRequested():
-                    self.paused_state_saved.emit(i, self.strategies)
-                    return 
-                
-                S_matrix = generator.generate()
-                S_opt = sugar_core.solve_exact(S_matrix)
-                
-                if S_opt <= 1e-9: 
-                    if i % max(1, T // 100) == 0:
-                        self.progress_updated.emit(i + 1)
-                    continue
-                
-                self.strategies['greedy'].append((S_opt - sugar_core.run_greedy(S_matrix)) / S_opt * 100.0)
-                self.strategies['thrifty'].append((S_opt - sugar_core.run_thrifty(S_matrix)) / S_opt * 100.0)
-                self.strategies['median'].append((S_opt - sugar_core.run_median(S_matrix)) / S_opt * 100.0)
-                self.strategies['greedy_thrifty'].append((S_opt - sugar_core.run_greedy_thrifty(S_matrix, v_val)) / S_opt * 100.0)
-                self.strategies['thrifty_greedy'].append((S_opt - sugar_core.run_thrifty_greedy(S_matrix, v_val)) / S_opt * 100.0)
-                
-                if i % max(1, T // 100) == 0:
-                    self.progress_updated.emit(i + 1)
+            # Через state: сохраненные статистики могли прийти из другого модуля
+            strategies = ('greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy')
+            pairs = [(a, b) for i, a in enumerate(strategies) for b in strategies[i + 1:]]
+            prev = self.prev_stats or {}
+            restore = lambda key: core.RunningStats.from_state(prev[key].state) if key in prev else core.RunningStats()
+            self.stats = {name: restore(name) for name in strategies}
+            self.pair_stats = {pair: restore(pair) for pair in pairs}
+            
+            if self.keep_losses and self.start_index == 0:
+                self.losses = {name: [] for name in strategies}
+            collect = self.keep_losses and self.losses is not None
+            
+            # Тот же прогон (или его начало) уже считался: берем готовый префикс из кэша (data/cache.py).
+            # Кэш хранит только накопители, поэтому при сборе потерь по экспериментам он не используется.
+            if self.start_index == 0 and not prev and not collect:
+                cached = cache.lookup(self.params, self.seed, T, core)
+                if cached:
+                    self.stats, self.pair_stats = cached['stats'], cached['pair_stats']
+                    self.start_index = self.completed = self.cached_count = cached['count']
+                    self.progress_updated.emit(self.start_index)
+                    self.stop_reason = stopping.stop_reason(self.params, self.stats, self.pair_stats)
             
-            if self.isInterruptionRequested():
-                self.paused_state_saved.emit(T, self.strategies)
+            chunk = max(1, T // 100)
+            if stopping.stop_rule(self.params) != 'fixed':
+                chunk = min(chunk, stopping.CHECK_INTERVAL)
+            
+            # Весь цикл (генерация, точное решение, эвристики) выполняется в модуле порциями.
+            # Порции считаются параллельно в пуле потоков (C++ отпускает GIL), а результаты
+            # принимаются строго по порядку: прогресс монотонен, а пауза сохраняет непрерывный префикс.
+            # В адаптивных режимах (engine/stopping.py) после каждой порции проверяется, не пора ли
+            # остановиться; еще не начатые порции тогда отменяются.
+            starts = iter(range(self.start_index, T, chunk) if self.stop_reason is None else ())
+            pending = deque()
+            next_index = self.start_index
+            last_checkpoint = time.monotonic()
+            with ThreadPoolExecutor(max_workers=self.workers) as pool:
+                while True:
+                    while len(pending) < 2 * self.workers and not self.isInterruptionRequested():
+                        start = next(starts, None)
+                        if start is None:
+                            break
+                        count = min(chunk, T - start)
+                        pending.append((count, pool.submit(core.run_experiments, run_params, count, 1, start, collect)))
+                    if not pending:
+                        break
+                    
+                    count, future = pending.popleft()
+                    batch = future.result()
+                    for name, stats in batch['stats'].items():
+                        self.stats[name].merge(stats)
+                    for pair, stats in batch['pair_stats'].items():
+                        self.pair_stats[pair].merge(stats)
+                    if collect:
+                        for name in strategies:
+                            self.losses[name].append(np.asarray(batch['losses'][name], dtype=np.float32))
+                    next_index += count
+                    self.completed = next_index
+                    self.progress_updated.emit(next_index)
+                    
+                    # Запись раз в checkpoint_interval секунд: накладные расходы не зависят от T и размера порции
+                    if self.checkpoint_interval and time.monotonic() - last_checkpoint >= self.checkpoint_interval:
+                        self.save_checkpoint(checkpoints, next_index)
+                        last_checkpoint = time.monotonic()
+                    
+                    self.stop_reason = stopping.stop_reason(self.params, self.stats, self.pair_stats)
+                    if self.stop_reason and next_index < T:
+                        for _, queued in pending:
+                            queued.cancel()
+                        break
+            
+            if next_index > self.start_index:
+                cache.store(self.params, self.seed, next_index, self.stats, self.pair_stats)
+
+            if self.stop_reason is None and self.isInterruptionRequested():
+                self.save_checkpoint(checkpoints, next_index)
+                self.paused_state_saved.emit(next_index, {**self.stats, **self.pair_stats})
                 return
+            # Прогон завершен (или упадет ниже на проверке) — продолжать больше нечего
+            checkpoints.delete(self.checkpoint_id)
+            self.checkpoint_id = None
 
-            self.progress_updated.emit(T)
+            if self.stop_reason and next_index < T:
+                self.stopped_early.emit(stopping.describe(self.stop_reason, self.params, next_index, T))
+            else:
+                self.stop_reason = None
+                self.progress_updated.emit(T)
 
-            if not self.strategies['greedy']:
+            if self.stats['greedy'].count == 0:
                 raise Exception("Все эксперименты выдали 0 сахара или были пропущены.")
 
-            avg_losses = {name: np.mean(vals) for name, vals in self.strategies.items()}
-            self.result_ready.emit(avg_losses)
+            avg_losses = {name: stats.mean for name, stats in self.stats.items()}
+            std_errors = {name: stats.sem for name, stats in self.stats.items()}
+            self.result_ready.emit(avg_losses, std_errors)
+
+        except ImportError as e:
+            self.error_occurred.emit(f"Ошибка импорта вычислительного модуля: {str(e)}")
+        except Exception as e:
+            self.error_occurred.emit(f"Ошибка вычислений: {str(e)}")
+
+    def collected_losses(self):
+        """Потери по всем выполненным экспериментам {стратегия: float32-массив} или None, если не собирались."""
+        if not self.keep_losses or self.losses is None:
+            return None
+        return {name: np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
+                for name, chunks in self.losses.items()}
+
+    def save_checkpoint(self, checkpoints, next_index):
+        self.checkpoint_id = checkpoints.save(self.checkpoint_id, self.params, self.seed, next_index,
+                                              self.stats, self.pair_stats)
+
+
+class SweepThread(QThread):
+    """Серия экспериментов по сетке параметров (engine/sweep.py)."""
+    progress_updated = pyqtSignal(int, int)
+    sweep_finished = pyqtSignal(list)
+    error_occurred = pyqtSignal(str)
+
+    def __init__(self, base, axes, workers=None, backend=None):
+        super().__init__()
+        self.base = base
+        self.axes = axes
+        self.workers = workers
+        self.backend = backend
+
+    def run(self):
+        try:
+            current_dir = os.path.dirname(os.path.abspath(__file__))
+            project_root = os.path.dirname(os.path.dirname(current_dir))
+            if project_root not in sys.path:
+                sys.path.insert(0, project_root)
+
+            from engine.sweep import run_sweep
+            # Уже запущенные точки досчитываются, новые после отмены не начинаются
+            results = run_sweep(self.base, self.axes, workers=self.workers, backend=self.backend,
+                                progress=lambda done, total, _: self.progress_updated.emit(done, total),
+                                cancelled=self.isInterruptionRequested)
+            self.sweep_finished.emit(results)
 
         except ImportError as e:
-            self.error_occurred.emit(f"Ошибка импорта C++ модуля: {str(e)}")
+            self.error_occurred.emit(f"Ошибка импорта вычислительного модуля: {str(e)}")
         except Exception as e:
-            self.error_occurred.emit(f"Ошибка вычислений: {str(e)}")
\ No newline at end of file
+            self.error_occurred.emit(f"Ошибка вычислений: {str(e)}")
@@ -8,20 +8,28 @@ inc_dir = os.path.join('core', 'include')
 
 # Флаги компиляции
 extra_compile_args = []
+extra_link_args = []
 if sys.platform == 'win32':
     extra_compile_args = ['/O2']
 else:
-    extra_compile_args = ['-O3']
+    extra_compile_args = ['-O3', '-pthread']
+    extra_link_args = ['-pthread']
 
 sources = [
     os.path.join(src_dir, 'sugar_core.cpp'),
     os.path.join(src_dir, 'matrixGenerator.cpp'),
     os.path.join(src_dir, 'hungarian.cpp'),
+    os.path.join(src_dir, 'lapjv.cpp'),
     os.path.join(src_dir, 'greedy.cpp'),
     os.path.join(src_dir, 'thrifty.cpp'),
     os.path.join(src_dir, 'median.cpp'),
     os.path.join(src_dir, 'greedyThrifty.cpp'),
     os.path.join(src_dir, 'thriftyGreedy.cpp'),
+    os.path.join(src_dir, 'allHeuristics.cpp'),
+    os.path.join(src_dir, 'experiments.cpp'),
+    os.path.join(src_dir, 'inputPolicy.cpp'),
+    os.path.join(src_dir, 'runningStats.cpp'),
+    os.path.join(src_dir, 'sobol.cpp'),
 ]
 
 ext_modules = [
@@ -35,6 +43,7 @@ ext_modules = [
         ],
         language='c++',
         extra_compile_args=extra_compile_args,
+        extra_link_args=extra_link_args,
     ),
 ]
 
@@ -0,0 +1,53 @@
+import sys
+import os
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data.database as db
+
+
+# Параметры прогона по умолчанию для make_params. Модуль уточняет их меткой
+#     pytestmark = pytest.mark.params(n=12, seed=17)
+# а отдельный вызов — аргументами: make_params(T=500).
+DEFAULT_PARAMS = {
+    'n': 8, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+    'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'uniform',
+    'use_ripening': False, 'v': 0, 'beta_max': 1.0,
+    'use_inorganic': False
+}
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "params(**values): умолчания make_params для модуля или теста")
+
+
+@pytest.fixture
+def make_params(request):
+    """Фабрика параметров: DEFAULT_PARAMS, метка params и аргументы вызова (в порядке приоритета)."""
+    base = dict(DEFAULT_PARAMS)
+    for marker in reversed(list(request.node.iter_markers('params'))):
+        base.update(marker.kwargs)
+
+    def make(**overrides):
+        return dict(base, **overrides)
+    return make
+
+
+@pytest.fixture
+def db_path(tmp_path, monkeypatch):
+    """Путь к пустой базе истории во временном каталоге (init_db не вызывается)."""
+    path = str(tmp_path / 'history.db')
+    monkeypatch.setattr(db, 'DB_PATH', path)
+    return path
+
+
+@pytest.fixture
+def temp_db(db_path):
+    """Временная база истории с готовой схемой."""
+    db.init_db()
+    return db_path
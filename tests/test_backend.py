@@ -0,0 +1,125 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+from engine import backend
+from engine import numpy_backend as nb
+
+pytestmark = pytest.mark.params(n=12, dist_type='concentrated', use_ripening=True, v=4, beta_max=1.07,
+                                use_inorganic=True, seed=17)
+
+
+# --- 1. ГЕНЕРАТОР NUMPY ПОВТОРЯЕТ SUGAR_CORE ---
+
+def test_philox_known_answer():
+    """1. Philox4x32-10 на NumPy проходит контрольный вектор Random123 (нулевые счетчик и ключ)."""
+    words = nb.philox_blocks(np.zeros(1, dtype=np.uint64), np.zeros(1, dtype=np.uint64), 0)
+    assert [int(w[0]) for w in words] == [0x6627E8D5, 0xE169C58D, 0xBC57AC4C, 0x9B00DBD8]
+
+def test_numpy_generator_matches_native(make_params):
+    """2. При том же seed матрицы совпадают побитово для всех режимов генерации."""
+    for overrides in ({}, {'dist_type': 'uniform', 'use_ripening': False},
+                      {'dtype': 'float32'}, {'use_inorganic': False, 'n': 1},
+                      {'sampler': 'antithetic'}, {'sampler': 'sobol'}, {'sampler': 'sobol', 'n': 70}):
+        params = make_params(**overrides)
+        native = sugar_core.MatrixGenerator(params)
+        fallback = nb.MatrixGenerator(params)
+        assert np.array_equal(native.generate_batch(7), fallback.generate_batch(7))
+        assert np.array_equal(native.generate_at(1000), fallback.generate_at(1000))
+        assert native.spawn(5).seed == fallback.spawn(5).seed
+
+def test_numpy_generator_layout(make_params):
+    """3. layout='F' дает матрицы Fortran-порядка, как в sugar_core."""
+    gen = nb.MatrixGenerator(make_params(layout='F'))
+    assert gen.generate().flags['F_CONTIGUOUS']
+    assert gen.generate_batch(2)[1].flags['F_CONTIGUOUS']
+    assert gen.next_index == 3
+
+
+# --- 2. ЯДРА NUMPY ---
+
+def test_numpy_heuristics_match_native_with_ties():
+    """1. Векторные эвристики совпадают с C++, включая разрешение равенств."""
+    rng = np.random.default_rng(8)
+    for n in (1, 2, 6, 17):
+        batch = rng.integers(-2, 3, size=(5, n, n)).astype(float)
+        v = int(rng.integers(0, n + 1))
+        assert np.array_equal(nb.run_all_heuristics(batch, v), sugar_core.run_all_heuristics(batch, v))
+        for name in ('run_greedy', 'run_thrifty', 'run_median'):
+            assert np.array_equal(getattr(nb, name)(batch), getattr(sugar_core, name)(batch))
+        assert nb.run_greedy_thrifty(batch[0], v) == sugar_core.run_greedy_thrifty(batch[0], v)
+
+def test_numpy_exact_matches_native(make_params):
+    """2. linear_sum_assignment дает тот же оптимум."""
+    batch = sugar_core.MatrixGenerator(make_params(n=20)).generate_batch(5)
+    assert np.allclose(nb.solve_exact(batch), sugar_core.solve_exact(batch), rtol=1e-12)
+    assert isinstance(nb.solve_exact(batch[0]), float)
+    with pytest.raises(ValueError):
+        nb.solve_exact(batch[0], engine='simplex')
+
+def test_numpy_run_experiments_matches_native(make_params):
+    """3. run_experiments: та же структура и те же потери с точностью до округления."""
+    params = make_params()
+    native = sugar_core.run_experiments(params, 300, start=40)
+    fallback = nb.run_experiments(params, 300, start=40)
+    assert fallback['count'] == 300 and fallback['seed'] == native['seed']
+    assert fallback['skipped'] == native['skipped']
+    for name, losses in native['losses'].items():
+        assert np.allclose(fallback['losses'][name], losses, rtol=0, atol=1e-9)
+        assert fallback['stats'][name].count == native['stats'][name].count
+        assert np.isclose(fallback['stats'][name].sem, native['stats'][name].sem, rtol=1e-9)
+    for pair, diff in native['pair_stats'].items():
+        assert np.isclose(fallback['pair_stats'][pair].mean, diff.mean, rtol=0, atol=1e-9)
+
+def test_numpy_running_stats_interchangeable():
+    """4. RunningStats на NumPy совпадает с C++ и обменивается с ним состоянием."""
+    values = np.random.default_rng(5).normal(1.0, 3.0, 999)
+    native, rest, fallback = sugar_core.RunningStats(), sugar_core.RunningStats(), nb.RunningStats()
+    native.add_array(values[:400])
+    rest.add_array(values[400:])
+    native.merge(rest)
+    fallback.add_array(values[:600])
+    for x in values[600:]:
+        fallback.add(x)
+    assert fallback.count == native.count and (fallback.min, fallback.max) == (native.min, native.max)
+    assert np.allclose(fallback.state[1:3], native.state[1:3], rtol=1e-12)
+    assert sugar_core.RunningStats.from_state(fallback.state).count == 999
+    import pickle
+    assert pickle.loads(pickle.dumps(fallback)).state == fallback.state
+
+
+# --- 3. ВЫБОР МОДУЛЯ ---
+
+def test_load_backend_auto_prefers_native(monkeypatch):
+    """1. По умолчанию выбирается sugar_core."""
+    monkeypatch.delenv(backend.ENV_VAR, raising=False)
+    name, module = backend.load_backend()
+    assert name == 'native' and module is sugar_core
+
+def test_load_backend_explicit_and_env(monkeypatch):
+    """2. Модуль задается аргументом или переменной окружения; неизвестное имя — ValueError."""
+    assert backend.load_backend('numpy')[1] is nb
+    monkeypatch.setenv(backend.ENV_VAR, 'numpy')
+    assert backend.load_backend()[0] == 'numpy'
+    with pytest.raises(ValueError):
+        backend.load_backend('gpu')
+
+def test_load_backend_falls_back(monkeypatch):
+    """3. Если sugar_core не загружается, автоматически берется NumPy."""
+    monkeypatch.delenv(backend.ENV_VAR, raising=False)
+    monkeypatch.setitem(backend._loaded, 'native', (None, "ImportError: undefined symbol"))
+    assert backend.load_backend() == ('numpy', nb)
+    with pytest.raises(ImportError, match="undefined symbol"):
+        backend.load_backend('native')
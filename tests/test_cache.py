@@ -0,0 +1,83 @@
+import sys
+import os
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+from data import cache
+from engine import numpy_backend as nb
+
+pytestmark = pytest.mark.params(T=1000)
+
+
+def run(params, T, seed, start=0):
+    return sugar_core.run_experiments(dict(params, seed=seed), T, start=start, keep_losses=False)
+
+
+# --- 1. КЛЮЧ КЭША ---
+
+def test_key_normalization(make_params):
+    """1. Формат чисел, T, правило остановки и неиспользуемый beta_max на ключ не влияют."""
+    key = cache.cache_key(make_params(), 5)
+    assert cache.cache_key(make_params(alpha_min=0.12000000000001, n=8.0, T=5000), 5) == key
+    assert cache.cache_key(make_params(beta_max=1.3, stop_rule='ranking', layout='F'), 5) == key
+    assert cache.cache_key(make_params(sampler='mc', dtype='float64'), 5) == key
+    # v задает переключение комбинированных стратегий и без дозаривания
+    for other in (make_params(v=3), make_params(n=9), make_params(sampler='sobol')):
+        assert cache.cache_key(other, 5) != key
+    assert cache.cache_key(make_params(), 6) != key
+    assert (cache.cache_key(make_params(use_ripening=True, v=2, beta_max=1.05), 5) !=
+            cache.cache_key(make_params(use_ripening=True, v=2, beta_max=1.07), 5))
+
+
+# --- 2. ПОИСК И ПРОДОЛЖЕНИЕ ---
+
+def test_exact_hit(temp_db, make_params):
+    """1. Сохраненный прогон возвращается целиком; без seed кэш не используется."""
+    params = make_params()
+    res = run(params, 1000, 11)
+    cache.store(params, 11, 1000, res['stats'], res['pair_stats'])
+    hit = cache.lookup(params, 11, 1000, sugar_core)
+    assert hit['count'] == 1000
+    assert hit['stats']['median'].state == res['stats']['median'].state
+    assert hit['pair_stats']['greedy', 'median'].state == res['pair_stats']['greedy', 'median'].state
+    assert cache.lookup(params, None, 1000, sugar_core) is None
+    assert cache.lookup(params, 12, 1000, sugar_core) is None
+
+def test_extend_longer_run(temp_db, make_params):
+    """2. Для T=5000 берется префикс 1000 из кэша, досчитанное совпадает с прогоном с нуля."""
+    params = make_params()
+    first = run(params, 1000, 11)
+    cache.store(params, 11, 1000, first['stats'], first['pair_stats'])
+
+    hit = cache.lookup(make_params(T=5000), 11, 5000, nb)
+    assert hit['count'] == 1000 and isinstance(hit['stats']['greedy'], nb.RunningStats)
+    rest = run(params, 4000, 11, start=1000)
+    for name, s in rest['stats'].items():
+        hit['stats'][name].merge(nb.RunningStats.from_state(s.state))
+    full = run(params, 5000, 11)
+    for name, s in full['stats'].items():
+        assert hit['stats'][name].count == s.count
+        assert hit['stats'][name].mean == pytest.approx(s.mean, rel=1e-12)
+        assert hit['stats'][name].variance == pytest.approx(s.variance, rel=1e-9)
+
+def test_longer_prefix_not_used_for_shorter_run(temp_db, make_params):
+    """3. Из нескольких префиксов берется самый длинный, не превышающий T."""
+    params = make_params()
+    for T in (500, 2000):
+        res = run(params, T, 3)
+        cache.store(params, 3, T, res['stats'], res['pair_stats'])
+    assert cache.lookup(params, 3, 1000, sugar_core)['count'] == 500
+    assert cache.lookup(params, 3, 2500, sugar_core)['count'] == 2000
+    assert cache.lookup(params, 3, 100, sugar_core) is None
+    cache.clear()
+    assert cache.lookup(params, 3, 2500, sugar_core) is None
@@ -0,0 +1,66 @@
+import sys
+import os
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+from data import checkpoints
+from engine import numpy_backend as nb
+
+pytestmark = pytest.mark.params(n=7, T=3000)
+
+
+def test_save_update_and_resume(temp_db, make_params):
+    """1. Точка обновляется на месте, а продолжение с нее дает то же, что прогон без перерыва."""
+    params = make_params()
+    first = sugar_core.run_experiments(dict(params, seed=4), 500, keep_losses=False)
+    cp_id = checkpoints.save(None, params, 4, 500, first['stats'], first['pair_stats'])
+    more = sugar_core.run_experiments(dict(params, seed=4), 700, start=500, keep_losses=False)
+    for name, s in more['stats'].items():
+        first['stats'][name].merge(s)
+    for pair, s in more['pair_stats'].items():
+        first['pair_stats'][pair].merge(s)
+    assert checkpoints.save(cp_id, params, 4, 1200, first['stats'], first['pair_stats']) == cp_id
+
+    saved = checkpoints.get_all(nb)
+    assert len(saved) == 1
+    cp = saved[0]
+    assert (cp['id'], cp['params'], cp['seed'], cp['next_index']) == (cp_id, params, 4, 1200)
+    rest = sugar_core.run_experiments(dict(params, seed=cp['seed']), 3000 - cp['next_index'],
+                                      start=cp['next_index'], keep_losses=False)
+    full = sugar_core.run_experiments(dict(params, seed=4), 3000, keep_losses=False)
+    for name, s in rest['stats'].items():
+        cp['stats'][name].merge(nb.RunningStats.from_state(s.state))
+        assert cp['stats'][name].mean == pytest.approx(full['stats'][name].mean, rel=1e-12)
+    assert cp['pair_stats']['greedy', 'median'].count == 1200
+
+def test_delete_and_order(temp_db, make_params):
+    """2. Точки перечисляются от новых к старым и удаляются по одной или все сразу."""
+    params = make_params()
+    empty = sugar_core.run_experiments(dict(params, seed=1), 0, keep_losses=False)
+    ids = [checkpoints.save(None, dict(params, n=n), n, 0, empty['stats'], empty['pair_stats']) for n in (3, 4, 5)]
+    assert [cp['id'] for cp in checkpoints.get_all(sugar_core)] == ids[::-1]
+    checkpoints.delete(ids[1])
+    checkpoints.delete(None)
+    assert [cp['params']['n'] for cp in checkpoints.get_all(sugar_core)] == [5, 3]
+    checkpoints.delete_all()
+    assert checkpoints.get_all(sugar_core) == []
+
+def test_interval_from_environment(monkeypatch):
+    """3. Интервал берется из SUGAR_CHECKPOINT_INTERVAL, по умолчанию DEFAULT_INTERVAL."""
+    monkeypatch.delenv(checkpoints.ENV_VAR, raising=False)
+    assert checkpoints.interval() == checkpoints.DEFAULT_INTERVAL
+    monkeypatch.setenv(checkpoints.ENV_VAR, '2.5')
+    assert checkpoints.interval() == 2.5
+    monkeypatch.setenv(checkpoints.ENV_VAR, 'часто')
+    with pytest.raises(ValueError):
+        checkpoints.interval()
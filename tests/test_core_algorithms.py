@@ -146,6 +146,64 @@ def test_exact_rectish_logic():
     ])
     assert sugar_core.solve_exact(mat) == pytest.approx(300.0)
 
+def test_solver_assignment_and_duals():
+    """7. HungarianSolver: назначение - перестановка с оптимальной суммой, потенциалы допустимы."""
+    rng = np.random.default_rng(3)
+    solver = sugar_core.HungarianSolver()
+    for n in (1, 4, 25, 60):
+        mat = rng.random((n, n))
+        total = solver.solve(mat)
+        assign = solver.assignment
+        assert sorted(assign) == list(range(n))
+        assert mat[np.arange(n), assign].sum() == pytest.approx(total)
+        r, c = solver.row_potentials, solver.col_potentials
+        assert np.all(r[:, None] + c[None, :] >= mat - 1e-9)
+        assert r.sum() + c.sum() == pytest.approx(total)
+
+def test_solver_reuse_matches_solve_exact():
+    """8. Переиспользование решателя для разных n и порядка хранения дает тот же результат."""
+    rng = np.random.default_rng(4)
+    solver = sugar_core.HungarianSolver()
+    for n in (30, 5, 30, 12):
+        mat = rng.random((n, n))
+        assert solver.solve(mat) == sugar_core.solve_exact(mat)
+        assert solver.solve(np.asfortranarray(mat)) == sugar_core.solve_exact(mat)
+
+
+# --- 2.1. ТЕСТЫ ДВИЖКА LAPJV ---
+
+def test_lapjv_simple_cases():
+    """1. LAPJV на простых матрицах."""
+    assert sugar_core.solve_exact(get_counter_greedy_matrix(), engine='lapjv') == pytest.approx(105.0)
+    assert sugar_core.solve_exact(np.eye(5), engine='lapjv') == pytest.approx(5.0)
+    assert sugar_core.solve_exact(np.zeros((4, 4)), engine='lapjv') == pytest.approx(0.0)
+    assert sugar_core.solve_exact(np.array([[7.0]]), engine='lapjv') == pytest.approx(7.0)
+
+def test_lapjv_matches_hungarian_on_generator():
+    """2. LAPJV совпадает с венгерским алгоритмом до 1e-9 на матрицах генератора."""
+    for n, dist, rip, chem in [(15, 'uniform', False, False), (40, 'concentrated', True, True), (120, 'uniform', True, False)]:
+        params = {
+            'n': n, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+            'beta1': 0.86, 'beta2': 0.99, 'dist_type': dist,
+            'use_ripening': rip, 'v': 5, 'beta_max': 1.07, 'use_inorganic': chem, 'seed': n
+        }
+        gen = sugar_core.MatrixGenerator(params)
+        for _ in range(20):
+            mat = gen.generate()
+            assert abs(sugar_core.solve_exact(mat, engine='lapjv') - sugar_core.solve_exact(mat)) <= 1e-9
+
+def test_lapjv_ties():
+    """3. LAPJV на матрицах с большим числом равных элементов."""
+    rng = np.random.default_rng(2)
+    for _ in range(50):
+        mat = rng.integers(0, 3, size=(12, 12)).astype(float)
+        assert abs(sugar_core.solve_exact(mat, engine='lapjv') - sugar_core.solve_exact(mat)) <= 1e-9
+
+def test_exact_unknown_engine():
+    """4. Неизвестный движок - ValueError."""
+    with pytest.raises(ValueError):
+        sugar_core.solve_exact(np.eye(3), engine='simplex')
+
 
 # --- 3. ТЕСТЫ ЖАДНОГО АЛГОРИТМА (GREEDY) ---
 
@@ -386,4 +444,129 @@ def test_tg_v_large():
 
 def test_tg_zeros():
     """6. Нули для смешанного алгоритма."""
-    assert sugar_core.run_thrifty_greedy(np.zeros((4,4)), 2) == 0.0
\ No newline at end of file
+    assert sugar_core.run_thrifty_greedy(np.zeros((4,4)), 2) == 0.0
+
+# --- 7. ТЕСТЫ ОБЪЕДИНЕННОГО ПРОХОДА (RUN_ALL_HEURISTICS) ---
+
+def individual_totals(mat, v):
+    return [sugar_core.run_greedy(mat), sugar_core.run_thrifty(mat), sugar_core.run_median(mat),
+            sugar_core.run_greedy_thrifty(mat, v), sugar_core.run_thrifty_greedy(mat, v)]
+
+def test_all_heuristics_counter_greedy():
+    """1. Контр-пример для жадного алгоритма."""
+    mat = get_counter_greedy_matrix()
+    res = sugar_core.run_all_heuristics(mat, 1)
+    assert res.shape == (5,)
+    assert list(res) == individual_totals(mat, 1)
+
+def test_all_heuristics_random_exact():
+    """2. Побитовое совпадение с отдельными функциями на случайных матрицах."""
+    rng = np.random.default_rng(0)
+    for n in (1, 2, 7, 31):
+        for v in (0, 1, n // 2, n + 3):
+            mat = rng.random((n, n))
+            assert list(sugar_core.run_all_heuristics(mat, v)) == individual_totals(mat, v)
+
+def test_all_heuristics_ties():
+    """3. Равенства разрешаются так же, как в отдельных функциях."""
+    rng = np.random.default_rng(1)
+    for _ in range(20):
+        mat = rng.integers(0, 3, size=(9, 9)).astype(float)
+        assert list(sugar_core.run_all_heuristics(mat, 4)) == individual_totals(mat, 4)
+
+def test_all_heuristics_generator_output():
+    """4. Совпадение на матрицах генератора."""
+    params = {
+        'n': 20, 'T': 1, 'alpha_min': 0.12, 'alpha_max': 0.22,
+        'beta1': 0.86, 'beta2': 0.99, 'dist_type': 'concentrated',
+        'use_ripening': True, 'v': 5, 'beta_max': 1.07, 'use_inorganic': True, 'seed': 1
+    }
+    gen = sugar_core.MatrixGenerator(params)
+    for _ in range(10):
+        mat = gen.generate()
+        assert list(sugar_core.run_all_heuristics(mat, 5)) == individual_totals(mat, 5)
+
+
+# --- 8. ТЕСТЫ СПИСКОВ СВОБОДНЫХ СТРОК (РАЗРЕШЕНИЕ РАВЕНСТВ) ---
+
+def reference_totals(mat, v):
+    """Прямой перебор всех строк в каждом столбце, как в исходных ядрах."""
+    n = mat.shape[0]
+    totals = []
+    for rule in (lambda j: True, lambda j: False, None, lambda j: j < v, lambda j: j >= v):
+        available = [True] * n
+        total = 0.0
+        for j in range(n):
+            rows = [i for i in range(n) if available[i]]
+            if rule is None:
+                cand = sorted((mat[i, j], i) for i in rows)
+                val, best = cand[len(cand) // 2]
+            else:
+                take_max = rule(j)
+                best, val = -1, (-1.0 if take_max else np.finfo(float).max)
+                for i in rows:
+                    if (mat[i, j] > val) if take_max else (mat[i, j] < val):
+                        best, val = i, mat[i, j]
+            if best != -1:
+                total += val
+                available[best] = False
+        totals.append(total)
+    return totals
+
+def test_first_row_wins_on_ties():
+    """1. При равенстве выбирается строка с меньшим индексом."""
+    mat = np.array([[5.0, 0.0],
+                    [5.0, 10.0]])
+    assert sugar_core.run_greedy(mat) == pytest.approx(15.0)
+    mat = np.array([[1.0, 10.0],
+                    [1.0, 0.0]])
+    assert sugar_core.run_thrifty(mat) == pytest.approx(1.0)
+
+def test_kernels_match_full_scan_reference():
+    """2. Итоги совпадают с полным перебором, включая равенства и отрицательные значения."""
+    rng = np.random.default_rng(5)
+    for n in (1, 2, 5, 12, 40):
+        for low, high in ((0, 3), (-2, 2)):
+            mat = rng.integers(low, high, size=(n, n)).astype(float)
+            v = int(rng.integers(0, n + 1))
+            assert individual_totals(mat, v) == pytest.approx(reference_totals(mat, v))
+
+
+# --- 9. КОНТРАКТ ВХОДА: ЧТЕНИЕ НА МЕСТЕ, СТРОГИЙ РЕЖИМ, СЧЕТЧИК ПРЕОБРАЗОВАНИЙ ---
+
+def test_slices_read_in_place():
+    """1. Срезы float64/float32 читаются без преобразования."""
+    big = np.random.default_rng(3).random((12, 12))
+    view = big[::2, 1::2]
+    sugar_core.reset_input_conversions()
+    assert sugar_core.run_greedy(view) == sugar_core.run_greedy(view.copy())
+    assert sugar_core.run_all_heuristics(view.astype(np.float32), 2).shape == (5,)
+    assert sugar_core.solve_exact(view) == pytest.approx(sugar_core.solve_exact(view.copy()))
+    assert sugar_core.input_conversions() == 0
+
+def test_implicit_conversions_counted():
+    """2. Списки, целые и чужой порядок байт приводятся к float64 и учитываются."""
+    sugar_core.reset_input_conversions()
+    assert sugar_core.run_greedy([[1, 2], [3, 4]]) == pytest.approx(5.0)
+    assert sugar_core.run_median(np.eye(3, dtype=int)) == pytest.approx(1.0)
+    mat = np.random.default_rng(4).random((5, 5))
+    assert sugar_core.solve_exact(mat.astype('>f8')) == sugar_core.solve_exact(mat)
+    assert sugar_core.input_conversions() == 3
+
+def test_strict_inputs_reject_conversions():
+    """3. В строгом режиме вход, требующий копии, отклоняется с TypeError."""
+    sugar_core.set_strict_inputs(True)
+    try:
+        assert sugar_core.strict_inputs()
+        for bad in ([[1.0, 2.0], [3.0, 4.0]], np.eye(3, dtype=int), np.eye(3).astype('>f8')):
+            with pytest.raises(TypeError):
+                sugar_core.run_all_heuristics(bad, 1)
+        assert sugar_core.run_thrifty(np.eye(3)[:, ::-1]) == pytest.approx(0.0)
+    finally:
+        sugar_core.set_strict_inputs(False)
+
+def test_non_square_rejected():
+    """4. Неквадратная или не двумерная матрица - ValueError."""
+    for bad in (np.ones((2, 3)), np.ones(3)):
+        with pytest.raises(ValueError):
+            sugar_core.run_greedy(bad)
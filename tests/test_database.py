@@ -0,0 +1,222 @@
+import sys
+import os
+import sqlite3
+import json
+import threading
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data.database as db
+
+
+def test_record_roundtrip_with_seed(db_path):
+    """1. Запись сохраняет параметры, результаты и seed."""
+    db.init_db()
+    db.add_record({'n': 5, 'T': 10}, {'greedy': 1.5}, seed=2**63 - 1)
+    records = db.get_all_records()
+    assert len(records) == 1
+    assert records[0]['params'] == {'n': 5, 'T': 10}
+    assert records[0]['results'] == {'greedy': 1.5}
+    assert records[0]['seed'] == 2**63 - 1
+
+def test_init_db_migrates_old_table(db_path):
+    """2. Старая таблица без столбца seed дополняется, старые записи читаются."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, results TEXT)')
+    conn.execute("INSERT INTO history (timestamp, params, results) VALUES ('2999-01-01 00:00:00', '{\"n\": 3}', '{}')")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    records = db.get_all_records()
+    assert records[0]['params'] == {'n': 3}
+    assert records[0]['seed'] is None
+
+def test_std_errors_roundtrip_and_migration(db_path):
+    """3. Стандартные ошибки сохраняются; записи без них и старые таблицы дают None."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, results TEXT, seed INTEGER)')
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    db.add_record({'n': 5}, {'greedy': 1.5})
+    db.add_record({'n': 6}, {'greedy': 2.5}, seed=1, std_errors={'greedy': 0.25})
+    records = db.get_all_records()
+    assert records[0]['std_errors'] == {'greedy': 0.25}
+    assert records[1]['std_errors'] is None
+
+def test_add_records_batch(db_path):
+    """4. add_records сохраняет пачку записей одной транзакцией в исходном порядке."""
+    db.init_db()
+    db.add_records([{'params': {'n': i}, 'results': {'greedy': float(i)}, 'seed': 9,
+                     'std_errors': {'greedy': 0.1} if i else None} for i in range(3)])
+    records = db.get_all_records()
+    assert [r['params']['n'] for r in records] == [2, 1, 0]
+    assert records[0]['seed'] == 9 and records[2]['std_errors'] is None
+
+def test_persistent_wal_connection_and_index(db_path):
+    """5. Соединение потока переиспользуется, база в режиме WAL, у времени записи есть индекс."""
+    db.init_db()
+    conn = db.connect()
+    assert db.connect() is conn
+    assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+    indexes = [row[1] for row in conn.execute('PRAGMA index_list(history)')]
+    assert 'idx_history_timestamp' in indexes
+    plan = ' '.join(str(row) for row in conn.execute(
+        "EXPLAIN QUERY PLAN DELETE FROM history WHERE timestamp < '2000-01-01'"))
+    assert 'idx_history_timestamp' in plan
+
+def test_background_writer_from_threads(db_path):
+    """6. Записи из многих потоков не теряются; старые записи удаляются в фоне при init_db."""
+    import threading
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, results TEXT, seed INTEGER, std_errors TEXT)')
+    conn.execute("INSERT INTO history (timestamp, params, results) VALUES ('2000-01-01 00:00:00', '{}', '{}')")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    threads = [threading.Thread(target=lambda k=k: [db.add_record({'k': k}, {}, seed=i) for i in range(50)])
+               for k in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    records = db.get_all_records()
+    assert len(records) == 200
+    assert {(r['params']['k'], r['seed']) for r in records} == {(k, i) for k in range(4) for i in range(50)}
+
+def test_writer_errors_surface_on_flush(db_path):
+    """7. Ошибка фоновой записи не обрывает поток записи и пробрасывается из flush."""
+    db.add_record({'n': 1}, {})          # таблицы еще нет
+    with pytest.raises(sqlite3.OperationalError):
+        db.flush()
+    db.init_db()
+    db.add_record({'n': 2}, {})
+    assert [r['params'] for r in db.get_all_records()] == [{'n': 2}]
+
+def test_json_history_migrates_to_columns(db_path):
+    """8. Старая JSON-история переносится в столбцы с сохранением id; испорченные строки пропускаются."""
+    params = {'T': 100, 'n': 5, 'alpha_min': 0.12, 'beta1': 0.86, 'dist_type': 'uniform',
+              'use_ripening': True, 'v': 2, 'layout': 'grid'}
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, results TEXT, seed INTEGER, std_errors TEXT)')
+    conn.execute("INSERT INTO history VALUES (7, '2999-01-01 00:00:00', ?, ?, 42, ?)",
+                 (json.dumps(params), json.dumps({'greedy': 1.5, 'thrifty': 2.5}), json.dumps({'greedy': 0.1})))
+    conn.execute("INSERT INTO history VALUES (8, '2999-01-01 00:00:00', 'not json', '{}', 1, NULL)")
+    conn.commit()
+    conn.close()
+
+    db.init_db()
+    db.init_db()
+    records = db.get_all_records()
+    assert len(records) == 1
+    assert records[0]['id'] == 7 and records[0]['seed'] == 42
+    assert records[0]['params'] == params
+    assert records[0]['results'] == {'greedy': 1.5, 'thrifty': 2.5}
+    assert records[0]['std_errors'] == {'greedy': 0.1}
+    assert db.connect().execute('SELECT n, use_ripening, extra FROM history').fetchone() == (5, 1, '{"layout": "grid"}')
+
+def test_param_types_roundtrip(db_path):
+    """9. Типы параметров сохраняются: bool остается bool, целое alpha — float, нестандартные значения — в extra."""
+    db.init_db()
+    db.add_record({'n': 5, 'use_ripening': False, 'alpha_min': 0, 'dtype': 'float32', 'beta1': '0.9'}, {'greedy': 1.0})
+    params = db.get_all_records()[0]['params']
+    assert params == {'n': 5, 'use_ripening': False, 'alpha_min': 0.0, 'dtype': 'float32', 'beta1': '0.9'}
+    assert type(params['use_ripening']) is bool and type(params['alpha_min']) is float
+
+def test_aggregate_and_count_in_sql(db_path):
+    """10. Средние потери по группам и число записей считаются в SQL с фильтрами."""
+    db.init_db()
+    db.add_records([{'params': {'n': n, 'beta1': beta1, 'dist_type': 'uniform'},
+                     'results': {'greedy': n + beta1, 'thrifty': 2.0 * n}}
+                    for n in (5, 10) for beta1 in (0.7, 0.9)])
+    rows = db.aggregate_losses('n', 'greedy')
+    assert [(r['n'], r['strategy'], r['count']) for r in rows] == [(5, 'greedy', 2), (10, 'greedy', 2)]
+    assert rows[0]['mean'] == pytest.approx(5.8)
+    assert rows[1]['min'] == pytest.approx(10.7) and rows[1]['max'] == pytest.approx(10.9)
+
+    rows = db.aggregate_losses(('n', 'beta1'), beta1=(0.8, None))
+    assert [(r['n'], r['beta1'], r['strategy']) for r in rows] == [
+        (5, 0.9, 'greedy'), (5, 0.9, 'thrifty'), (10, 0.9, 'greedy'), (10, 0.9, 'thrifty')]
+    assert db.count_records(n=10, beta1=(None, 0.8)) == 1
+    assert db.count_records(n=[5, 10], dist_type='uniform') == 4
+    assert db.count_records(v=None) == 4
+    with pytest.raises(ValueError):
+        db.count_records(params='x')
+
+def test_delete_cascades_to_results(db_path):
+    """11. Удаление записей удаляет и их потери по стратегиям."""
+    db.init_db()
+    db.add_record({'n': 5}, {'greedy': 1.0, 'thrifty': 2.0})
+    db.delete_last_minutes(5)
+    assert db.get_all_records() == []
+    assert db.connect().execute('SELECT COUNT(*) FROM history_results').fetchone()[0] == 0
+
+def test_records_page_keyset(db_path):
+    """12. Страницы истории идут от новых к старым без пропусков и повторов, с фильтрами в SQL."""
+    db.init_db()
+    db.add_records([{'params': {'n': i % 3}, 'results': {'greedy': float(i)}, 'std_errors': {'greedy': 0.5}}
+                    for i in range(10)])
+    pages, before = [], None
+    while True:
+        page = db.get_records_page(before, 4)
+        if not page:
+            break
+        pages.append([r['results']['greedy'] for r in page])
+        before = page[-1]['id']
+    assert pages == [[9.0, 8.0, 7.0, 6.0], [5.0, 4.0, 3.0, 2.0], [1.0, 0.0]]
+    page = db.get_records_page(None, 10, n=0)
+    assert [r['results']['greedy'] for r in page] == [9.0, 6.0, 3.0, 0.0]
+    assert page[0]['std_errors'] == {'greedy': 0.5}
+    assert db.get_records_page(page[1]['id'], 10, n=0) == page[2:]
+
+def test_parse_filters():
+    """13. Строка поиска превращается в фильтры: равенство, варианты через |, диапазоны."""
+    assert db.parse_filters("") == {}
+    assert db.parse_filters("n=15|20 beta1>=0.8 beta1<=0,95 t=1000 use_ripening=да dist_type=uniform") == {
+        'n': [15, 20], 'beta1': (0.8, 0.95), 'T': 1000, 'use_ripening': True, 'dist_type': 'uniform'}
+    for text in ("n", "n=1.5", "foo=1", "beta1>=x", "seed="):
+        with pytest.raises(ValueError):
+            db.parse_filters(text)
+
+def test_json_history_migrates_in_background(db_path):
+    """14. Перенос старой истории идет в фоновом потоке записи: init_db не ждет его, flush дожидается."""
+    conn = sqlite3.connect(db_path)
+    conn.execute('CREATE TABLE history (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, params TEXT, results TEXT)')
+    conn.executemany("INSERT INTO history (timestamp, params, results) VALUES ('2999-01-01 00:00:00', ?, ?)",
+                     [(json.dumps({'n': i}), json.dumps({'greedy': float(i)})) for i in range(50)])
+    conn.commit()
+
+    # Поток записи занят: перенос стоит в очереди, а init_db уже вернулся
+    release = threading.Event()
+    db._writer.submit(lambda _: release.wait(10))
+    db.init_db()
+    assert db.migration_progress() is not None
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == 0
+    assert db.connect().execute('SELECT COUNT(*) FROM checkpoints').fetchone()[0] == 0
+    release.set()
+
+    db.flush()
+    assert db.migration_progress() is None
+    assert conn.execute('PRAGMA user_version').fetchone()[0] == db.SCHEMA_VERSION
+    conn.close()
+    assert db.count_records() == 50
+    assert db.count_records(n=49) == 1
+
+def test_writer_errors_stay_out_of_reads(temp_db):
+    """15. Чтение истории не падает из-за ошибки фоновой записи: она ждет в pending_errors."""
+    db.add_record({'n': 1}, {'greedy': 1.0})
+    db._writer.submit(lambda conn: conn.execute('INSERT INTO missing_table VALUES (1)'))
+    assert db.count_records() == 1
+    assert len(db.get_all_records()) == 1
+    errors = db.pending_errors()
+    assert len(errors) == 1 and isinstance(errors[0], sqlite3.OperationalError)
+    assert db.pending_errors() == []
+    db.flush()
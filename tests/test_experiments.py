@@ -0,0 +1,408 @@
+import sys
+import os
+import threading
+import pytest
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+STRATEGIES = ['greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy']
+
+
+# --- 1. ЦИКЛ ЭКСПЕРИМЕНТОВ В C++ (RUN_EXPERIMENTS) ---
+
+def test_run_experiments_structure(make_params):
+    """1. Для каждой стратегии возвращается массив потерь, счетчики сходятся."""
+    res = sugar_core.run_experiments(make_params(), 20)
+    assert set(res['losses'].keys()) == set(STRATEGIES)
+    assert res['count'] == 20
+    for vals in res['losses'].values():
+        assert isinstance(vals, np.ndarray)
+        assert len(vals) + res['skipped'] == 20
+
+def test_run_experiments_losses_non_negative(make_params):
+    """2. Эвристики не могут превзойти точное решение."""
+    params = make_params(use_ripening=True, v=3, beta_max=1.07, dist_type='concentrated')
+    res = sugar_core.run_experiments(params, 30)
+    for vals in res['losses'].values():
+        assert np.all(vals >= -1e-9)
+        assert np.all(vals <= 100.0 + 1e-9)
+
+def test_run_experiments_skips_zero_optimum(make_params):
+    """3. Эксперименты с нулевым оптимумом пропускаются и учитываются в skipped."""
+    params = make_params(alpha_min=0.0, alpha_max=0.0)
+    res = sugar_core.run_experiments(params, 10)
+    assert res['skipped'] == 10
+    for vals in res['losses'].values():
+        assert len(vals) == 0
+
+def test_run_experiments_zero_count(make_params):
+    """4. T=0 не запускает ни одного эксперимента."""
+    res = sugar_core.run_experiments(make_params(), 0)
+    assert res['skipped'] == 0
+    assert all(len(v) == 0 for v in res['losses'].values())
+
+def test_run_experiments_exact_engine(make_params):
+    """5. Движок точного решения выбирается ключом exact_engine."""
+    hung = sugar_core.run_experiments(make_params(seed=4), 200)
+    lapjv = sugar_core.run_experiments(make_params(seed=4, exact_engine='lapjv'), 200)
+    for name in STRATEGIES:
+        assert np.allclose(hung['losses'][name], lapjv['losses'][name], rtol=0, atol=1e-9)
+    with pytest.raises(ValueError):
+        sugar_core.run_experiments(make_params(exact_engine='nope'), 1)
+
+
+# --- 2. МНОГОПОТОЧНОСТЬ И ВОСПРОИЗВОДИМОСТЬ ---
+
+def test_run_experiments_seed_reproducible(make_params):
+    """1. Одинаковый seed дает одинаковые результаты."""
+    params = make_params(seed=12345)
+    a = sugar_core.run_experiments(params, 50)
+    b = sugar_core.run_experiments(params, 50)
+    for name in STRATEGIES:
+        assert np.array_equal(a['losses'][name], b['losses'][name])
+    assert a['seed'] == 12345
+
+def test_run_experiments_threads_bit_identical(make_params):
+    """2. Результат побитово не зависит от числа потоков."""
+    params = make_params(seed=7, dist_type='concentrated', use_inorganic=True)
+    serial = sugar_core.run_experiments(params, 1000, threads=1)
+    for threads in (2, 3, 8, 0):
+        par = sugar_core.run_experiments(params, 1000, threads=threads)
+        assert par['skipped'] == serial['skipped']
+        for name in STRATEGIES:
+            assert np.array_equal(par['losses'][name], serial['losses'][name])
+
+def test_run_experiments_start_offset(make_params):
+    """3. Прогон по частям (start) совпадает с прогоном целиком."""
+    params = make_params(seed=99)
+    whole = sugar_core.run_experiments(params, 600)
+    first = sugar_core.run_experiments(params, 300, start=0)
+    second = sugar_core.run_experiments(params, 300, threads=2, start=300)
+    for name in STRATEGIES:
+        joined = np.concatenate([first['losses'][name], second['losses'][name]])
+        assert np.array_equal(joined, whole['losses'][name])
+
+def test_generator_seeded_streams(make_params):
+    """4. Генераторы с одним seed выдают одинаковые матрицы, с разными - разные."""
+    gen_a = sugar_core.MatrixGenerator(make_params(seed=5))
+    gen_b = sugar_core.MatrixGenerator(make_params(seed=5))
+    gen_c = sugar_core.MatrixGenerator(make_params(seed=6))
+    for _ in range(3):
+        mat_a = gen_a.generate()
+        assert np.array_equal(mat_a, gen_b.generate())
+        assert not np.array_equal(mat_a, gen_c.generate())
+
+
+# --- 3. ОСВОБОЖДЕНИЕ GIL ---
+
+def test_solve_exact_releases_gil():
+    """1. Пока solve_exact считает в другом потоке, Python-код продолжает выполняться."""
+    mat = np.random.rand(400, 400)
+    solver = threading.Thread(target=sugar_core.solve_exact, args=(mat,))
+    ticks = 0
+    solver.start()
+    while solver.is_alive():
+        ticks += 1
+    solver.join()
+    assert ticks > 100
+
+def test_kernels_from_threads_match_serial():
+    """2. Ядра корректно работают при одновременных вызовах из нескольких потоков."""
+    mats = [np.random.rand(30, 30) for _ in range(8)]
+    expected = [sugar_core.run_median(m) for m in mats]
+    results = [None] * len(mats)
+
+    def work(idx):
+        results[idx] = sugar_core.run_median(mats[idx])
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(len(mats))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert results == expected
+
+
+# --- 4. СЧЕТЧИКОВЫЙ ГЕНЕРАТОР (PHILOX): ПОВТОР, JUMP, SPAWN ---
+
+def test_generate_at_replays_experiment(make_params):
+    """1. generate_at(k) воспроизводит k-ю матрицу прогона, не сдвигая поток."""
+    gen = sugar_core.MatrixGenerator(make_params(seed=42, use_inorganic=True))
+    mats = [gen.generate() for _ in range(5)]
+    replay = sugar_core.MatrixGenerator(make_params(seed=42, use_inorganic=True))
+    assert np.array_equal(replay.generate_at(3), mats[3])
+    assert replay.next_index == 0
+    assert np.array_equal(replay.generate_at(1_000_000_000_000), gen.generate_at(1_000_000_000_000))
+
+def test_generator_jump(make_params):
+    """2. jump(k) пропускает k экспериментов за O(1)."""
+    gen = sugar_core.MatrixGenerator(make_params(seed=3))
+    reference = [gen.generate() for _ in range(10)]
+    jumped = sugar_core.MatrixGenerator(make_params(seed=3))
+    jumped.jump(7)
+    assert jumped.next_index == 7
+    assert np.array_equal(jumped.generate(), reference[7])
+
+def test_generator_spawn_independent(make_params):
+    """3. spawn дает воспроизводимые и отличные от родителя потоки."""
+    gen = sugar_core.MatrixGenerator(make_params(seed=11))
+    child_a, child_b = gen.spawn(0), gen.spawn(1)
+    assert child_a.seed != gen.seed and child_a.seed != child_b.seed
+    assert child_a.seed == gen.spawn(0).seed
+    assert not np.array_equal(child_a.generate_at(0), gen.generate_at(0))
+    # Дочерний seed, как и автоматический, помещается в 63 бита (INTEGER SQLite, поле seed в GUI)
+    assert all(sugar_core.MatrixGenerator(make_params(seed=s)).spawn(k).seed < 2**63
+               for s in (1, 2**63 - 1) for k in range(64))
+
+def test_run_experiments_matches_generator(make_params):
+    """4. run_experiments считает ровно те матрицы, которые выдает генератор."""
+    params = make_params(seed=8)
+    gen = sugar_core.MatrixGenerator(params)
+    res = sugar_core.run_experiments(params, 5, start=10)
+    for idx in range(5):
+        mat = gen.generate_at(10 + idx)
+        S_opt = sugar_core.solve_exact(mat)
+        expected = (S_opt - sugar_core.run_median(mat)) / S_opt * 100.0
+        assert res['losses']['median'][idx] == expected
+
+
+# --- 5. РАСКЛАДКА МАТРИЦЫ (LAYOUT) ---
+
+def test_generator_fortran_layout(make_params):
+    """1. layout='F' дает те же значения, но столбцы лежат в памяти подряд."""
+    params = make_params(seed=21, use_inorganic=True, use_ripening=True, v=3, beta_max=1.07)
+    rows = sugar_core.MatrixGenerator(params)
+    cols = sugar_core.MatrixGenerator(dict(params, layout='F'))
+    assert rows.layout == 'C' and cols.layout == 'F'
+    for k in range(5):
+        mat_c, mat_f = rows.generate_at(k), cols.generate_at(k)
+        assert mat_c.flags['C_CONTIGUOUS'] and mat_f.flags['F_CONTIGUOUS']
+        assert np.array_equal(mat_c, mat_f)
+
+def test_kernels_layout_independent(make_params):
+    """2. Эвристики и точное решение не зависят от раскладки входа."""
+    mat = sugar_core.MatrixGenerator(make_params(n=30, seed=4, use_inorganic=True)).generate()
+    mat_f = np.asfortranarray(mat)
+    assert list(sugar_core.run_all_heuristics(mat, 10)) == list(sugar_core.run_all_heuristics(mat_f, 10))
+    for engine in ('hungarian', 'lapjv'):
+        assert sugar_core.solve_exact(mat, engine) == sugar_core.solve_exact(mat_f, engine)
+
+def test_generator_invalid_layout(make_params):
+    """3. Неизвестная раскладка отклоняется."""
+    with pytest.raises(ValueError):
+        sugar_core.MatrixGenerator(make_params(layout='row'))
+
+
+# --- 6. ОДИНАРНАЯ ТОЧНОСТЬ (FLOAT32) ---
+
+def test_generator_float32(make_params):
+    """1. dtype='float32' дает матрицы float32 — округленные значения пути float64."""
+    params = make_params(seed=9, use_inorganic=True)
+    gen64 = sugar_core.MatrixGenerator(params)
+    gen32 = sugar_core.MatrixGenerator(dict(params, dtype='float32'))
+    assert gen32.dtype == 'float32'
+    mat32 = gen32.generate_at(2)
+    assert mat32.dtype == np.float32
+    assert np.allclose(mat32, gen64.generate_at(2), rtol=1e-5, atol=1e-7)
+
+def test_kernels_float32_match_upcast(make_params):
+    """2. Ядра float32 совпадают с ядрами float64 на тех же значениях."""
+    mat = sugar_core.MatrixGenerator(make_params(n=25, seed=2, dtype='float32', layout='F')).generate()
+    up = mat.astype(np.float64)
+    assert list(sugar_core.run_all_heuristics(mat, 6)) == list(sugar_core.run_all_heuristics(up, 6))
+    for fn in (sugar_core.run_greedy, sugar_core.run_thrifty, sugar_core.run_median):
+        assert fn(mat) == fn(up)
+    for engine in ('hungarian', 'lapjv'):
+        assert sugar_core.solve_exact(mat, engine) == sugar_core.solve_exact(up, engine)
+
+def test_run_experiments_float32_accuracy(make_params):
+    """3. Средние потери float32 и float64 на одних seed расходятся меньше 0.001 п.п."""
+    params = make_params(n=15, seed=12, dist_type='concentrated', use_ripening=True, v=4,
+                         beta_max=1.07, use_inorganic=True)
+    r64 = sugar_core.run_experiments(params, 300)
+    r32 = sugar_core.run_experiments(dict(params, dtype='float32'), 300)
+    assert r32['dtype'] == 'float32' and r64['dtype'] == 'float64'
+    for name in STRATEGIES:
+        assert abs(np.mean(r64['losses'][name]) - np.mean(r32['losses'][name])) < 1e-3
+
+def test_generator_invalid_dtype(make_params):
+    """4. Неизвестный тип элементов отклоняется."""
+    with pytest.raises(ValueError):
+        sugar_core.MatrixGenerator(make_params(dtype='float16'))
+
+
+# --- 7. ЗАПОЛНЕНИЕ БУФЕРА ВЫЗЫВАЮЩЕГО (GENERATE_INTO) ---
+
+def test_generate_into_matches_generate(make_params):
+    """1. generate_into пишет ту же матрицу в чужой буфер, включая срезы, и сдвигает поток."""
+    params = make_params(seed=14, use_inorganic=True)
+    gen = sugar_core.MatrixGenerator(params)
+    batch = np.zeros((3, 8, 8))
+    gen.generate_into(batch[1])
+    strided = np.zeros((16, 16))[::2, ::2]
+    gen.generate_into(strided)
+    assert gen.next_index == 2
+    assert np.array_equal(batch[1], gen.generate_at(0))
+    assert np.array_equal(strided, gen.generate_at(1))
+    assert not batch[0].any() and not batch[2].any()
+
+def test_generate_into_float32(make_params):
+    """2. Для dtype='float32' нужен буфер float32."""
+    gen = sugar_core.MatrixGenerator(make_params(seed=1, dtype='float32'))
+    out = np.empty((8, 8), dtype=np.float32)
+    gen.generate_into(out)
+    assert np.array_equal(out, gen.generate_at(0))
+    with pytest.raises(TypeError):
+        gen.generate_into(np.empty((8, 8)))
+
+def test_generate_into_rejects_bad_buffers(make_params):
+    """3. Неверная форма или буфер только для чтения отклоняются, поток не сдвигается."""
+    gen = sugar_core.MatrixGenerator(make_params(seed=1))
+    readonly = np.empty((8, 8))
+    readonly.flags.writeable = False
+    for bad in (np.empty((7, 7)), np.empty(64), readonly):
+        with pytest.raises(ValueError):
+            gen.generate_into(bad)
+    assert gen.next_index == 0
+
+
+# --- 8. ПАКЕТЫ МАТРИЦ (GENERATE_BATCH, ЯДРА НА (k, n, n)) ---
+
+def test_generate_batch_matches_generate_at(make_params):
+    """1. generate_batch(k) дает (k, n, n) из матриц экспериментов next_index.. и сдвигает поток."""
+    params = make_params(seed=6, use_inorganic=True, dist_type='concentrated')
+    for layout in ('C', 'F'):
+        gen = sugar_core.MatrixGenerator(dict(params, layout=layout))
+        gen.jump(3)
+        batch = gen.generate_batch(5)
+        assert batch.shape == (5, 8, 8)
+        assert gen.next_index == 8
+        assert batch[0].flags[layout + '_CONTIGUOUS']
+        for idx in range(5):
+            assert np.array_equal(batch[idx], gen.generate_at(3 + idx))
+    assert sugar_core.MatrixGenerator(make_params(dtype='float32')).generate_batch(2).dtype == np.float32
+
+def test_kernels_accept_batches(make_params):
+    """2. Ядра на пакете возвращают векторы длины k, совпадающие с поматричными вызовами."""
+    batch = sugar_core.MatrixGenerator(make_params(seed=7)).generate_batch(6)
+    assert np.array_equal(sugar_core.run_all_heuristics(batch, 3),
+                          np.stack([sugar_core.run_all_heuristics(mat, 3) for mat in batch]))
+    for engine in ('hungarian', 'lapjv'):
+        assert list(sugar_core.solve_exact(batch, engine)) == [sugar_core.solve_exact(mat, engine) for mat in batch]
+    for fn in (sugar_core.run_greedy, sugar_core.run_thrifty, sugar_core.run_median):
+        assert list(fn(batch)) == [fn(mat) for mat in batch]
+    assert list(sugar_core.run_thrifty_greedy(batch, 2)) == [sugar_core.run_thrifty_greedy(mat, 2) for mat in batch]
+
+def test_batch_shape_checks(make_params):
+    """3. Пустой пакет дает пустой результат, неквадратный - ValueError."""
+    assert sugar_core.run_greedy(np.zeros((0, 4, 4))).shape == (0,)
+    assert sugar_core.run_all_heuristics(np.zeros((0, 4, 4)), 1).shape == (0, 5)
+    with pytest.raises(ValueError):
+        sugar_core.run_median(np.zeros((2, 3, 4)))
+    with pytest.raises(ValueError):
+        sugar_core.MatrixGenerator(make_params()).generate_batch(-1)
+
+
+# --- 9. ПОТОКОВЫЕ СТАТИСТИКИ (RUNNINGSTATS) ---
+
+def test_running_stats_matches_numpy():
+    """1. Среднее, дисперсия, SE, минимум и максимум совпадают с NumPy; пустая статистика нулевая."""
+    values = np.random.default_rng(3).normal(5.0, 2.0, 10001)
+    stats = sugar_core.RunningStats()
+    stats.add_array(values)
+    assert stats.count == values.size
+    assert stats.mean == pytest.approx(values.mean(), rel=1e-13)
+    assert stats.variance == pytest.approx(values.var(ddof=1), rel=1e-12)
+    assert stats.sem == pytest.approx(values.std(ddof=1) / np.sqrt(values.size), rel=1e-12)
+    assert (stats.min, stats.max) == (values.min(), values.max())
+    empty = sugar_core.RunningStats()
+    assert (empty.count, empty.variance, empty.sem) == (0, 0.0, 0.0)
+
+def test_running_stats_merge_and_pickle():
+    """2. Слияние частей равно статистике целого, состояние переживает pickle."""
+    import pickle
+    values = np.random.default_rng(4).exponential(3.0, 5000)
+    merged = sugar_core.RunningStats()
+    for part in np.array_split(values, 7):
+        chunk = sugar_core.RunningStats()
+        chunk.add_array(part)
+        merged.merge(chunk)
+    whole = sugar_core.RunningStats()
+    whole.add_array(values)
+    assert merged.count == whole.count
+    assert merged.mean == pytest.approx(whole.mean, rel=1e-13)
+    assert merged.variance == pytest.approx(whole.variance, rel=1e-12)
+    assert pickle.loads(pickle.dumps(merged)).state == merged.state
+    with pytest.raises(ValueError):
+        sugar_core.RunningStats.from_state((-1, 0.0, 0.0, 0.0, 0.0))
+
+def test_run_experiments_stats(make_params):
+    """3. 'stats' согласованы с 'losses', не зависят от числа потоков; keep_losses=False не хранит потерь."""
+    params = make_params(n=10, seed=12)
+    full = sugar_core.run_experiments(params, 700, threads=1)
+    lean = sugar_core.run_experiments(params, 700, threads=3, keep_losses=False)
+    for name in STRATEGIES:
+        vals = full['losses'][name]
+        assert full['stats'][name].count == vals.size
+        assert full['stats'][name].mean == pytest.approx(vals.mean(), rel=1e-12)
+        assert lean['stats'][name].state == full['stats'][name].state
+        assert lean['losses'][name].size == 0
+
+def test_run_experiments_pair_stats(make_params):
+    """4. 'pair_stats' — статистики разностей потерь loss_a - loss_b для всех 10 пар стратегий."""
+    res = sugar_core.run_experiments(make_params(n=9, seed=3), 500, threads=2)
+    assert len(res['pair_stats']) == 10
+    for (a, b), diff in res['pair_stats'].items():
+        assert STRATEGIES.index(a) < STRATEGIES.index(b)
+        assert diff.mean == pytest.approx(np.mean(res['losses'][a] - res['losses'][b]), abs=1e-12)
+        assert diff.variance == pytest.approx(np.var(res['losses'][a] - res['losses'][b], ddof=1), rel=1e-9, abs=1e-18)
+
+
+# --- 10. РЕЖИМЫ ВЫБОРКИ (SAMPLER) ---
+
+def test_antithetic_pairs(make_params):
+    """1. antithetic: четный эксперимент совпадает с mc, нечетный строится из 1 - u."""
+    params = make_params(alpha_min=0.0, alpha_max=1.0, seed=4)
+    mc = sugar_core.MatrixGenerator(params)
+    anti = sugar_core.MatrixGenerator(dict(params, sampler='antithetic'))
+    assert anti.sampler == 'antithetic'
+    assert np.array_equal(anti.generate_at(6), mc.generate_at(6))
+    assert np.allclose(anti.generate_at(7)[:, 0], 1.0 - mc.generate_at(6)[:, 0], rtol=0, atol=1e-15)
+
+def test_sobol_points_are_stratified(make_params):
+    """2. sobol: первые 2^m точек по каждой координате лежат по одной в 2^m интервалах; seed меняет перемешивание."""
+    params = make_params(n=20, alpha_min=0.0, alpha_max=1.0, sampler='sobol', seed=8)
+    alpha = sugar_core.MatrixGenerator(params).generate_batch(128)[:, :, 0]
+    for row in range(20):
+        assert len(np.unique(np.floor(alpha[:, row] * 128))) == 128
+    other = sugar_core.MatrixGenerator(dict(params, seed=9)).generate_batch(128)[:, :, 0]
+    assert not np.array_equal(alpha, other)
+    assert np.array_equal(sugar_core.MatrixGenerator(params).generate_at(77), sugar_core.MatrixGenerator(params).generate_batch(78)[77])
+
+def test_sobol_padding_past_max_dims(make_params):
+    """3. Числа за пределами 4096 размерностей Соболя берутся из Philox (как в mc)."""
+    params = make_params(n=70, seed=2)
+    sobol = sugar_core.MatrixGenerator(dict(params, sampler='sobol')).generate_at(3)
+    mc = sugar_core.MatrixGenerator(params).generate_at(3)
+    # Столбец j использует числа [7n + (j-1)n, 7n + jn): начиная с j = 53 все они за границей 4096
+    assert not np.array_equal(sobol[:, 52], mc[:, 52])
+    ratio_sobol, ratio_mc = sobol[:, 60] / sobol[:, 59], mc[:, 60] / mc[:, 59]
+    assert np.allclose(ratio_sobol, ratio_mc, rtol=1e-12)
+
+def test_sampler_invalid_and_run_experiments(make_params):
+    """4. Неизвестный sampler — ValueError; run_experiments принимает все режимы."""
+    with pytest.raises(ValueError):
+        sugar_core.MatrixGenerator(make_params(sampler='latin'))
+    for sampler in ('antithetic', 'sobol'):
+        res = sugar_core.run_experiments(make_params(sampler=sampler, seed=1), 64, threads=2)
+        assert res['stats']['greedy'].count + res['skipped'] == 64
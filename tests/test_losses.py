@@ -0,0 +1,75 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+import data.database as db
+from data import losses
+
+pytestmark = pytest.mark.params(T=3000)
+
+
+# --- 1. КОДИРОВАНИЕ ---
+
+def test_encode_roundtrip_and_size(make_params):
+    """1. Порция восстанавливается как float32 без потерь и сжимается лучше 4 байт на число."""
+    values = sugar_core.run_experiments(dict(make_params(), seed=1), 3000, keep_losses=True)['losses']['greedy']
+    blob = losses.encode(values)
+    restored = losses.decode(blob, len(values))
+    assert restored.dtype == np.float32
+    np.testing.assert_array_equal(restored, values.astype(np.float32))
+    np.testing.assert_allclose(restored, values, rtol=1e-6)
+    assert len(blob) < 4 * len(values)
+
+def test_blob_rows_chunks_and_aliases(monkeypatch):
+    """2. Вектор делится на порции, одинаковые векторы хранятся ссылкой на первый."""
+    monkeypatch.setattr(losses, 'CHUNK_SIZE', 4)
+    a = np.arange(10, dtype=np.float64)
+    rows = losses.blob_rows(7, {'greedy': a, 'thrifty': a + 1, 'thrifty_greedy': a.copy()})
+    assert [(r[1], r[2], r[3], r[5]) for r in rows] == [
+        ('greedy', 0, 4, None), ('greedy', 1, 4, None), ('greedy', 2, 2, None),
+        ('thrifty', 0, 4, None), ('thrifty', 1, 4, None), ('thrifty', 2, 2, None),
+        ('thrifty_greedy', 0, 10, 'greedy')]
+    assert rows[-1][4] is None
+
+
+# --- 2. ХРАНЕНИЕ В ИСТОРИИ ---
+
+def test_losses_stored_with_record(temp_db, monkeypatch, make_params):
+    """3. Потери прогона сохраняются с записью истории и читаются порциями по порядку экспериментов."""
+    monkeypatch.setattr(losses, 'CHUNK_SIZE', 1000)
+    result = sugar_core.run_experiments(dict(make_params(), seed=5), 2500, keep_losses=True)
+    avg = {name: s.mean for name, s in result['stats'].items()}
+    db.add_record(make_params(T=2500), avg, seed=5, losses=result['losses'])
+    db.add_record(make_params(), avg, seed=6)
+    with_losses, without = [r['id'] for r in db.get_all_records()][::-1]
+
+    chunks = list(losses.iter_losses(with_losses, 'median'))
+    assert [len(c) for c in chunks] == [1000, 1000, 500]
+    loaded = losses.load_losses(with_losses)
+    assert list(loaded) == list(result['losses'])
+    for name, values in result['losses'].items():
+        np.testing.assert_allclose(loaded[name], values, rtol=1e-6)
+        assert float(np.mean(loaded[name])) == pytest.approx(avg[name], rel=1e-6)
+    # При v=0 комбинированные стратегии совпадают с чистыми и хранятся ссылками
+    stored = db.connect().execute('SELECT strategy, same_as FROM history_losses WHERE same_as IS NOT NULL').fetchall()
+    assert sorted(stored) == [('greedy_thrifty', 'thrifty'), ('thrifty_greedy', 'greedy')]
+
+    assert losses.load_losses(without) == {}
+    stats = losses.storage_stats()
+    assert stats['records'] == 1 and stats['values'] == 5 * 2500
+    assert 0 < stats['bytes_per_million'] < 3 * 4e6
+
+    db.delete_all()
+    assert losses.storage_stats()['records'] == 0
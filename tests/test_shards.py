@@ -0,0 +1,79 @@
+import sys
+import os
+import subprocess
+import pytest
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+import data.database as db
+from engine import shards
+
+pytestmark = pytest.mark.params(dist_type='concentrated', use_ripening=True, v=3, beta_max=1.07)
+
+
+def test_plan_splits_into_shards(tmp_path, make_params):
+    """1. План покрывает все T экспериментов без пересечений."""
+    manifest = shards.plan(str(tmp_path / 'q'), make_params(T=1050), shard_size=100, seed=1)
+    assert manifest['shards'] == 11
+    assert shards.status(str(tmp_path / 'q')) == {'total': 11, 'pending': 11, 'claimed': 0, 'done': 0}
+
+def test_claim_is_exclusive(tmp_path, make_params):
+    """2. Один шард нельзя захватить дважды."""
+    queue = str(tmp_path / 'q')
+    shards.plan(queue, make_params(T=200), shard_size=100, seed=1)
+    first, second = shards.claim(queue), shards.claim(queue)
+    assert first != second
+    assert shards.claim(queue) is None
+
+def test_requeue_stale(tmp_path, make_params):
+    """3. Зависший захват возвращается в очередь."""
+    queue = str(tmp_path / 'q')
+    shards.plan(queue, make_params(T=100), shard_size=100, seed=1)
+    assert shards.claim(queue) is not None
+    assert shards.requeue_stale(queue, max_age=-1) == 1
+    assert shards.status(queue)['pending'] == 1
+
+def test_merge_requires_all_shards(tmp_path, make_params):
+    """4. Слияние неполной очереди запрещено."""
+    queue = str(tmp_path / 'q')
+    shards.plan(queue, make_params(T=300), shard_size=100, seed=1)
+    shards.work(queue, max_shards=1)
+    with pytest.raises(RuntimeError):
+        shards.merge(queue, record=False)
+
+def test_multiprocess_matches_single_run(temp_db, tmp_path, make_params):
+    """5. Несколько процессов дают те же средние, что и один прогон с тем же seed, запись в историю."""
+    queue = str(tmp_path / 'q')
+    params = make_params(T=2000)
+    shards.plan(queue, params, shard_size=150, seed=2024)
+
+    procs = [subprocess.Popen([sys.executable, '-m', 'engine.shards', 'work', queue, '--threads', '1'],
+                              cwd=project_root, stdout=subprocess.DEVNULL)
+             for _ in range(3)]
+    for p in procs:
+        assert p.wait(timeout=120) == 0
+    assert shards.status(queue)['done'] == 14
+
+    merged = shards.merge(queue)
+    single = sugar_core.run_experiments(dict(params, seed=2024), 2000)
+    for name, vals in single['losses'].items():
+        # Статистики шардов сливаются формулой Чана: совпадение с точностью до округления
+        assert merged['avg_losses'][name] == pytest.approx(np.mean(vals), rel=1e-12)
+        assert merged['std_errors'][name] == pytest.approx(np.std(vals, ddof=1) / np.sqrt(len(vals)), rel=1e-9)
+        assert merged['stats'][name].count == len(vals)
+    assert merged['skipped'] == single['skipped']
+
+    records = db.get_all_records()
+    assert len(records) == 1
+    assert records[0]['results'] == merged['avg_losses']
+    assert records[0]['std_errors'] == merged['std_errors']
@@ -0,0 +1,93 @@
+import sys
+import os
+import pytest
+import numpy as np
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+from engine import stopping
+
+pytestmark = pytest.mark.params(n=10, seed=77)
+
+
+STRATEGIES = ['greedy', 'thrifty', 'median', 'greedy_thrifty', 'thrifty_greedy']
+
+
+def synthetic(means, size, noise=1.0, seed=0):
+    """Статистики для потерь с общей для всех стратегий компонентой (как у одной матрицы)."""
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0.0, 5.0, size)
+    losses = {name: common + mean + rng.normal(0.0, noise, size) for name, mean in means.items()}
+    stats = {name: sugar_core.RunningStats() for name in losses}
+    pairs = {(a, b): sugar_core.RunningStats() for i, a in enumerate(STRATEGIES) for b in STRATEGIES[i + 1:]}
+    for name, s in stats.items():
+        s.add_array(losses[name])
+    for (a, b), s in pairs.items():
+        s.add_array(losses[a] - losses[b])
+    return stats, pairs
+
+
+# --- 1. ПРАВИЛА ОСТАНОВКИ ---
+
+def test_fixed_rule_never_stops():
+    """1. По умолчанию (fixed) расчет не останавливается; неизвестное правило — ValueError."""
+    stats, pairs = synthetic({name: i for i, name in enumerate(STRATEGIES)}, 5000)
+    assert stopping.stop_reason({}, stats, pairs) is None
+    with pytest.raises(ValueError):
+        stopping.stop_reason({'stop_rule': 'never'}, stats, pairs)
+
+def test_precision_rule_uses_half_width():
+    """2. Точность: остановка, когда z * SE каждой стратегии не больше half_width."""
+    stats, pairs = synthetic({name: 0.0 for name in STRATEGIES}, 4000)
+    widest = max(stopping.half_widths(stats).values())
+    assert stopping.stop_reason({'stop_rule': 'precision', 'half_width': widest * 1.01}, stats) == 'precision'
+    assert stopping.stop_reason({'stop_rule': 'precision', 'half_width': widest * 0.99}, stats) is None
+
+def test_ranking_rule_is_paired():
+    """3. Ранжирование: разница 0.3 п.п. при общем разбросе 5 п.п. видна только парному критерию."""
+    means = {'greedy': 0.0, 'thrifty': 0.3, 'median': 1.0, 'greedy_thrifty': 2.0, 'thrifty_greedy': 3.0}
+    stats, pairs = synthetic(means, 2000, noise=0.5)
+    assert stopping.stop_reason({'stop_rule': 'ranking'}, stats, pairs) == 'ranking'
+    # Непарная проверка: интервалы средних greedy и thrifty перекрываются
+    widths = stopping.half_widths(stats)
+    assert stats['thrifty'].mean - stats['greedy'].mean < widths['greedy'] + widths['thrifty']
+
+    close = dict(means, thrifty=0.01)
+    stats, pairs = synthetic(close, 2000, noise=0.5)
+    assert stopping.stop_reason({'stop_rule': 'ranking'}, stats, pairs) is None
+
+def test_ranking_ignores_identical_copies(make_params):
+    """4. Стратегия, совпадающая с лучшей в каждом эксперименте, не мешает остановке."""
+    params = make_params(stop_rule='ranking')
+    res = sugar_core.run_experiments(params, 1000, keep_losses=False)
+    assert res['pair_stats']['greedy', 'thrifty_greedy'].variance == 0
+    assert stopping.stop_reason(params, res['stats'], res['pair_stats']) == 'ranking'
+
+def test_no_checks_before_minimum(make_params):
+    """5. До MIN_EXPERIMENTS результат не проверяется."""
+    params = make_params(stop_rule='ranking')
+    res = sugar_core.run_experiments(params, stopping.MIN_EXPERIMENTS - 1, keep_losses=False)
+    assert stopping.stop_reason(params, res['stats'], res['pair_stats']) is None
+
+def test_describe_reports_savings():
+    """6. Текст отчета называет причину и число сэкономленных экспериментов."""
+    text = stopping.describe('precision', {'half_width': 0.1}, 1200, 10000)
+    assert "1200 из 10000" in text and "±0.1 " in text and "сэкономлено 8800" in text
+
+def test_runner_up_skips_copies(make_params):
+    """7. Ближайшая к лучшей стратегия ищется среди отличных от нее; разность берется парная."""
+    res = sugar_core.run_experiments(make_params(), 500, keep_losses=False)
+    best, second, diff = stopping.runner_up(res['stats'], res['pair_stats'])
+    assert best == 'greedy' and second not in ('greedy', 'thrifty_greedy')
+    mean, _ = stopping.paired_difference(res['pair_stats'], second, best)
+    assert mean == pytest.approx(res['stats'][second].mean - res['stats'][best].mean)
+    assert diff.count == 500
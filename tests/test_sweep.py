@@ -0,0 +1,112 @@
+import sys
+import os
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+try:
+    import sugar_core
+except ImportError:
+    pytest.fail("Не удалось импортировать модуль 'sugar_core'. Убедитесь, что файл .pyd/.so находится в корне проекта и скомпилирован.")
+
+import data.database as db
+from engine import sweep
+
+pytestmark = pytest.mark.params(n=6, T=60, seed=31)
+
+
+# --- 1. СЕТКА ПАРАМЕТРОВ ---
+
+def test_parse_values():
+    """1. Списки, диапазоны с включенной границей, пары диапазонов и логические значения."""
+    assert sweep.parse_values('n', '10, 20,40') == [10, 20, 40]
+    assert sweep.parse_values('n', '5:25:5') == [5, 10, 15, 20, 25]
+    assert sweep.parse_values('beta_max', '1.0:1.2:0.1') == [1.0, 1.1, 1.2]
+    assert sweep.parse_values('beta_range', '0.80-0.90,0.86-0.99') == [(0.8, 0.9), (0.86, 0.99)]
+    assert sweep.parse_values('dist_type', 'uniform,concentrated') == ['uniform', 'concentrated']
+    assert sweep.parse_values('use_ripening', 'нет,да') == [False, True]
+    for key, text in (('n', '2.5'), ('n', '10:5:1'), ('beta_range', '0.8'), ('use_inorganic', 'может')):
+        with pytest.raises(ValueError):
+            sweep.parse_values(key, text)
+
+def test_expand_grid(make_params):
+    """2. Декартово произведение осей; составные ключи раскладываются на пару параметров."""
+    points = sweep.expand_grid(make_params(), [('n', [5, 10]), ('beta_range', [(0.8, 0.9), (0.7, 0.95)])])
+    assert [(p['n'], p['beta1'], p['beta2']) for p in points] == [
+        (5, 0.8, 0.9), (5, 0.7, 0.95), (10, 0.8, 0.9), (10, 0.7, 0.95)]
+    assert all(p['T'] == 60 for p in points)
+    with pytest.raises(ValueError):
+        sweep.expand_grid(make_params(), [('n', [5]), ('n', [6])])
+
+
+# --- 2. ВЫПОЛНЕНИЕ СЕРИИ ---
+
+def test_sweep_matches_single_runs(temp_db, make_params):
+    """1. Точка серии совпадает с отдельным расчетом с тем же seed; отрыв — парная разность."""
+    results = sweep.run_sweep(make_params(), [('n', [4, 8])], record=False)
+    for res in results:
+        direct = sugar_core.run_experiments(res['params'], 60)
+        assert res['avg_losses'] == pytest.approx({k: s.mean for k, s in direct['stats'].items()})
+        best, second = res['best'], res['runner_up']
+        assert res['avg_losses'][best] == min(res['avg_losses'].values())
+        assert res['margin'] == pytest.approx(res['avg_losses'][second] - res['avg_losses'][best])
+    assert db.get_all_records() == []
+
+def test_sweep_largest_first_and_batched_history(temp_db, monkeypatch, make_params):
+    """2. Дорогие точки запускаются первыми, история пишется пачками, результаты — в порядке сетки."""
+    started, batches = [], []
+    original = sweep.run_point
+    monkeypatch.setattr(sweep, 'run_point', lambda core, p, *args: started.append(p['n']) or original(core, p, *args))
+    original_add = db.add_records
+    monkeypatch.setattr(db, 'add_records', lambda entries: batches.append(len(entries)) or original_add(entries))
+    monkeypatch.setattr(sweep, 'RECORD_BATCH', 2)
+
+    results = sweep.run_sweep(make_params(T=20), [('n', [3, 9, 5, 7, 4])], workers=1)
+    assert started == [9, 7, 5, 4, 3]
+    assert [r['params']['n'] for r in results] == [3, 9, 5, 7, 4]
+    assert batches == [2, 2, 1]
+    assert {r['seed'] for r in db.get_all_records()} == {31}
+
+def test_sweep_spare_threads(temp_db, monkeypatch, make_params):
+    """3. Точка, которой не с кем делить ядра, считается порциями на всех потоках — с тем же результатом."""
+    calls = []
+
+    class Recording:
+        RunningStats = sugar_core.RunningStats
+
+        @staticmethod
+        def run_experiments(params, count, threads, start, keep_losses):
+            calls.append((count, threads))
+            return sugar_core.run_experiments(params, count, threads, start, keep_losses)
+
+    monkeypatch.setattr('engine.backend.load_backend', lambda name=None: ('sugar_core', Recording))
+    monkeypatch.setattr(sweep, 'MIN_POINT_CHUNK', 256)
+    [res] = sweep.run_sweep(make_params(T=1024), [('n', [5])], workers=4, record=False)
+    assert calls == [(256, 4)] * 4
+    single = sweep.run_point(sugar_core, make_params(T=1024, n=5))
+    assert res['avg_losses'] == pytest.approx(single['avg_losses'])
+
+def test_sweep_reports_bad_points(temp_db, make_params):
+    """4. Несовместимые значения (v > n) отмечаются ошибкой, остальные точки считаются."""
+    results = sweep.run_sweep(make_params(use_ripening=True, v=5, beta_max=1.05), [('n', [3, 6])], record=False)
+    assert 'error' in results[0]
+    assert results[1]['count'] == 60 and 'error' not in results[1]
+
+def test_repeated_sweep_uses_cache(temp_db, make_params):
+    """5. Повторная серия с тем же seed отвечает из кэша и совпадает с первой."""
+    first = sweep.run_sweep(make_params(), [('n', [4, 5])])
+
+    class NoRuns:
+        RunningStats = sugar_core.RunningStats
+
+        @staticmethod
+        def run_experiments(*args):
+            raise AssertionError("точка должна браться из кэша")
+
+    again = [sweep.run_point(NoRuns, res['params'], use_cache=True) for res in first]
+    assert [r['avg_losses'] for r in again] == [r['avg_losses'] for r in first]
+    assert again[0]['skipped'] == first[0]['skipped']
@@ -0,0 +1,111 @@
+import sys
+import os
+import numpy as np
+import pytest
+
+
+current_dir = os.path.dirname(os.path.abspath(__file__))
+project_root = os.path.dirname(current_dir)
+if project_root not in sys.path:
+    sys.path.insert(0, project_root)
+
+import data.database as db
+from data import losses, transfer
+
+
+@pytest.fixture
+def filled(temp_db, monkeypatch):
+    """Записи разных видов: с потерями, без seed, без стандартных ошибок, с лишним ключом."""
+    monkeypatch.setattr(losses, 'CHUNK_SIZE', 7)
+    monkeypatch.setattr(transfer, 'CHUNK_ROWS', 2)
+    rng = np.random.default_rng(0)
+    vectors = {'greedy': rng.random(20) * 10, 'thrifty': rng.random(20) * 10}
+    vectors['thrifty_greedy'] = vectors['greedy']
+    db.add_record({'n': 5, 'T': 20, 'beta1': 0.86, 'use_ripening': False, 'dist_type': 'uniform'},
+                  {'greedy': 1.5, 'thrifty': 2.5, 'thrifty_greedy': 1.5}, seed=2**63 - 1,
+                  std_errors={'greedy': 0.1, 'thrifty': 0.2, 'thrifty_greedy': 0.1}, losses=vectors)
+    db.add_record({'n': 6, 'use_ripening': True, 'v': 2, 'layout': 'grid'}, {'greedy': 3.0})
+    db.add_record({'n': 7, 'alpha_min': 0.125}, {'greedy': 4.0, 'thrifty': 5.0}, seed=0,
+                  std_errors={'greedy': 0.5})
+    db.add_record({'n': 8}, {'greedy': 6.0}, seed=3, losses={'greedy': np.arange(3.0)})
+    return vectors
+
+
+def snapshot():
+    """История без id: (timestamp, params, results, seed, std_errors, потери)."""
+    rows = []
+    for record in db.get_all_records():
+        stored = {name: values.tolist() for name, values in losses.load_losses(record['id']).items()}
+        rows.append((record['timestamp'], record['params'], record['results'], record['seed'],
+                     record['std_errors'], stored))
+    return sorted(rows, key=repr)
+
+
+# --- 1. ВЫГРУЗКА И ЗАГРУЗКА ---
+
+@pytest.mark.parametrize('fmt', ['csv', 'npz', 'arrow'])
+def test_roundtrip(filled, tmp_path, monkeypatch, fmt):
+    """1. Выгрузка и загрузка в пустую базу восстанавливают записи и потери по экспериментам."""
+    if fmt == 'arrow':
+        pytest.importorskip('pyarrow')
+    path = str(tmp_path / f'history.{fmt}')
+    before = snapshot()
+    assert transfer.export_history(path) == {'records': 4, 'losses': 63}
+
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'other.db'))
+    db.init_db()
+    result = transfer.import_history(path)
+    assert result == {'imported': 4, 'skipped': 0, 'losses': 63}
+    assert snapshot() == before
+    np.testing.assert_array_equal(
+        losses.load_losses(db.get_records_page(None, 1, n=5)[0]['id'])['thrifty'],
+        filled['thrifty'].astype(np.float32))
+
+def test_import_skips_duplicates(filled, tmp_path):
+    """2. Повторная загрузка и записи, которые уже есть в базе, пропускаются — вместе с их потерями."""
+    path = str(tmp_path / 'history.csv')
+    transfer.export_history(path)
+    assert transfer.import_history(path) == {'imported': 0, 'skipped': 4, 'losses': 0}
+    db.delete_all()
+    db.add_record({'n': 8}, {'greedy': 6.0}, seed=3)
+    assert transfer.import_history(path) == {'imported': 3, 'skipped': 1, 'losses': 60}
+    assert transfer.import_history(path)['imported'] == 0
+    assert db.count_records() == 4
+
+def test_export_filters_and_without_losses(filled, tmp_path):
+    """3. Фильтры уходят в выборку, потери можно не выгружать; формат определяется по расширению."""
+    path = str(tmp_path / 'part.npz')
+    assert transfer.export_history(path, include_losses=False, n=(6, 7)) == {'records': 2, 'losses': 0}
+    db.delete_all()
+    assert transfer.import_history(path)['imported'] == 2
+    assert sorted(r['params']['n'] for r in db.get_all_records()) == [6, 7]
+    with pytest.raises(ValueError):
+        transfer.detect_format(str(tmp_path / 'history.txt'))
+
+def test_imported_records_survive_cleanup(filled, tmp_path, monkeypatch):
+    """4. Загруженные записи хранят исходное время, но очистка старых записей их не удаляет."""
+    db.flush()
+    db.connect().execute("UPDATE history SET timestamp = '2000-01-01 00:00:00'")
+    db.connect().commit()
+    path = str(tmp_path / 'history.npz')
+    transfer.export_history(path)
+
+    monkeypatch.setattr(db, 'DB_PATH', str(tmp_path / 'other.db'))
+    db.init_db()
+    db.add_record({'n': 9}, {'greedy': 1.0})
+    assert transfer.import_history(path)['imported'] == 4
+    db.connect().execute("UPDATE history SET timestamp = '2000-01-01 00:00:00' WHERE n = 9")
+    db.connect().commit()
+    db.init_db()
+    records = db.get_all_records()
+    assert sorted(r['params']['n'] for r in records) == [5, 6, 7, 8]
+    assert {r['timestamp'] for r in records} == {'2000-01-01 00:00:00'}
+
+def test_cli(filled, tmp_path, capsys):
+    """5. Командная строка: export с фильтром и import."""
+    path = str(tmp_path / 'history.csv')
+    transfer.main(['export', path, '--filter', 'n=5|8'])
+    assert 'Выгружено записей: 2' in capsys.readouterr().out
+    assert os.path.exists(transfer.losses_path(path))
+    transfer.main(['import', path])
+    assert 'пропущено дубликатов: 2' in capsys.readouterr().out